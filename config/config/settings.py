@@ -1,6 +1,7 @@
 from pathlib import Path
 from datetime import timedelta
 
+from corsheaders.defaults import default_headers
 from dotenv import load_dotenv
 import os
 
@@ -62,6 +63,9 @@ MIDDLEWARE = [
 if DEBUG:
     MIDDLEWARE.insert(0, "debug_toolbar.middleware.DebugToolbarMiddleware")
 
+if get_env("GZIP_RESPONSES", "False") == "True":
+    MIDDLEWARE.insert(0, "django.middleware.gzip.GZipMiddleware")
+
 ROOT_URLCONF = 'config.urls'
 
 TEMPLATES = [
@@ -86,6 +90,13 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # Take the write lock when a transaction starts so concurrent
+        # checkouts wait on busy_timeout instead of failing on lock upgrade.
+        'OPTIONS': {
+            'transaction_mode': 'IMMEDIATE',
+            'timeout': 20,
+            'init_command': 'PRAGMA journal_mode=WAL;',
+        },
     }
 }
 
@@ -129,7 +140,11 @@ REST_FRAMEWORK = {
         'rest_framework_simplejwt.authentication.JWTAuthentication',
     ),
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
-    'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.LimitOffsetPagination',
+    'DEFAULT_RENDERER_CLASSES': [
+        'product.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PAGINATION_CLASS': 'product.pagination.ApproximateCountPagination',
     'PAGE_SIZE': 10,
     'DEFAULT_FILTER_BACKENDS': ['django_filters.rest_framework.DjangoFilterBackend'],
     'DEFAULT_THROTTLE_CLASSES': [
@@ -159,22 +174,47 @@ SIMPLE_JWT = {
 
 AUTH_USER_MODEL = 'login.CustomUser'
 
+# POST /api/orders/ answers 202 with a QUEUED order and a worker
+# (manage.py process_order_queue) takes the stock in batches.
+ORDER_QUEUE_ENABLED = get_env("ORDER_QUEUE_ENABLED", "False") == "True"
+
+# product.cart.DatabaseCartBackend writes every cart change to CartItem;
+# product.cart.CacheCartBackend keeps carts in the cache until checkout and
+# needs a cache shared by all workers (REDIS_URL below).
+CART_BACKEND = get_env("CART_BACKEND", "product.cart.DatabaseCartBackend")
+
 
 
 INTERNAL_IPS = ['127.0.0.1']
 
 
-CACHES = {
-    'default': {
-        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
-        'LOCATION': 'product-cache',
+# The local-memory default is per process; set REDIS_URL (needs the redis
+# package) to share the cache between workers.
+REDIS_URL = get_env("REDIS_URL")
+
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'product-cache',
+        }
     }
-}
 
 CORS_ALLOWED_ORIGINS = [origin for origin in get_env("CORS_ALLOWED_ORIGINS", "").split(",") if origin]
 
 CORS_ALLOW_CREDENTIALS = True
 
+# Let browser clients send idempotency keys and see when a response was replayed.
+CORS_ALLOW_HEADERS = (*default_headers, "idempotency-key")
+CORS_EXPOSE_HEADERS = ["Idempotent-Replayed"]
+
 
 if not DEBUG and not ALLOWED_HOSTS:
     raise RuntimeError("ALLOWED_HOSTS must be set when DEBUG=False")
@@ -1,6 +1,13 @@
 from django.contrib import admin
 
 from django.contrib.auth.admin import UserAdmin
+from product.pagination import ApproximateCountPaginator
 from .models import CustomUser  
 
-admin.site.register(CustomUser, UserAdmin) 
\ No newline at end of file
+
+class CustomUserAdmin(UserAdmin):
+    paginator = ApproximateCountPaginator
+    show_full_result_count = False
+
+
+admin.site.register(CustomUser, CustomUserAdmin)
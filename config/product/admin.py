@@ -1,5 +1,32 @@
 from django.contrib import admin
+from product.cache import forget_products, refresh_products
+from product.inventory import shard_stock
 from product.models import Cart, Product
+from product.pagination import ApproximateCountPaginator
 
-admin.site.register(Product)
-admin.site.register(Cart)
\ No newline at end of file
+
+class ProductAdmin(admin.ModelAdmin):
+    paginator = ApproximateCountPaginator
+    show_full_result_count = False
+    # Changed only through the rebalance_stock_shards command.
+    readonly_fields = ('stock_shards',)
+
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        if change and obj.stock_shards and 'stock' in form.changed_data:
+            shard_stock(obj.pk, obj.stock_shards, total=obj.stock)
+        refresh_products([obj.pk])
+
+    def delete_model(self, request, obj):
+        pk = obj.pk
+        super().delete_model(request, obj)
+        forget_products([pk])
+
+    def delete_queryset(self, request, queryset):
+        product_ids = list(queryset.values_list('pk', flat=True))
+        super().delete_queryset(request, queryset)
+        forget_products(product_ids)
+
+
+admin.site.register(Product, ProductAdmin)
+admin.site.register(Cart)
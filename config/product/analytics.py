@@ -0,0 +1,214 @@
+import datetime
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import DecimalField, F, IntegerField, Q, Sum, Value
+from django.db.models.functions import Coalesce, TruncDate
+from django.utils import timezone
+
+from .bulk import increment_rows
+from .models import ArchivedOrderItem, Order, OrderItem, ProductDailySales, SalesBacklog
+
+SALES_KINDS = ("ordered", "paid", "canceled")
+SALES_METRICS = tuple(
+    f"{measure}_{kind}" for kind in SALES_KINDS for measure in ("units", "revenue")
+)
+# Orders that took stock; QUEUED and REJECTED ones never count.
+SALES_COUNTED_STATUSES = (
+    Order.StatusChoices.PENDING,
+    Order.StatusChoices.COMPLETED,
+    Order.StatusChoices.CANCELED,
+)
+SALES_BACKFILL_CHUNK_DAYS = 7
+SALES_BACKFILL_BATCH_SIZE = 1000
+SALES_FOLD_BATCH_SIZE = 1000
+
+MONEY = DecimalField(max_digits=14, decimal_places=2)
+
+
+def _total(expression, condition=None, output_field=None):
+    output_field = output_field or IntegerField()
+    return Coalesce(Sum(expression, filter=condition, output_field=output_field), Value(0), output_field=output_field)
+
+
+def sales_day(created_at):
+    return timezone.localdate(created_at)
+
+
+def _day_range(start, end):
+    """Aware datetimes bounding local days ``start`` to ``end`` (end exclusive)."""
+    tz = timezone.get_current_timezone()
+    return (
+        datetime.datetime.combine(start, datetime.time.min, tzinfo=tz),
+        datetime.datetime.combine(end + datetime.timedelta(days=1), datetime.time.min, tzinfo=tz),
+    )
+
+
+def _money(value):
+    return str(Decimal(value).quantize(Decimal("0.01")))
+
+
+def add_to_rollups(totals, kind):
+    """
+    Add ``{(day, product_id): (units, revenue)}`` to the ``kind`` columns
+    ("ordered", "paid" or "canceled") of the daily rollups.
+    """
+    increment_rows(
+        ProductDailySales,
+        ('day', 'product_id'),
+        {f"units_{kind}": IntegerField(), f"revenue_{kind}": MONEY},
+        totals,
+    )
+
+
+def order_sales(order_ids):
+    """Return ``{(day, product_id): (units, revenue)}`` for the items of ``order_ids``."""
+    rows = (
+        OrderItem.objects
+        .filter(order_id__in=list(order_ids))
+        .annotate(day=TruncDate('order__created_at'))
+        .values('day', 'product_id')
+        .annotate(units=_total('quantity'), revenue=_total(F('quantity') * F('price'), output_field=MONEY))
+        .values_list('day', 'product_id', 'units', 'revenue')
+    )
+    return {(day, product_id): (units, revenue) for day, product_id, units, revenue in rows}
+
+
+def queue_for_rollups(order_ids, kind):
+    """
+    Record that ``order_ids`` were placed, paid or canceled (``kind``) for
+    the next fold_sales_backlog. An insert of new rows only, so checkouts
+    never wait on each other's (day, product) rollup rows.
+    """
+    SalesBacklog.objects.bulk_create(
+        [SalesBacklog(order_id=order_id, kind=kind) for order_id in order_ids],
+        ignore_conflicts=True,
+    )
+
+
+def fold_sales_backlog(batch_size=SALES_FOLD_BATCH_SIZE):
+    """
+    Fold up to ``batch_size`` backlog entries, oldest first, into the daily
+    rollups and drop them from the backlog. Returns the number folded.
+    """
+    with transaction.atomic():
+        entries = list(SalesBacklog.objects.order_by('id').values_list('id', 'order_id', 'kind')[:batch_size])
+        if not entries:
+            return 0
+        by_kind = {}
+        for _, order_id, kind in entries:
+            by_kind.setdefault(kind, []).append(order_id)
+        for kind, order_ids in by_kind.items():
+            add_to_rollups(order_sales(order_ids), kind)
+        SalesBacklog.objects.filter(id__in=[entry_id for entry_id, _, _ in entries]).delete()
+    return len(entries)
+
+
+def iter_backfill_rows(start, end, batch_size=SALES_BACKFILL_BATCH_SIZE, items=OrderItem):
+    """
+    Stream rebuilt rollup rows for orders placed on days ``start`` to
+    ``end``, read from ``items`` (OrderItem or ArchivedOrderItem).
+    """
+    completed = Q(order__status=Order.StatusChoices.COMPLETED)
+    canceled = Q(order__status=Order.StatusChoices.CANCELED)
+    revenue = F('quantity') * F('price')
+    since, until = _day_range(start, end)
+    rows = (
+        items.objects
+        .filter(
+            order__created_at__gte=since,
+            order__created_at__lt=until,
+            order__status__in=SALES_COUNTED_STATUSES,
+        )
+        .annotate(day=TruncDate('order__created_at'))
+        .values('day', 'product_id')
+        .annotate(
+            units_ordered=_total('quantity'),
+            revenue_ordered=_total(revenue, output_field=MONEY),
+            units_paid=_total('quantity', completed),
+            revenue_paid=_total(revenue, completed, MONEY),
+            units_canceled=_total('quantity', canceled),
+            revenue_canceled=_total(revenue, canceled, MONEY),
+        )
+        .order_by('day', 'product_id')
+    )
+    return rows.iterator(chunk_size=batch_size)
+
+
+def add_archived_sales(start, end, batch_size=SALES_BACKFILL_BATCH_SIZE):
+    """Add archived orders placed on days ``start`` to ``end`` to the rollups."""
+    totals = {kind: {} for kind in SALES_KINDS}
+    for row in iter_backfill_rows(start, end, batch_size, items=ArchivedOrderItem):
+        for kind in SALES_KINDS:
+            if row[f"units_{kind}"]:
+                totals[kind][row['day'], row['product_id']] = (row[f"units_{kind}"], row[f"revenue_{kind}"])
+    for kind, kind_totals in totals.items():
+        add_to_rollups(kind_totals, kind)
+
+
+def rebuild_rollups(start, end, chunk_days=SALES_BACKFILL_CHUNK_DAYS, batch_size=SALES_BACKFILL_BATCH_SIZE):
+    """
+    Recompute the rollups for days ``start`` to ``end`` from the orders and
+    their items, ``chunk_days`` days per transaction; each chunk's rows are
+    streamed from one aggregate query and written ``batch_size`` at a time,
+    then archived orders are added on top. The recount already reflects
+    every backlogged change to the chunk's orders, so those entries are
+    dropped rather than folded in again.
+    Yields ``(chunk_start, chunk_end, rows written)``.
+    """
+    chunk_start = start
+    while chunk_start <= end:
+        chunk_end = min(chunk_start + datetime.timedelta(days=chunk_days - 1), end)
+        written = 0
+        since, until = _day_range(chunk_start, chunk_end)
+        with transaction.atomic():
+            ProductDailySales.objects.filter(day__gte=chunk_start, day__lte=chunk_end).delete()
+            SalesBacklog.objects.filter(order__created_at__gte=since, order__created_at__lt=until).delete()
+            batch = []
+            for row in iter_backfill_rows(chunk_start, chunk_end, batch_size):
+                batch.append(ProductDailySales(**row))
+                if len(batch) >= batch_size:
+                    ProductDailySales.objects.bulk_create(batch)
+                    written += len(batch)
+                    batch = []
+            if batch:
+                ProductDailySales.objects.bulk_create(batch)
+                written += len(batch)
+            add_archived_sales(chunk_start, chunk_end, batch_size)
+        yield chunk_start, chunk_end, written
+        chunk_start = chunk_end + datetime.timedelta(days=1)
+
+
+def sales_report(start, end, group_by="day", product_id=None, limit=None):
+    """
+    Totals and per-day or per-product rows for ``start`` to ``end``, read
+    from the rollups only. Revenue is returned as two-decimal strings.
+    """
+    rollups = ProductDailySales.objects.filter(day__gte=start, day__lte=end)
+    if product_id is not None:
+        rollups = rollups.filter(product_id=product_id)
+
+    # Aliased: an annotation may not reuse a model field's name.
+    sums = {
+        f"sum_{metric}": _total(metric, output_field=MONEY if metric.startswith("revenue") else None)
+        for metric in SALES_METRICS
+    }
+
+    def present(row):
+        data = {key: value for key, value in row.items() if not key.startswith("sum_")}
+        for metric in SALES_METRICS:
+            value = row[f"sum_{metric}"]
+            data[metric] = _money(value) if metric.startswith("revenue") else value
+        return data
+
+    if group_by == "product":
+        rows = (
+            rollups.values('product_id', 'product__name')
+            .annotate(**sums)
+            .order_by('-sum_revenue_ordered', 'product_id')
+        )
+    else:
+        rows = rollups.values('day').annotate(**sums).order_by('day')
+    if limit is not None:
+        rows = rows[:limit]
+    return present(rollups.aggregate(**sums)), [present(row) for row in rows]
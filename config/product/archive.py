@@ -0,0 +1,69 @@
+import datetime
+import time
+
+from django.db import transaction
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+
+from .bulk import keyset_batches
+from .models import ArchivedOrder, ArchivedOrderItem, CoOccurrenceBacklog, Order, OrderItem, SalesBacklog
+from .order_cache import invalidate_order_cache
+
+# Orders in a final status older than this are moved to ArchivedOrder
+# by manage.py archive_orders.
+ORDER_ARCHIVE_AFTER = datetime.timedelta(days=90)
+ORDER_ARCHIVE_BATCH_SIZE = 500
+ORDER_ARCHIVE_STATUSES = (
+    Order.StatusChoices.COMPLETED,
+    Order.StatusChoices.CANCELED,
+    Order.StatusChoices.REJECTED,
+)
+ORDER_ARCHIVE_FIELDS = ('order_id', 'user_id', 'total_price', 'created_at', 'status', 'items', 'item_count')
+ORDER_ITEM_ARCHIVE_FIELDS = ('id', 'order_id', 'product_id', 'quantity', 'price')
+
+
+def archivable_orders(older_than=ORDER_ARCHIVE_AFTER):
+    """Orders that may be archived: final, old and already folded into recommendations and rollups."""
+    queued = CoOccurrenceBacklog.objects.filter(order_id=OuterRef('order_id'))
+    unfolded = SalesBacklog.objects.filter(order_id=OuterRef('order_id'))
+    return (
+        Order.objects
+        .filter(created_at__lt=timezone.now() - older_than, status__in=ORDER_ARCHIVE_STATUSES)
+        .filter(~Exists(queued), ~Exists(unfolded))
+    )
+
+
+def archive_orders(older_than=ORDER_ARCHIVE_AFTER, batch_size=ORDER_ARCHIVE_BATCH_SIZE, pause=0.0, dry_run=False):
+    """
+    Move archivable orders and their items to ArchivedOrder and
+    ArchivedOrderItem, ``batch_size`` orders per short transaction, walking
+    (created_at, order_id) from a keyset cursor; ``pause`` seconds are
+    slept between batches. Returns ``{"orders": n, "items": n, "batches": n,
+    "seconds": s}``.
+    """
+    started = time.monotonic()
+    candidates = archivable_orders(older_than)
+    report = {"orders": 0, "items": 0, "batches": 0}
+
+    for rows in keyset_batches(candidates, ('created_at', 'order_id'), batch_size, pause):
+        ids = [order_id for _, order_id in rows]
+        if dry_run:
+            moved = ids
+            items = OrderItem.objects.filter(order_id__in=ids).count()
+        else:
+            with transaction.atomic():
+                orders = list(candidates.filter(order_id__in=ids).values(*ORDER_ARCHIVE_FIELDS))
+                moved = [row['order_id'] for row in orders]
+                lines = list(OrderItem.objects.filter(order_id__in=moved).values(*ORDER_ITEM_ARCHIVE_FIELDS))
+                ArchivedOrder.objects.bulk_create([ArchivedOrder(**row) for row in orders])
+                ArchivedOrderItem.objects.bulk_create([ArchivedOrderItem(**row) for row in lines])
+                OrderItem.objects.filter(order_id__in=moved).delete()
+                Order.objects.filter(order_id__in=moved).delete()
+            invalidate_order_cache(row['user_id'] for row in orders)
+            items = len(lines)
+        report["orders"] += len(moved)
+        report["items"] += items
+        report["batches"] += 1
+
+    report["seconds"] = round(time.monotonic() - started, 3)
+    return report
@@ -0,0 +1,64 @@
+import time
+
+from django.db.models import Case, F, Q, Value, When
+
+# Rows per increment UPDATE; keeps the CASE and OR lists well inside
+# SQLite's expression limits.
+INCREMENT_BATCH_SIZE = 200
+
+
+def increment_rows(model, key_fields, columns, amounts, batch_size=INCREMENT_BATCH_SIZE):
+    """
+    Add ``amounts`` (``{key values: amount per column}``) to the ``columns``
+    (``{column name: output field}``) of the ``model`` rows identified by
+    ``key_fields``, which must be unique together. Missing rows are created
+    first with the model defaults; each batch is one INSERT ... ON CONFLICT
+    DO NOTHING and one UPDATE adding a CASE per column.
+    """
+    amounts = list(amounts.items())
+    for start in range(0, len(amounts), batch_size):
+        batch = amounts[start:start + batch_size]
+        model.objects.bulk_create(
+            [model(**dict(zip(key_fields, key))) for key, _ in batch],
+            ignore_conflicts=True,
+        )
+
+        whens, keys = {name: [] for name in columns}, Q()
+        for key, values in batch:
+            condition = Q(**dict(zip(key_fields, key)))
+            for name, value in zip(columns, values):
+                whens[name].append(When(condition, then=Value(value)))
+            keys |= condition
+        model.objects.filter(keys).update(**{
+            name: F(name) + Case(*whens[name], output_field=output_field)
+            for name, output_field in columns.items()
+        })
+
+
+def _after(fields, position):
+    """Rows strictly after ``position`` in ``fields`` order."""
+    name, value = fields[0], position[0]
+    if len(fields) == 1:
+        return Q(**{f"{name}__gt": value})
+    return Q(**{f"{name}__gt": value}) | Q(Q(**{name: value}), _after(fields[1:], position[1:]))
+
+
+def keyset_batches(queryset, fields, batch_size, pause=0.0):
+    """
+    Yield the rows of ``queryset`` as lists of ``fields`` tuples, at most
+    ``batch_size`` per list, walking ``fields`` (an ordering that ends in
+    the primary key) from a keyset cursor so every batch is an index range
+    scan. ``pause`` seconds are slept after each full batch.
+    """
+    position = None
+    while True:
+        batch = queryset.order_by(*fields)
+        if position is not None:
+            batch = batch.filter(_after(fields, position))
+        rows = list(batch.values_list(*fields)[:batch_size])
+        if not rows:
+            return
+        position = rows[-1]
+        yield rows
+        if pause and len(rows) == batch_size:
+            time.sleep(pause)
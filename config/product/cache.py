@@ -0,0 +1,229 @@
+import hashlib
+import json
+import time
+
+from django.core.cache import cache
+
+PRODUCT_LIST_CACHE_KEY = "product_list"
+PRODUCT_LIST_CACHE_TTL = 60 * 5
+PRODUCT_LIST_GENERATION_KEY = f"{PRODUCT_LIST_CACHE_KEY}:generation"
+
+# Entries are fresh for the soft TTL and are kept (and served stale while one
+# worker rebuilds them) until the hard TTL.
+PRODUCT_CACHE_HARD_TTL = 60 * 30
+PRODUCT_CACHE_LOCK_TTL = 30
+PRODUCT_CACHE_LOCK_WAIT = 1.0
+PRODUCT_CACHE_LOCK_POLL = 0.05
+PRODUCT_CACHE_STATS_KEY = "product_cache:stats"
+PRODUCT_CACHE_STATS_EVENTS = ("hit", "miss", "stale")
+
+PRODUCT_CATALOG_MODIFIED_KEY = "product_catalog:modified"
+PRODUCT_MODIFIED_KEY = "product:{}:modified"
+# Detail entries are keyed by the product's modification stamp, so a write
+# orphans them; their TTL must not outlive the stamps' (PRODUCT_CACHE_HARD_TTL).
+PRODUCT_DETAIL_CACHE_KEY = "product:{}:{}"
+PRODUCT_DETAIL_CACHE_TTL = 60 * 30
+
+
+def _incr(key, initial=0, delta=1):
+    try:
+        return cache.incr(key, delta)
+    except ValueError:
+        cache.add(key, initial, None)
+        return cache.incr(key, delta)
+
+
+def get_version(key):
+    """Current value of the version counter ``key``, used to namespace cache keys."""
+    version = cache.get(key)
+    if version is None:
+        # Seed from the clock so an evicted counter never restarts below
+        # versions still stored in cached entries.
+        cache.add(key, int(time.time() * 1000), None)
+        version = cache.get(key)
+    return version
+
+
+def bump_version(key):
+    """Advance the version counter ``key``, orphaning every entry built for the old one."""
+    return _incr(key, initial=int(time.time() * 1000))
+
+
+def get_list_generation():
+    return get_version(PRODUCT_LIST_GENERATION_KEY)
+
+
+def bump_list_generation():
+    """Invalidate every cached product list page at once."""
+    return bump_version(PRODUCT_LIST_GENERATION_KEY)
+
+
+def touch_products(product_ids=()):
+    """
+    Record a catalog write: bump the list generation and the catalog and
+    per-product modification stamps used for ETag/Last-Modified and for the
+    detail cache keys.
+    """
+    now = time.time()
+    bump_list_generation()
+    cache.set(PRODUCT_CATALOG_MODIFIED_KEY, now, None)
+    cache.set_many(
+        {PRODUCT_MODIFIED_KEY.format(pk): now for pk in product_ids},
+        PRODUCT_CACHE_HARD_TTL,
+    )
+
+
+def forget_products(product_ids):
+    """
+    Record the deletion of ``product_ids``: like touch_products, but their
+    stamps are dropped instead, so the products read as missing.
+    """
+    touch_products()
+    cache.delete_many([PRODUCT_MODIFIED_KEY.format(pk) for pk in product_ids])
+
+
+def refresh_products(product_ids):
+    """Record a stock change (checkout, cancel, queue, resharding) of ``product_ids``."""
+    touch_products(list(product_ids))
+
+
+def cache_product_details(items, stamps):
+    """
+    Cache serialized products under the ``stamps`` (``{id: stamp}``) read
+    before they were fetched. If a write lands in between, its new stamp
+    already points elsewhere and the entry is never read.
+    """
+    cache.set_many(
+        {PRODUCT_DETAIL_CACHE_KEY.format(item["id"], stamps[item["id"]]): dict(item) for item in items},
+        PRODUCT_DETAIL_CACHE_TTL,
+    )
+
+
+def get_cached_product_details(stamps, scope="detail"):
+    """Return ``{id: serialized product}`` for the ``{id: stamp}`` entries found in the detail cache."""
+    keys = {PRODUCT_DETAIL_CACHE_KEY.format(pk, stamp): pk for pk, stamp in stamps.items()}
+    found = {keys[key]: item for key, item in cache.get_many(list(keys)).items()}
+    if found:
+        record_cache_event(scope, "hit", len(found))
+    if len(found) < len(keys):
+        record_cache_event(scope, "miss", len(keys) - len(found))
+    return found
+
+
+def get_catalog_modified():
+    modified = cache.get(PRODUCT_CATALOG_MODIFIED_KEY)
+    if modified is None:
+        # Unknown after an eviction: assume it just changed.
+        modified = time.time()
+        cache.add(PRODUCT_CATALOG_MODIFIED_KEY, modified, None)
+        modified = cache.get(PRODUCT_CATALOG_MODIFIED_KEY, modified)
+    return modified
+
+
+def get_product_modified(pk):
+    """Modification stamp of one product, or None if it does not exist."""
+    return get_product_stamps([pk]).get(pk)
+
+
+def get_product_stamps(product_ids):
+    """``{id: modification stamp}`` for the ``product_ids`` that exist."""
+    keys = {PRODUCT_MODIFIED_KEY.format(pk): pk for pk in product_ids}
+    stamps = {keys[key]: modified for key, modified in cache.get_many(list(keys)).items()}
+    missing = [pk for pk in product_ids if pk not in stamps]
+    if missing:
+        from .models import Product
+
+        rows = Product.objects.filter(pk__in=missing).values_list("id", "updated_at", "created_at")
+        for pk, updated_at, created_at in rows:
+            # Rows written before updated_at existed fall back to created_at.
+            stamp = updated_at or created_at
+            stamps[pk] = stamp.timestamp() if stamp is not None else time.time()
+            cache.add(PRODUCT_MODIFIED_KEY.format(pk), stamps[pk], PRODUCT_CACHE_HARD_TTL)
+    return stamps
+
+
+def make_etag(*parts):
+    return '"%s"' % hashlib.md5("|".join(str(part) for part in parts).encode()).hexdigest()
+
+
+def normalize_list_query(query_params, param_names, search_param=None):
+    params = []
+    for name in sorted(set(param_names)):
+        values = []
+        for value in query_params.getlist(name):
+            value = " ".join(value.split())
+            if name == search_param:
+                value = value.lower()
+            if value:
+                values.append(value)
+        if values:
+            params.append([name, sorted(values)])
+    return json.dumps(params, separators=(",", ":"))
+
+
+def build_list_cache_key(request, param_names, search_param=None):
+    normalized = normalize_list_query(request.query_params, param_names, search_param)
+    digest = hashlib.md5(f"{request.get_host()}|{normalized}".encode()).hexdigest()
+    return f"{PRODUCT_LIST_CACHE_KEY}:{digest}"
+
+
+def record_cache_event(scope, event, count=1):
+    _incr(f"{PRODUCT_CACHE_STATS_KEY}:{scope}:{event}", delta=count)
+
+
+def get_cache_stats(scopes):
+    keys = {
+        f"{PRODUCT_CACHE_STATS_KEY}:{scope}:{event}": (scope, event)
+        for scope in scopes
+        for event in PRODUCT_CACHE_STATS_EVENTS
+    }
+    values = cache.get_many(list(keys))
+    stats = {scope: dict.fromkeys(PRODUCT_CACHE_STATS_EVENTS, 0) for scope in scopes}
+    for key, (scope, event) in keys.items():
+        stats[scope][event] = values.get(key, 0)
+    return stats
+
+
+def get_or_compute(key, compute, generation, scope,
+                   soft_ttl=PRODUCT_LIST_CACHE_TTL, hard_ttl=PRODUCT_CACHE_HARD_TTL):
+    """
+    Return ``(data, generation)`` for ``key``, rebuilding it with ``compute``
+    when needed. The returned generation is the one the data was built for.
+
+    Only the worker holding the recompute lock runs ``compute``; everyone
+    else keeps serving the stale entry (older generation or past its soft
+    TTL) until the new one lands.
+    """
+    entry = cache.get(key)
+    if entry is not None and entry["generation"] == generation and entry["fresh_until"] > time.time():
+        record_cache_event(scope, "hit")
+        return entry["data"], entry["generation"]
+
+    lock_key = f"{key}:lock"
+    if cache.add(lock_key, 1, PRODUCT_CACHE_LOCK_TTL):
+        try:
+            data = compute()
+            cache.set(
+                key,
+                {"data": data, "generation": generation, "fresh_until": time.time() + soft_ttl},
+                hard_ttl,
+            )
+        finally:
+            cache.delete(lock_key)
+        record_cache_event(scope, "miss")
+        return data, generation
+
+    if entry is not None:
+        record_cache_event(scope, "stale")
+        return entry["data"], entry["generation"]
+
+    deadline = time.time() + PRODUCT_CACHE_LOCK_WAIT
+    while time.time() < deadline:
+        time.sleep(PRODUCT_CACHE_LOCK_POLL)
+        entry = cache.get(key)
+        if entry is not None and entry["generation"] == generation:
+            record_cache_event(scope, "hit")
+            return entry["data"], entry["generation"]
+
+    record_cache_event(scope, "miss")
+    return compute(), generation
@@ -0,0 +1,408 @@
+import datetime
+import time
+import uuid
+from contextlib import contextmanager
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.exceptions import ImproperlyConfigured
+from django.db import transaction
+from django.db.models import Count, DecimalField, Exists, ExpressionWrapper, F, OuterRef, Q, Subquery, Sum
+from django.utils import timezone
+from django.utils.module_loading import import_string
+from rest_framework import serializers, status
+from rest_framework.exceptions import APIException
+
+from .bulk import keyset_batches
+from .models import Cart, CartItem, Product
+
+CART_BATCH_MAX_ITEMS = 100
+
+CART_SUMMARY_CACHE_KEY = "cart_summary:{}"
+# Own cart writes and checkout drop the entry; the TTL bounds how long a
+# price or stock change made elsewhere can go unnoticed.
+CART_SUMMARY_CACHE_TTL = 60
+CART_MONEY = DecimalField(max_digits=12, decimal_places=2)
+
+CART_CACHE_KEY = "cart:{}"
+CART_CACHE_TTL = 60 * 60 * 24
+# Cache-resident carts are also written to the database when they change
+# after going this long unpersisted.
+CART_PERSIST_INTERVAL = 60 * 5
+# Changes to a cache-resident cart are serialized by a per-user lock.
+CART_LOCK_TTL = 10
+CART_LOCK_WAIT = 2.0
+CART_LOCK_POLL = 0.02
+
+CART_IDLE_TIMEOUT = datetime.timedelta(days=30)
+CART_EXPIRY_BATCH_SIZE = 500
+
+
+def get_cart_id(user, lock=False):
+    """Return the id of ``user``'s cart, creating the cart on first use."""
+    carts = Cart.objects.filter(user=user).order_by('id')
+    if lock:
+        carts = carts.select_for_update()
+    cart_id = carts.values_list('id', flat=True).first()
+    if cart_id is None:
+        cart_id = Cart.objects.create(user=user).pk
+    return cart_id
+
+
+def resolve_quantities(quantities, found, replace=False):
+    """
+    Work out the new cart quantities for ``{product_id: quantity}``, given
+    ``found`` as ``{product_id: (stock, quantity already in the cart)}``.
+    Raises ValidationError unless every product exists and has the stock.
+    """
+    errors, final = {}, {}
+    for product_id, quantity in quantities.items():
+        if product_id not in found:
+            errors[str(product_id)] = ["Product does not exist."]
+            continue
+        stock, current = found[product_id]
+        if not replace:
+            quantity += current
+        if quantity > stock:
+            errors[str(product_id)] = [f"Only {stock} items available in stock."]
+        final[product_id] = quantity
+    if errors:
+        raise serializers.ValidationError(errors)
+    return final
+
+
+def set_cart_items(user, quantities, replace=False):
+    """
+    Add ``{product_id: quantity}`` to ``user``'s cart, or set those
+    quantities when ``replace``, with one stock-check query and one upsert.
+    The cart row is locked so concurrent changes to the same cart queue up.
+    Raises ValidationError, writing nothing, if any product is unknown or
+    would end up with more in the cart than in stock. Returns the cart id.
+    """
+    with transaction.atomic():
+        cart_id = get_cart_id(user, lock=True)
+        in_cart = CartItem.objects.filter(cart_id=cart_id, product=OuterRef('pk')).values('quantity')
+        rows = (
+            Product.objects
+            .filter(id__in=list(quantities))
+            .annotate(in_cart=Subquery(in_cart))
+            .values_list('id', 'stock', 'in_cart')
+        )
+        found = {product_id: (stock, current or 0) for product_id, stock, current in rows}
+
+        final = resolve_quantities(quantities, found, replace)
+        items = [
+            CartItem(cart_id=cart_id, product_id=product_id, quantity=quantity)
+            for product_id, quantity in final.items()
+        ]
+
+        CartItem.objects.bulk_create(
+            items,
+            update_conflicts=True,
+            unique_fields=['cart', 'product'],
+            update_fields=['quantity', 'updated_at'],
+        )
+    return cart_id
+
+
+def add_cart_item(user, product_id, quantity):
+    """
+    Add ``quantity`` of a product to ``user``'s cart. A product already in
+    the cart is bumped with a single ``quantity = quantity + n`` UPDATE,
+    guarded so the result never exceeds the stock; anything else (new line,
+    not enough stock) goes through set_cart_items. Returns the cart id.
+    """
+    cart_id = get_cart_id(user)
+    bumped = (
+        CartItem.objects
+        .filter(cart_id=cart_id, product_id=product_id, product__stock__gte=F('quantity') + quantity)
+        .update(quantity=F('quantity') + quantity, updated_at=timezone.now())
+    )
+    if not bumped:
+        cart_id = set_cart_items(user, {product_id: quantity})
+    return cart_id
+
+
+def _money(value):
+    return str((value or Decimal(0)).quantize(Decimal("0.01")))
+
+
+def _empty_summary(cart_id):
+    return {
+        "cart_id": cart_id, "items": [], "item_count": 0, "total_quantity": 0,
+        "total": _money(None), "warnings": [],
+    }
+
+
+def _add_summary_line(summary, item_id, product_id, name, price, stock, quantity, total):
+    summary["items"].append({
+        "id": item_id, "product_id": product_id, "product": name, "price": _money(price),
+        "quantity": quantity, "line_total": _money(total), "available": stock,
+    })
+    if quantity > stock:
+        summary["warnings"].append({
+            "product_id": product_id, "product": name, "requested": quantity, "available": stock,
+            "detail": f"Only {stock} items available in stock.",
+        })
+
+
+def build_cart_summary(user):
+    """
+    Items, line totals, grand total and stock warnings of ``user``'s cart.
+    The totals come from one aggregate query.
+    """
+    cart_id = Cart.objects.filter(user=user).order_by('id').values_list('id', flat=True).first()
+    summary = _empty_summary(cart_id)
+    if cart_id is None:
+        return summary
+
+    items = CartItem.objects.filter(cart_id=cart_id)
+    line_total = ExpressionWrapper(F('quantity') * F('product__price'), output_field=CART_MONEY)
+    rows = (
+        items
+        .annotate(line_total=line_total)
+        .order_by('id')
+        .values_list('id', 'product_id', 'product__name', 'product__price',
+                     'product__stock', 'quantity', 'line_total')
+    )
+    for row in rows:
+        _add_summary_line(summary, *row)
+
+    totals = items.aggregate(
+        item_count=Count('id'),
+        total_quantity=Sum('quantity'),
+        total=Sum(line_total),
+    )
+    summary["item_count"] = totals["item_count"]
+    summary["total_quantity"] = totals["total_quantity"] or 0
+    summary["total"] = _money(totals["total"])
+    return summary
+
+
+def summarize_quantities(cart_id, quantities):
+    """Cart summary for ``{product_id: quantity}`` held outside CartItem, from one product query."""
+    summary = _empty_summary(cart_id)
+    rows = Product.objects.filter(id__in=list(quantities)).order_by('id').values_list('id', 'name', 'price', 'stock')
+    total = Decimal(0)
+    for product_id, name, price, stock in rows:
+        quantity = quantities[product_id]
+        _add_summary_line(summary, product_id, product_id, name, price, stock, quantity, price * quantity)
+        summary["item_count"] += 1
+        summary["total_quantity"] += quantity
+        total += price * quantity
+    summary["total"] = _money(total)
+    return summary
+
+
+def get_cart_summary(user):
+    key = CART_SUMMARY_CACHE_KEY.format(user.pk)
+    summary = cache.get(key)
+    if summary is None:
+        summary = get_cart_backend().summary(user)
+        cache.set(key, summary, CART_SUMMARY_CACHE_TTL)
+    return summary
+
+
+def invalidate_cart_summary(user_id):
+    cache.delete(CART_SUMMARY_CACHE_KEY.format(user_id))
+
+
+def expire_idle_carts(idle_for=CART_IDLE_TIMEOUT, batch_size=CART_EXPIRY_BATCH_SIZE, pause=0.0, dry_run=False):
+    """
+    Delete carts created more than ``idle_for`` ago whose lines have not
+    changed since, ``batch_size`` carts per short transaction. Carts are
+    walked in (created_at, id) order from a keyset cursor, so each batch
+    is an index range scan and no long lock is ever held; ``pause``
+    seconds are slept between batches. Returns
+    ``{"carts": n, "items": n, "batches": n, "seconds": s}``.
+    """
+    started = time.monotonic()
+    cutoff = timezone.now() - idle_for
+    # A line without a stamp has unknown activity and keeps its cart.
+    recent_lines = CartItem.objects.filter(
+        Q(updated_at__gte=cutoff) | Q(updated_at__isnull=True), cart=OuterRef('pk')
+    )
+    idle = Cart.objects.filter(created_at__lt=cutoff).filter(~Exists(recent_lines))
+    report = {"carts": 0, "items": 0, "batches": 0}
+
+    for rows in keyset_batches(idle, ('created_at', 'id'), batch_size, pause):
+        ids = [cart_id for _, cart_id in rows]
+        if dry_run:
+            report["carts"] += len(ids)
+            report["items"] += CartItem.objects.filter(cart_id__in=ids).count()
+        else:
+            with transaction.atomic():
+                # Re-checked here so a cart touched since the scan survives.
+                _, deleted = idle.filter(id__in=ids).delete()
+            report["carts"] += deleted.get(Cart._meta.label, 0)
+            report["items"] += deleted.get(CartItem._meta.label, 0)
+        report["batches"] += 1
+
+    report["seconds"] = round(time.monotonic() - started, 3)
+    return report
+
+
+class DatabaseCartBackend:
+    """Cart lines are CartItem rows; every change is written straight away."""
+
+    keeps_rows = True
+
+    def add_item(self, user, product_id, quantity):
+        cart_id = add_cart_item(user, product_id, quantity)
+        return CartItem.objects.select_related('cart', 'product').get(cart_id=cart_id, product_id=product_id)
+
+    def set_items(self, user, quantities, replace=False):
+        cart_id = set_cart_items(user, quantities, replace=replace)
+        return list(
+            CartItem.objects
+            .filter(cart_id=cart_id, product_id__in=list(quantities))
+            .select_related('cart', 'product')
+            .order_by('id')
+        )
+
+    def remove_item(self, user, item):
+        item.delete()
+
+    def summary(self, user):
+        return build_cart_summary(user)
+
+    def persist(self, user):
+        pass
+
+    def forget(self, user):
+        pass
+
+
+class CartBusy(APIException):
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = "The cart is being changed by another request, please retry."
+    default_code = "cart_busy"
+
+
+class CacheCartBackend:
+    """
+    Cart lines live in the cache as ``{product_id: quantity}`` per user and
+    reach Cart/CartItem only at checkout, or when the cart has gone
+    CART_PERSIST_INTERVAL without being written, so losing the entry loses
+    little. Line ids are the product ids.
+
+    Every read-modify-write of an entry holds a per-user ``cache.add``
+    lock, and the cache must be shared by all workers: a process-local
+    cache would give each worker its own cart.
+    """
+
+    keeps_rows = False
+
+    def __init__(self):
+        if isinstance(caches['default'], (LocMemCache, DummyCache)):
+            raise ImproperlyConfigured(
+                "CacheCartBackend needs a cache shared by all workers (e.g. REDIS_URL); "
+                f"the default cache is {type(caches['default']).__name__}."
+            )
+
+    def _key(self, user):
+        return CART_CACHE_KEY.format(user.pk)
+
+    @contextmanager
+    def _locked(self, user):
+        lock_key = f"{self._key(user)}:lock"
+        token = uuid.uuid4().hex
+        deadline = time.monotonic() + CART_LOCK_WAIT
+        while not cache.add(lock_key, token, CART_LOCK_TTL):
+            if time.monotonic() >= deadline:
+                raise CartBusy()
+            time.sleep(CART_LOCK_POLL)
+        try:
+            yield
+        finally:
+            if cache.get(lock_key) == token:
+                cache.delete(lock_key)
+
+    def _load(self, user):
+        entry = cache.get(self._key(user))
+        if entry is None:
+            cart_id = Cart.objects.filter(user=user).order_by('id').values_list('id', flat=True).first()
+            items = dict(CartItem.objects.filter(cart_id=cart_id).values_list('product_id', 'quantity'))
+            entry = {"cart_id": cart_id, "items": items, "persisted_at": time.time()}
+        return entry
+
+    def _store(self, user, entry):
+        if time.time() - entry["persisted_at"] > CART_PERSIST_INTERVAL:
+            self._write_rows(user, entry)
+        cache.set(self._key(user), entry, CART_CACHE_TTL)
+
+    def _write_rows(self, user, entry):
+        items = entry["items"]
+        with transaction.atomic():
+            cart_id = get_cart_id(user, lock=True)
+            CartItem.objects.filter(cart_id=cart_id).exclude(product_id__in=list(items)).delete()
+            CartItem.objects.bulk_create(
+                [CartItem(cart_id=cart_id, product_id=pk, quantity=quantity) for pk, quantity in items.items()],
+                update_conflicts=True,
+                unique_fields=['cart', 'product'],
+                update_fields=['quantity', 'updated_at'],
+            )
+        entry["cart_id"], entry["persisted_at"] = cart_id, time.time()
+
+    def _lines(self, entry, names):
+        return [
+            CartItem(id=pk, cart_id=entry["cart_id"], product=Product(id=pk, name=names[pk]),
+                     quantity=entry["items"][pk])
+            for pk in names
+        ]
+
+    def list_items(self, user):
+        entry = self._load(user)
+        names = dict(Product.objects.filter(id__in=list(entry["items"])).order_by('id').values_list('id', 'name'))
+        return self._lines(entry, names)
+
+    def get_item(self, user, item_id):
+        return next((item for item in self.list_items(user) if item.pk == item_id), None)
+
+    def set_items(self, user, quantities, replace=False):
+        with self._locked(user):
+            entry = self._load(user)
+            rows = Product.objects.filter(id__in=list(quantities)).order_by('id').values_list('id', 'name', 'stock')
+            names, found = {}, {}
+            for product_id, name, stock in rows:
+                names[product_id] = name
+                found[product_id] = (stock, entry["items"].get(product_id, 0))
+            entry["items"].update(resolve_quantities(quantities, found, replace))
+            self._store(user, entry)
+        return self._lines(entry, names)
+
+    def add_item(self, user, product_id, quantity):
+        return self.set_items(user, {product_id: quantity})[0]
+
+    def remove_item(self, user, item):
+        with self._locked(user):
+            entry = self._load(user)
+            entry["items"].pop(item.product_id, None)
+            self._store(user, entry)
+
+    def summary(self, user):
+        entry = self._load(user)
+        return summarize_quantities(entry["cart_id"], entry["items"])
+
+    def persist(self, user):
+        with self._locked(user):
+            entry = cache.get(self._key(user))
+            if entry is not None:
+                self._write_rows(user, entry)
+                cache.set(self._key(user), entry, CART_CACHE_TTL)
+
+    def forget(self, user):
+        # Runs after checkout commits. Taking the lock keeps a racing change
+        # from storing the old lines back; if it cannot be had, delete anyway.
+        try:
+            with self._locked(user):
+                cache.delete(self._key(user))
+        except CartBusy:
+            cache.delete(self._key(user))
+
+
+def get_cart_backend():
+    return import_string(settings.CART_BACKEND)()
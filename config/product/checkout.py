@@ -0,0 +1,245 @@
+import random
+import time
+from collections import Counter
+
+from django.db import OperationalError, transaction
+from django.db.models import Case, F, IntegerField, Value, When
+from django.utils import timezone
+from rest_framework import serializers
+
+from .analytics import queue_for_rollups
+from .cache import refresh_products
+from .cart import get_cart_backend
+from .inventory import get_stock_shards, get_stock_totals, return_to_shards, take_from_shards
+from .models import Cart, CartItem, Order, OrderItem, Product
+from .order_cache import invalidate_order_cache
+from .recommendations import queue_for_recommendations
+
+# Checkouts take no row locks up front, so a conflicting writer surfaces as
+# an OperationalError (SQLite "database is locked", deadlock or
+# serialization failure elsewhere); the whole checkout is then retried.
+CHECKOUT_RETRIES = 3
+CHECKOUT_RETRY_BACKOFF = 0.05
+
+
+class InsufficientStock(Exception):
+    pass
+
+
+def quantity_case(quantities):
+    return Case(
+        *[When(id=product_id, then=Value(quantity)) for product_id, quantity in quantities.items()],
+        output_field=IntegerField(),
+    )
+
+
+def _split_sharded(quantities, shards):
+    if shards is None:
+        shards = get_stock_shards(quantities)
+    plain = {pk: quantity for pk, quantity in quantities.items() if not shards.get(pk)}
+    sharded = {pk: quantity for pk, quantity in quantities.items() if shards.get(pk)}
+    return plain, sharded, shards
+
+
+def decrement_stock(quantities, shards=None):
+    """
+    Take ``{product_id: quantity}`` out of stock: one guarded UPDATE for
+    plain products, one per sharded product (``shards`` maps sharded ids to
+    their shard count; looked up when omitted). Raises InsufficientStock
+    (and rolls everything back) unless every product had enough.
+    """
+    plain, sharded, shards = _split_sharded(quantities, shards)
+    with transaction.atomic():
+        if plain:
+            quantity = quantity_case(plain)
+            updated = (
+                Product.objects
+                .filter(id__in=list(plain), stock__gte=quantity)
+                .update(stock=F('stock') - quantity, updated_at=timezone.now())
+            )
+            if updated != len(plain):
+                raise InsufficientStock()
+        for product_id, quantity in sharded.items():
+            if not take_from_shards(product_id, shards[product_id], quantity):
+                raise InsufficientStock()
+
+
+def restore_stock(quantities, shards=None):
+    """Put ``{product_id: quantity}`` back into stock with one UPDATE per storage kind."""
+    plain, sharded, shards = _split_sharded(quantities, shards)
+    if plain:
+        quantity = quantity_case(plain)
+        Product.objects.filter(id__in=list(plain)).update(
+            stock=F('stock') + quantity, updated_at=timezone.now()
+        )
+    if sharded:
+        return_to_shards(sharded, shards)
+
+
+def insufficient_stock_error(quantities):
+    # Product.stock of a sharded product is only refreshed periodically.
+    live = get_stock_totals(quantities)
+    for product in Product.objects.filter(id__in=list(quantities)).order_by('id'):
+        available = live.get(product.id, product.stock)
+        if available < quantities[product.id]:
+            return serializers.ValidationError(
+                f"Not enough stock for {product.name}. "
+                f"Available: {available}, Requested: {quantities[product.id]}"
+            )
+    return serializers.ValidationError("Not enough stock for one of the products in the cart.")
+
+
+def read_cart(user):
+    """Return the cart's ``(item_id, product_id, quantity)`` rows and the per-product quantities."""
+    # A cache-resident cart is written to CartItem first.
+    get_cart_backend().persist(user)
+    # The user's oldest cart, the one get_cart_id writes to.
+    cart_id = Cart.objects.filter(user=user).order_by('id').values_list('id', flat=True).first()
+    if cart_id is None:
+        raise serializers.ValidationError("Cart does not exist.")
+
+    cart_items = list(CartItem.objects.filter(cart_id=cart_id).values_list('id', 'product_id', 'quantity'))
+    if not cart_items:
+        raise serializers.ValidationError("Cart is empty, cannot create order.")
+
+    quantities = Counter()
+    for _, product_id, quantity in cart_items:
+        quantities[product_id] += quantity
+    return cart_items, quantities
+
+
+def read_prices(product_ids):
+    """
+    Return ``({product_id: price}, {product_id: shard count}, {product_id:
+    name})`` for ``product_ids``.
+    """
+    prices, shards, names = {}, {}, {}
+    for product_id, price, stock_shards, name in (
+        Product.objects.filter(id__in=list(product_ids)).values_list('id', 'price', 'stock_shards', 'name')
+    ):
+        prices[product_id] = price
+        names[product_id] = name
+        if stock_shards:
+            shards[product_id] = stock_shards
+    return prices, shards, names
+
+
+def order_lines(cart_items, prices, names):
+    """The ``Order.items`` snapshot for ``cart_items``, in API representation."""
+    return [
+        {
+            'product_id': product_id,
+            'product_name': names[product_id],
+            'quantity': quantity,
+            'price': f'{prices[product_id]:f}',
+        }
+        for _, product_id, quantity in cart_items
+    ]
+
+
+def create_order(user, cart_items, prices, names, status=Order.StatusChoices.PENDING):
+    """Write the order and its items for ``cart_items`` and empty those cart items."""
+    order = Order.objects.create(
+        user=user,
+        total_price=sum(prices[product_id] * quantity for _, product_id, quantity in cart_items),
+        status=status,
+        items=order_lines(cart_items, prices, names),
+        item_count=sum(quantity for _, _, quantity in cart_items),
+    )
+    OrderItem.objects.bulk_create(
+        OrderItem(order=order, product_id=product_id, quantity=quantity, price=prices[product_id])
+        for _, product_id, quantity in cart_items
+    )
+    CartItem.objects.filter(id__in=[item_id for item_id, _, _ in cart_items]).delete()
+    transaction.on_commit(lambda: get_cart_backend().forget(user))
+    transaction.on_commit(lambda: invalidate_order_cache([user.pk]))
+    return order
+
+
+def _place_order(user):
+    cart_items, quantities = read_cart(user)
+    prices, shards, names = read_prices(quantities)
+
+    order = create_order(user, cart_items, prices, names)
+    queue_for_rollups([order.pk], 'ordered')
+
+    # Stock is the last write, so the product rows stay locked only from
+    # this UPDATE to the commit; running short rolls the order back.
+    try:
+        decrement_stock(quantities, shards)
+    except InsufficientStock:
+        raise insufficient_stock_error(quantities)
+
+    product_ids = list(quantities)
+    transaction.on_commit(lambda: refresh_products(product_ids))
+    return order
+
+
+def place_order(user, retries=CHECKOUT_RETRIES):
+    """
+    Turn ``user``'s cart into an order in one short transaction: the cart
+    is read inside it, the order is written, and stock is taken last with
+    guarded UPDATEs (a single one for all unsharded products) instead of
+    SELECT ... FOR UPDATE plus one save per product.
+
+    Transient lock conflicts are retried ``retries`` times with jittered
+    backoff; inside an outer transaction the conflict is raised instead.
+    """
+    if transaction.get_connection().in_atomic_block:
+        retries = 0
+
+    for attempt in range(retries + 1):
+        try:
+            with transaction.atomic():
+                return _place_order(user)
+        except OperationalError:
+            if attempt == retries:
+                raise
+            time.sleep(CHECKOUT_RETRY_BACKOFF * (2 ** attempt) * random.uniform(0.5, 1.5))
+
+
+def ordered_quantities(order_ids):
+    """Return ``{product_id: quantity}`` summed over the items of ``order_ids``."""
+    quantities = Counter()
+    for product_id, quantity in (
+        OrderItem.objects.filter(order_id__in=list(order_ids)).values_list('product_id', 'quantity')
+    ):
+        quantities[product_id] += quantity
+    return quantities
+
+
+def lock_pending_orders(order_ids):
+    """Lock the still-pending orders among ``order_ids`` and return their ids."""
+    return list(
+        Order.objects
+        .select_for_update()
+        .filter(order_id__in=list(order_ids), status=Order.StatusChoices.PENDING)
+        .order_by('order_id')
+        .values_list('order_id', flat=True)
+    )
+
+
+def transition_orders(order_ids, status):
+    """
+    Move the pending orders among ``order_ids`` to ``status`` in one
+    transaction and return the ids that moved. Cancelling puts the stock of
+    all those orders back with one restore, aggregated per product.
+    """
+    with transaction.atomic():
+        pending = lock_pending_orders(order_ids)
+        if not pending:
+            return []
+        Order.objects.filter(order_id__in=pending).update(status=status)
+        user_ids = list(Order.objects.filter(order_id__in=pending).values_list('user_id', flat=True).distinct())
+        transaction.on_commit(lambda: invalidate_order_cache(user_ids))
+        queue_for_rollups(pending, 'paid' if status == Order.StatusChoices.COMPLETED else 'canceled')
+        if status == Order.StatusChoices.COMPLETED:
+            queue_for_recommendations(pending)
+
+        if status == Order.StatusChoices.CANCELED:
+            quantities = ordered_quantities(pending)
+            if quantities:
+                restore_stock(quantities)
+                product_ids = list(quantities)
+                transaction.on_commit(lambda: refresh_products(product_ids))
+    return pending
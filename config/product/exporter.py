@@ -0,0 +1,74 @@
+import csv
+import datetime
+import itertools
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import QuerySet
+from django.http import StreamingHttpResponse
+
+EXPORT_FORMATS = ("csv", "ndjson")
+EXPORT_CHUNK_SIZE = 2000
+EXPORT_CONTENT_TYPES = {
+    "csv": "text/csv; charset=utf-8",
+    "ndjson": "application/x-ndjson",
+}
+
+PRODUCT_EXPORT_FIELDS = ["id", "name", "description", "price", "stock", "created_at", "updated_at"]
+ORDER_EXPORT_FIELDS = ["order_id", "user_id", "user__username", "status", "total_price", "created_at"]
+
+
+class _Echo:
+    """File-like object that hands back what csv.writer writes to it."""
+
+    def write(self, value):
+        return value
+
+
+class _ExportEncoder(DjangoJSONEncoder):
+    def default(self, o):
+        # Keep full microsecond precision, unlike DjangoJSONEncoder.
+        if isinstance(o, datetime.datetime):
+            return o.isoformat()
+        return super().default(o)
+
+
+def _csv_value(value):
+    if isinstance(value, datetime.datetime):
+        return value.isoformat()
+    return value
+
+
+def iter_export(queryset, fields, file_format, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Yield the export in text chunks of ``chunk_size`` rows. Rows come from
+    ``values_list().iterator()``, so no model instances are built and memory
+    stays flat regardless of the number of rows. ``queryset`` may also be a
+    list of querysets (a table and its archive), exported one after another.
+    """
+    querysets = [queryset] if isinstance(queryset, QuerySet) else queryset
+    rows = itertools.chain.from_iterable(
+        qs.values_list(*fields).iterator(chunk_size=chunk_size) for qs in querysets
+    )
+    writer = csv.writer(_Echo())
+    buffer = [writer.writerow(fields)] if file_format == "csv" else []
+
+    for row in rows:
+        if file_format == "csv":
+            buffer.append(writer.writerow([_csv_value(value) for value in row]))
+        else:
+            buffer.append(json.dumps(dict(zip(fields, row)), cls=_ExportEncoder) + "\n")
+        if len(buffer) >= chunk_size:
+            yield "".join(buffer)
+            buffer = []
+    if buffer:
+        yield "".join(buffer)
+
+
+def export_response(queryset, fields, file_format, filename):
+    response = StreamingHttpResponse(
+        iter_export(queryset, fields, file_format),
+        content_type=EXPORT_CONTENT_TYPES[file_format],
+    )
+    response["Content-Disposition"] = f'attachment; filename="{filename}.{file_format}"'
+    return response
@@ -0,0 +1,102 @@
+import functools
+import hashlib
+import json
+
+from django.core.cache import cache
+from rest_framework import status
+from rest_framework.response import Response
+
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+IDEMPOTENCY_REPLAYED_HEADER = "Idempotent-Replayed"
+IDEMPOTENCY_KEY_MAX_LENGTH = 255
+IDEMPOTENCY_CACHE_KEY = "idempotency:{}"
+IDEMPOTENCY_TTL = 60 * 60 * 24
+IDEMPOTENCY_LOCK_TTL = 30
+# Response headers stored with the body and sent again on replay.
+IDEMPOTENCY_STORED_HEADERS = ("Location", "Retry-After")
+
+
+def _fingerprint(request):
+    data = request.data
+    if hasattr(data, "lists"):
+        data = sorted(data.lists())
+    payload = json.dumps(data, sort_keys=True, default=str)
+    return hashlib.md5(f"{request.method}|{request.path}|{payload}".encode()).hexdigest()
+
+
+def _replay(entry):
+    response = Response(entry["data"], status=entry["status"], headers=entry.get("headers"))
+    response[IDEMPOTENCY_REPLAYED_HEADER] = "true"
+    return response
+
+
+def _mismatch():
+    return Response(
+        {"detail": f"{IDEMPOTENCY_HEADER} was already used for a different request."},
+        status=status.HTTP_422_UNPROCESSABLE_ENTITY,
+    )
+
+
+def idempotent(view_method):
+    """
+    Honour an ``Idempotency-Key`` header on a view method. The first
+    response (below 500) is stored per user and key for IDEMPOTENCY_TTL and
+    replayed to retries without running the view again; a retry arriving
+    while the first request is still running gets 409. Reusing a key for a
+    different request gets 422. Errors raised as exceptions are not stored,
+    so their retries run again. Requests without the header run as usual.
+    """
+    @functools.wraps(view_method)
+    def wrapper(self, request, *args, **kwargs):
+        key = request.headers.get(IDEMPOTENCY_HEADER)
+        if not key:
+            return view_method(self, request, *args, **kwargs)
+        if len(key) > IDEMPOTENCY_KEY_MAX_LENGTH:
+            return Response(
+                {"detail": f"{IDEMPOTENCY_HEADER} must be at most {IDEMPOTENCY_KEY_MAX_LENGTH} characters."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        digest = hashlib.md5(f"{request.user.pk}|{key}".encode()).hexdigest()
+        cache_key = IDEMPOTENCY_CACHE_KEY.format(digest)
+        lock_key = f"{cache_key}:lock"
+        fingerprint = _fingerprint(request)
+
+        entry = cache.get(cache_key)
+        if entry is None:
+            if not cache.add(lock_key, fingerprint, IDEMPOTENCY_LOCK_TTL):
+                if cache.get(lock_key) not in (None, fingerprint):
+                    return _mismatch()
+                return Response(
+                    {"detail": f"A request with this {IDEMPOTENCY_HEADER} is still in progress."},
+                    status=status.HTTP_409_CONFLICT,
+                )
+            # It may have finished between the first read and taking the lock.
+            entry = cache.get(cache_key)
+            if entry is not None:
+                cache.delete(lock_key)
+        if entry is not None:
+            if entry["fingerprint"] != fingerprint:
+                return _mismatch()
+            return _replay(entry)
+
+        try:
+            response = view_method(self, request, *args, **kwargs)
+            if response.status_code < 500 and response.status_code != status.HTTP_429_TOO_MANY_REQUESTS:
+                cache.set(
+                    cache_key,
+                    {
+                        "fingerprint": fingerprint,
+                        "status": response.status_code,
+                        "data": response.data,
+                        "headers": {
+                            name: response[name] for name in IDEMPOTENCY_STORED_HEADERS if name in response
+                        },
+                    },
+                    IDEMPOTENCY_TTL,
+                )
+        finally:
+            cache.delete(lock_key)
+        return response
+
+    return wrapper
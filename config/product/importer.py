@@ -0,0 +1,123 @@
+import csv
+import json
+from itertools import islice
+
+from django.db import transaction
+from rest_framework import serializers
+
+from .cache import touch_products
+from .inventory import shard_stock
+from .models import Product
+from .serializers import ProductSerializer
+
+IMPORT_FORMATS = ("csv", "ndjson")
+IMPORT_CHUNK_SIZE = 1000
+IMPORT_MAX_ERRORS = 1000
+IMPORT_UPDATE_FIELDS = ["name", "description", "price", "stock", "updated_at"]
+
+
+def detect_format(filename):
+    if filename.endswith(".csv"):
+        return "csv"
+    if filename.endswith((".ndjson", ".jsonl")):
+        return "ndjson"
+    return None
+
+
+def read_rows(stream, file_format):
+    """Yield ``(line_number, row)`` pairs without loading the whole file."""
+    if file_format == "csv":
+        reader = csv.DictReader(stream)
+        for row in reader:
+            yield reader.line_num, row
+        return
+
+    for line_number, line in enumerate(stream, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError as exc:
+            yield line_number, exc
+            continue
+        yield line_number, row
+
+
+def _parse_id(value):
+    if value in (None, ""):
+        return None
+    try:
+        pk = int(value)
+    except (TypeError, ValueError):
+        raise serializers.ValidationError({"id": ["A valid integer is required."]})
+    if pk < 1:
+        raise serializers.ValidationError({"id": ["Ensure this value is greater than 0."]})
+    return pk
+
+
+def import_products(stream, file_format, chunk_size=IMPORT_CHUNK_SIZE, max_errors=IMPORT_MAX_ERRORS):
+    """
+    Validate and upsert products from a CSV or NDJSON stream, ``chunk_size``
+    rows per transaction. Rows with an ``id`` update that product (or create
+    it under that id); rows without one are inserted. Caches are invalidated
+    once, after the last chunk.
+    """
+    if file_format not in IMPORT_FORMATS:
+        raise ValueError(f"Unsupported import format: {file_format}")
+
+    report = {"rows": 0, "created": 0, "updated": 0, "failed": 0, "errors": []}
+    updated_ids = []
+    # One serializer validates every row instead of rebuilding fields per row.
+    validator = ProductSerializer()
+    rows = read_rows(stream, file_format)
+
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            break
+
+        with_pk, without_pk = {}, []
+        for line_number, row in chunk:
+            report["rows"] += 1
+            try:
+                if not isinstance(row, dict):
+                    raise serializers.ValidationError({"non_field_errors": [f"Invalid row: {row}"]})
+                pk = _parse_id(row.get("id"))
+                data = validator.run_validation(row)
+            except serializers.ValidationError as exc:
+                report["failed"] += 1
+                if len(report["errors"]) < max_errors:
+                    report["errors"].append({"line": line_number, "errors": exc.detail})
+                continue
+            if pk:
+                with_pk[pk] = Product(id=pk, **data)
+            else:
+                without_pk.append(Product(**data))
+
+        with transaction.atomic():
+            if with_pk:
+                existing = dict(
+                    Product.objects
+                    .filter(id__in=list(with_pk))
+                    .values_list("id", "stock_shards")
+                )
+                Product.objects.bulk_create(
+                    list(with_pk.values()),
+                    update_conflicts=True,
+                    unique_fields=["id"],
+                    update_fields=IMPORT_UPDATE_FIELDS,
+                )
+                for pk, shards in existing.items():
+                    if shards:
+                        shard_stock(pk, shards, total=with_pk[pk].stock)
+                updated_ids.extend(existing)
+                report["updated"] += len(existing)
+                report["created"] += len(with_pk) - len(existing)
+            if without_pk:
+                Product.objects.bulk_create(without_pk)
+                report["created"] += len(without_pk)
+
+    if report["created"] or report["updated"]:
+        touch_products(updated_ids)
+    return report
@@ -0,0 +1,147 @@
+import random
+from functools import reduce
+from operator import or_
+
+from django.db import transaction
+from django.db.models import Case, F, IntegerField, OuterRef, Q, Subquery, Sum, Value, When
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .models import Product, StockShard
+
+# Hot products can keep their inventory in several StockShard rows so that
+# concurrent checkouts update different rows instead of queueing on one.
+STOCK_SHARDS_MAX = 64
+
+
+def get_stock_shards(product_ids):
+    """Return ``{product_id: shard count}`` for the sharded products among ``product_ids``."""
+    return dict(
+        Product.objects
+        .filter(id__in=list(product_ids), stock_shards__gt=0)
+        .values_list('id', 'stock_shards')
+    )
+
+
+def _case(column, amounts):
+    return Case(
+        *[When(**{column: key}, then=Value(amount)) for key, amount in amounts.items()],
+        output_field=IntegerField(),
+    )
+
+
+def take_from_shards(product_id, shards, quantity):
+    """
+    Take ``quantity`` of a sharded product. Shards are tried one at a time
+    with a guarded UPDATE, starting from a random one; when no single shard
+    holds enough, the shards are locked and drained in index order. Returns
+    False, having taken nothing, if all shards together hold too little.
+    """
+    start = random.randrange(shards)
+    for offset in range(shards):
+        updated = (
+            StockShard.objects
+            .filter(product_id=product_id, index=(start + offset) % shards, stock__gte=quantity)
+            .update(stock=F('stock') - quantity)
+        )
+        if updated:
+            return True
+
+    rows = list(
+        StockShard.objects
+        .select_for_update()
+        .filter(product_id=product_id, stock__gt=0)
+        .order_by('index')
+        .values_list('id', 'stock')
+    )
+    if sum(stock for _, stock in rows) < quantity:
+        return False
+
+    takes, remaining = {}, quantity
+    for shard_id, stock in rows:
+        takes[shard_id] = min(stock, remaining)
+        remaining -= takes[shard_id]
+        if not remaining:
+            break
+    amount = _case('id', takes)
+    StockShard.objects.filter(id__in=list(takes)).update(stock=F('stock') - amount)
+    return True
+
+
+def return_to_shards(quantities, shards):
+    """Add ``{product_id: quantity}`` back, each to one random shard, with one UPDATE."""
+    picked = reduce(or_, (
+        Q(product_id=product_id, index=random.randrange(shards[product_id]))
+        for product_id in quantities
+    ))
+    amount = _case('product_id', quantities)
+    StockShard.objects.filter(picked).update(stock=F('stock') + amount)
+
+
+def get_stock_totals(product_ids):
+    """Return ``{product_id: live total}`` summed over the shards of the sharded products among ``product_ids``."""
+    return dict(
+        StockShard.objects
+        .filter(product_id__in=list(product_ids), product__stock_shards__gt=0)
+        .values('product_id')
+        .annotate(total=Sum('stock'))
+        .values_list('product_id', 'total')
+    )
+
+
+def sync_stock_totals(product_ids):
+    """
+    Recompute the cached ``Product.stock`` of sharded products from their
+    shards. Checkouts never do this, since it would put every sale of a hot
+    product back on its one Product row; ``rebalance_stock_shards
+    --totals-only`` runs it periodically instead.
+    """
+    total = (
+        StockShard.objects
+        .filter(product=OuterRef('pk'))
+        .values('product')
+        .annotate(total=Sum('stock'))
+        .values('total')
+    )
+    Product.objects.filter(id__in=list(product_ids), stock_shards__gt=0).update(
+        stock=Coalesce(Subquery(total), 0), updated_at=timezone.now()
+    )
+
+
+def shard_stock(product_id, shards, total=None):
+    """
+    Spread a product's inventory evenly over ``shards`` StockShard rows, or
+    fold it back into ``Product.stock`` when ``shards`` is 0. ``total``
+    replaces the inventory; by default the current one is kept. Returns
+    the total.
+    """
+    if not 0 <= shards <= STOCK_SHARDS_MAX:
+        raise ValueError(f"Shard count must be between 0 and {STOCK_SHARDS_MAX}.")
+
+    with transaction.atomic():
+        product = Product.objects.select_for_update().get(pk=product_id)
+        current = list(
+            StockShard.objects
+            .select_for_update()
+            .filter(product=product)
+            .values_list('stock', flat=True)
+        )
+        if total is None:
+            total = sum(current) if product.stock_shards else product.stock
+
+        if shards:
+            base, extra = divmod(total, shards)
+            StockShard.objects.bulk_create(
+                [
+                    StockShard(product=product, index=index, stock=base + (index < extra))
+                    for index in range(shards)
+                ],
+                update_conflicts=True,
+                unique_fields=['product', 'index'],
+                update_fields=['stock'],
+            )
+        StockShard.objects.filter(product=product, index__gte=shards).delete()
+        Product.objects.filter(pk=product_id).update(
+            stock=total, stock_shards=shards, updated_at=timezone.now()
+        )
+    return total
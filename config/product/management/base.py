@@ -0,0 +1,40 @@
+import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+
+
+class BatchedCleanupCommand(BaseCommand):
+    """
+    Shared options for the cron jobs that walk old rows in keyset-ordered
+    batches. Subclasses set ``default_days``, ``default_batch_size`` and
+    ``dry_run_help``, and implement ``run(older_than, batch_size, pause,
+    dry_run)`` returning the summary line.
+    """
+
+    default_days = None
+    default_batch_size = None
+    dry_run_help = None
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=float, default=self.default_days)
+        parser.add_argument("--batch-size", type=int, default=self.default_batch_size)
+        parser.add_argument("--pause", type=float, default=0.0,
+                            help="Seconds to sleep between batches.")
+        parser.add_argument("--dry-run", action="store_true", help=self.dry_run_help)
+
+    def handle(self, *args, **options):
+        if options["days"] < 0:
+            raise CommandError("--days cannot be negative.")
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size must be at least 1.")
+
+        summary = self.run(
+            older_than=datetime.timedelta(days=options["days"]),
+            batch_size=options["batch_size"],
+            pause=options["pause"],
+            dry_run=options["dry_run"],
+        )
+        self.stdout.write(self.style.SUCCESS(summary))
+
+    def run(self, older_than, batch_size, pause, dry_run):
+        raise NotImplementedError("subclasses of BatchedCleanupCommand must provide a run() method")
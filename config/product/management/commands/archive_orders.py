@@ -0,0 +1,21 @@
+from product.archive import ORDER_ARCHIVE_AFTER, ORDER_ARCHIVE_BATCH_SIZE, archive_orders
+from product.management.base import BatchedCleanupCommand
+
+
+class Command(BatchedCleanupCommand):
+    help = (
+        "Move completed, canceled and rejected orders older than --days (and "
+        "their items) to the archive tables, in small keyset-ordered batches. "
+        "Meant to run from cron."
+    )
+    default_days = ORDER_ARCHIVE_AFTER.days
+    default_batch_size = ORDER_ARCHIVE_BATCH_SIZE
+    dry_run_help = "Count what would be archived."
+
+    def run(self, older_than, batch_size, pause, dry_run):
+        report = archive_orders(older_than=older_than, batch_size=batch_size, pause=pause, dry_run=dry_run)
+        verb = "would be archived" if dry_run else "archived"
+        return (
+            f"{report['orders']} order(s) and {report['items']} item(s) {verb} "
+            f"in {report['batches']} batch(es), {report['seconds']:.2f}s."
+        )
@@ -0,0 +1,79 @@
+import datetime
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Min
+from django.utils import timezone
+
+from product.analytics import (
+    SALES_BACKFILL_BATCH_SIZE,
+    SALES_BACKFILL_CHUNK_DAYS,
+    fold_sales_backlog,
+    rebuild_rollups,
+    sales_day,
+)
+from product.models import Order
+
+
+def parse_day(value):
+    try:
+        return datetime.date.fromisoformat(value)
+    except ValueError:
+        raise CommandError(f"Invalid date {value!r}, expected YYYY-MM-DD.")
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild the daily product sales rollups from orders, a few days per "
+        "transaction. Defaults to the whole order history. --pending only folds "
+        "in orders placed, paid or canceled since the last pass (run it from cron)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--start", type=parse_day)
+        parser.add_argument("--end", type=parse_day)
+        parser.add_argument("--chunk-days", type=int, default=SALES_BACKFILL_CHUNK_DAYS)
+        parser.add_argument("--batch-size", type=int, default=SALES_BACKFILL_BATCH_SIZE)
+        parser.add_argument("--pending", action="store_true", help="Fold the sales backlog into the rollups.")
+
+    def handle(self, *args, **options):
+        if options["chunk_days"] < 1 or options["batch_size"] < 1:
+            raise CommandError("--chunk-days and --batch-size must be at least 1.")
+        if options["pending"]:
+            if options["start"] or options["end"]:
+                raise CommandError("--pending takes no --start or --end.")
+            self.fold(options["batch_size"])
+            return
+
+        start, end = options["start"], options["end"] or timezone.localdate()
+        if start is None:
+            first = Order.objects.aggregate(first=Min("created_at"))["first"]
+            if first is None:
+                self.stdout.write("No orders, nothing to backfill.")
+                return
+            start = sales_day(first)
+        if start > end:
+            raise CommandError("--start is after --end.")
+
+        started = time.monotonic()
+        total = 0
+        for chunk_start, chunk_end, written in rebuild_rollups(
+            start, end, options["chunk_days"], options["batch_size"]
+        ):
+            total += written
+            self.stdout.write(f"{chunk_start} .. {chunk_end}: {written} row(s)")
+        self.stdout.write(self.style.SUCCESS(
+            f"{total} rollup row(s) rebuilt for {start} .. {end} in {time.monotonic() - started:.2f}s."
+        ))
+
+    def fold(self, batch_size):
+        started = time.monotonic()
+        folded = 0
+        while True:
+            entries = fold_sales_backlog(batch_size)
+            if not entries:
+                break
+            folded += entries
+        self.stdout.write(self.style.SUCCESS(
+            f"{folded} order change(s) folded into the rollups in {time.monotonic() - started:.2f}s."
+        ))
@@ -0,0 +1,98 @@
+import threading
+import time
+import uuid
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from rest_framework import serializers
+
+from product.checkout import place_order
+from product.inventory import shard_stock, sync_stock_totals
+from product.models import Cart, CartItem, Order, Product
+
+
+class Command(BaseCommand):
+    help = (
+        "Concurrency benchmark: many threads check out the same product at once. "
+        "Reports throughput and verifies that stock is never oversold. "
+        "Everything it creates is deleted afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--threads", type=int, default=16)
+        parser.add_argument("--orders-per-thread", type=int, default=10)
+        parser.add_argument("--stock", type=int, default=100)
+        parser.add_argument("--quantity", type=int, default=1)
+        parser.add_argument("--shards", type=int, default=0, help="Shard the product's stock.")
+
+    def handle(self, *args, **options):
+        threads, per_thread = options["threads"], options["orders_per_thread"]
+        quantity, stock = options["quantity"], options["stock"]
+        if min(threads, per_thread, quantity) < 1 or stock < 0:
+            raise CommandError("Counts must be positive.")
+
+        User = get_user_model()
+        run_id = uuid.uuid4().hex[:8]
+        product = Product.objects.create(
+            name=f"bench-checkout-{run_id}", description="", price="9.99", stock=stock
+        )
+        if options["shards"]:
+            shard_stock(product.pk, options["shards"])
+        users = [
+            User.objects.create_user(username=f"bench-checkout-{run_id}-{i}")
+            for i in range(threads)
+        ]
+        carts = {user.pk: Cart.objects.create(user=user) for user in users}
+        results = {"placed": 0, "rejected": 0, "errors": 0}
+        lock = threading.Lock()
+
+        def worker(user):
+            try:
+                for _ in range(per_thread):
+                    CartItem.objects.create(cart=carts[user.pk], product=product, quantity=quantity)
+                    try:
+                        place_order(user)
+                        outcome = "placed"
+                    except serializers.ValidationError:
+                        CartItem.objects.filter(cart=carts[user.pk]).delete()
+                        outcome = "rejected"
+                    except Exception as exc:
+                        self.stderr.write(f"{user.username}: {exc!r}")
+                        CartItem.objects.filter(cart=carts[user.pk]).delete()
+                        outcome = "errors"
+                    with lock:
+                        results[outcome] += 1
+            finally:
+                connection.close()
+
+        workers = [threading.Thread(target=worker, args=(user,)) for user in users]
+        started = time.perf_counter()
+        for thread in workers:
+            thread.start()
+        for thread in workers:
+            thread.join()
+        elapsed = time.perf_counter() - started
+
+        sync_stock_totals([product.pk])
+        product.refresh_from_db()
+        sold = stock - product.stock
+        expected = results["placed"] * quantity
+
+        Order.objects.filter(user__in=users).delete()
+        Cart.objects.filter(user__in=users).delete()
+        User.objects.filter(pk__in=[user.pk for user in users]).delete()
+        product.delete()
+
+        attempts = threads * per_thread
+        self.stdout.write(
+            f"{attempts} checkouts from {threads} threads on one product "
+            f"(stock {stock}, qty {quantity}, shards {options['shards']})"
+        )
+        self.stdout.write(
+            f"placed {results['placed']}, rejected (out of stock) {results['rejected']}, "
+            f"errors {results['errors']} in {elapsed:.2f}s ({attempts / elapsed:.0f} checkouts/s)"
+        )
+        if sold != expected or product.stock < 0:
+            raise CommandError(f"Stock mismatch: sold {sold}, orders account for {expected}.")
+        self.stdout.write(self.style.SUCCESS(f"stock consistent: {sold} sold, {product.stock} left"))
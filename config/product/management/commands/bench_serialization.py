@@ -0,0 +1,64 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from rest_framework.renderers import JSONRenderer
+
+from product.models import Product
+from product.renderers import FastJSONRenderer, orjson
+from product.serializers import ProductSerializer, compile_values_mapper
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark ProductSerializer + JSONRenderer against the values() mapper + "
+        "FastJSONRenderer read path. Sample rows are created in a rolled back transaction."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=5000)
+        parser.add_argument("--repeat", type=int, default=5)
+
+    def handle(self, *args, **options):
+        rows, repeat = options["rows"], options["repeat"]
+        if rows < 1 or repeat < 1:
+            raise CommandError("--rows and --repeat must be at least 1.")
+
+        with transaction.atomic():
+            products = Product.objects.bulk_create(
+                Product(
+                    name=f"Benchmark product {i}",
+                    description="Lorem ipsum dolor sit amet. " * 20,
+                    price=f"{i % 1000}.99",
+                    stock=i % 50,
+                )
+                for i in range(rows)
+            )
+            queryset = Product.objects.filter(id__in=[product.id for product in products]).order_by("id")
+            fields, mapper = compile_values_mapper(ProductSerializer)
+
+            def baseline():
+                return JSONRenderer().render(ProductSerializer(queryset.all(), many=True).data)
+
+            def fast():
+                return FastJSONRenderer().render(mapper(queryset.values(*fields)))
+
+            if baseline() != fast():
+                raise CommandError("Fast read path output differs from ProductSerializer output.")
+
+            baseline_time = self.best_of(baseline, repeat)
+            fast_time = self.best_of(fast, repeat)
+            transaction.set_rollback(True)
+
+        self.stdout.write(f"rows: {rows}, best of {repeat}, orjson: {'yes' if orjson else 'no'}")
+        self.stdout.write(f"ModelSerializer + JSONRenderer:  {baseline_time * 1000:8.1f} ms")
+        self.stdout.write(f"values() mapper + FastJSON:      {fast_time * 1000:8.1f} ms")
+        self.stdout.write(self.style.SUCCESS(f"speedup: {baseline_time / fast_time:.1f}x (output identical)"))
+
+    def best_of(self, func, repeat):
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            func()
+            timings.append(time.perf_counter() - started)
+        return min(timings)
@@ -0,0 +1,20 @@
+from product.cart import CART_EXPIRY_BATCH_SIZE, CART_IDLE_TIMEOUT, expire_idle_carts
+from product.management.base import BatchedCleanupCommand
+
+
+class Command(BatchedCleanupCommand):
+    help = (
+        "Delete carts (and their items) idle for longer than --days, in small "
+        "keyset-ordered batches. Meant to run from cron."
+    )
+    default_days = CART_IDLE_TIMEOUT.days
+    default_batch_size = CART_EXPIRY_BATCH_SIZE
+    dry_run_help = "Count what would be deleted."
+
+    def run(self, older_than, batch_size, pause, dry_run):
+        report = expire_idle_carts(idle_for=older_than, batch_size=batch_size, pause=pause, dry_run=dry_run)
+        verb = "would be removed" if dry_run else "removed"
+        return (
+            f"{report['carts']} cart(s) and {report['items']} item(s) {verb} "
+            f"in {report['batches']} batch(es), {report['seconds']:.2f}s."
+        )
@@ -0,0 +1,39 @@
+import json
+import sys
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from product.importer import IMPORT_CHUNK_SIZE, IMPORT_FORMATS, detect_format, import_products
+
+
+class Command(BaseCommand):
+    help = "Bulk import/upsert products from a CSV or NDJSON file ('-' reads stdin)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path")
+        parser.add_argument("--format", choices=IMPORT_FORMATS, dest="file_format")
+        parser.add_argument("--chunk-size", type=int, default=IMPORT_CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        file_format = options["file_format"] or detect_format(path)
+        if file_format is None:
+            raise CommandError("Cannot detect the file format, pass --format.")
+        if options["chunk_size"] < 1:
+            raise CommandError("--chunk-size must be at least 1.")
+
+        started = time.monotonic()
+        if path == "-":
+            report = import_products(sys.stdin, file_format, options["chunk_size"])
+        else:
+            with open(path, newline="", encoding="utf-8-sig") as stream:
+                report = import_products(stream, file_format, options["chunk_size"])
+
+        for error in report["errors"]:
+            self.stderr.write(f"line {error['line']}: {json.dumps(error['errors'])}")
+        style = self.style.SUCCESS if not report["failed"] else self.style.WARNING
+        self.stdout.write(style(
+            f"{report['rows']} rows: {report['created']} created, {report['updated']} updated, "
+            f"{report['failed']} failed in {time.monotonic() - started:.2f}s."
+        ))
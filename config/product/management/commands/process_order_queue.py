@@ -0,0 +1,49 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from product.order_queue import ORDER_QUEUE_BATCH_SIZE, process_order_jobs, prune_order_jobs
+
+
+class Command(BaseCommand):
+    help = (
+        "Drain the order queue: take stock for queued orders in batches and move "
+        "them to PENDING or REJECTED. Runs until interrupted unless --once is given."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=ORDER_QUEUE_BATCH_SIZE)
+        parser.add_argument("--interval", type=float, default=1.0,
+                            help="Seconds to sleep when the queue is empty.")
+        parser.add_argument("--once", action="store_true", help="Exit once the queue is empty.")
+
+    def handle(self, *args, **options):
+        batch_size, interval = options["batch_size"], options["interval"]
+        if batch_size < 1:
+            raise CommandError("--batch-size must be at least 1.")
+
+        totals = {"accepted": 0, "rejected": 0}
+        try:
+            while True:
+                started = time.monotonic()
+                report = process_order_jobs(batch_size)
+                if report["claimed"]:
+                    for key in totals:
+                        totals[key] += report[key]
+                    self.stdout.write(
+                        f"{report['accepted']} accepted, {report['rejected']} rejected "
+                        f"in {time.monotonic() - started:.2f}s"
+                    )
+                    continue
+                pruned = prune_order_jobs()
+                if pruned:
+                    self.stdout.write(f"pruned {pruned} processed job(s)")
+                if options["once"]:
+                    break
+                time.sleep(interval)
+        except KeyboardInterrupt:
+            pass
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{totals['accepted']} order(s) accepted, {totals['rejected']} rejected."
+        ))
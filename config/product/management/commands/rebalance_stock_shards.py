@@ -0,0 +1,58 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from product.cache import refresh_products
+from product.inventory import STOCK_SHARDS_MAX, shard_stock, sync_stock_totals
+from product.models import Product
+
+
+class Command(BaseCommand):
+    help = (
+        "Spread product stock evenly over its StockShard rows. --shards N "
+        "(re)shards the given products into N rows; 0 turns sharding off. "
+        "--totals-only just refreshes the cached Product.stock from the "
+        "shards; run it from cron."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("product_ids", nargs="*", type=int)
+        parser.add_argument("--all", action="store_true", help="Every sharded product.")
+        parser.add_argument("--shards", type=int)
+        parser.add_argument("--totals-only", action="store_true",
+                            help="Only copy the shard totals to Product.stock.")
+
+    def handle(self, *args, **options):
+        product_ids, shards = options["product_ids"], options["shards"]
+        if options["all"] == bool(product_ids):
+            raise CommandError("Pass either product ids or --all.")
+        if shards is not None and not 0 <= shards <= STOCK_SHARDS_MAX:
+            raise CommandError(f"--shards must be between 0 and {STOCK_SHARDS_MAX}.")
+        if shards is not None and options["totals_only"]:
+            raise CommandError("--shards and --totals-only cannot be combined.")
+
+        products = Product.objects.order_by("id")
+        if options["all"]:
+            products = products.filter(stock_shards__gt=0)
+        else:
+            products = products.filter(id__in=product_ids)
+            missing = set(product_ids) - set(products.values_list("id", flat=True))
+            if missing:
+                raise CommandError(f"Unknown product ids: {sorted(missing)}")
+
+        if options["totals_only"]:
+            done = list(products.filter(stock_shards__gt=0).values_list("id", flat=True))
+            sync_stock_totals(done)
+            if done:
+                refresh_products(done)
+            self.stdout.write(self.style.SUCCESS(f"{len(done)} product total(s) refreshed."))
+            return
+
+        done = []
+        for pk, current in products.values_list("id", "stock_shards"):
+            count = current if shards is None else shards
+            total = shard_stock(pk, count)
+            done.append(pk)
+            self.stdout.write(f"product {pk}: {total} in stock over {count} shard(s)")
+
+        if done:
+            refresh_products(done)
+        self.stdout.write(self.style.SUCCESS(f"{len(done)} product(s) rebalanced."))
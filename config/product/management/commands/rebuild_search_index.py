@@ -0,0 +1,20 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from product.search import rebuild_search_index
+
+
+class Command(BaseCommand):
+    help = "Rebuild the product full-text search index from the products table."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--database", default="default")
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        if not rebuild_search_index(options["database"]):
+            raise CommandError("Full-text search (SQLite FTS5) is not available for this database.")
+        self.stdout.write(self.style.SUCCESS(
+            f"Search index rebuilt in {time.monotonic() - started:.2f}s."
+        ))
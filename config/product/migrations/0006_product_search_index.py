@@ -0,0 +1,25 @@
+# Generated by Django 5.2.9 on 2026-10-17 18:43
+
+from django.db import migrations
+
+from product.search import drop_search_index, install_search_index, rebuild_search_index
+
+
+def create_search_index(apps, schema_editor):
+    if install_search_index(schema_editor.connection):
+        rebuild_search_index(schema_editor.connection.alias)
+
+
+def remove_search_index(apps, schema_editor):
+    drop_search_index(schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('product', '0005_rename_ordr_id_order_order_id'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, remove_search_index),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.9 on 2026-10-17 18:47
+
+from django.db import migrations, models
+from django.db.models.functions import Coalesce, Now
+
+from product.search import reinstall_search_index
+
+
+def backfill_updated_at(apps, schema_editor):
+    # Existing products need a stamp for ETag/Last-Modified and the detail cache.
+    Product = apps.get_model('product', 'Product')
+    Product.objects.filter(updated_at__isnull=True).update(updated_at=Coalesce('created_at', Now()))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('product', '0007_keyset_pagination_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, null=True),
+        ),
+        migrations.RunPython(backfill_updated_at, migrations.RunPython.noop),
+        migrations.RunPython(reinstall_search_index, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.9 on 2026-10-17 18:56
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+from product.search import reinstall_search_index
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('product', '0008_product_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='stock_shards',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.RunPython(reinstall_search_index, migrations.RunPython.noop),
+        migrations.CreateModel(
+            name='StockShard',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('index', models.PositiveSmallIntegerField()),
+                ('stock', models.IntegerField(default=0)),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='shards', to='product.product')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('product', 'index'), name='stockshard_product_index_uniq'), models.CheckConstraint(condition=models.Q(('stock__gte', 0)), name='stockshard_stock_gte_0')],
+            },
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.9 on 2026-10-17 19:06
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models.functions import Now
+
+
+def backfill_updated_at(apps, schema_editor):
+    # When existing lines last changed is unknown; count them as changed now
+    # so expire_carts does not take them for idle.
+    CartItem = apps.get_model('product', 'CartItem')
+    CartItem.objects.filter(updated_at__isnull=True).update(updated_at=Now())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('product', '0011_cartitem_unique_product'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='cartitem',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, null=True),
+        ),
+        migrations.RunPython(backfill_updated_at, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='cart',
+            index=models.Index(fields=['created_at', 'id'], name='cart_created_id_idx'),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.9 on 2026-10-17 19:07
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('product', '0012_cart_activity'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProductDailySales',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('units_ordered', models.PositiveIntegerField(default=0)),
+                ('revenue_ordered', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('units_paid', models.PositiveIntegerField(default=0)),
+                ('revenue_paid', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('units_canceled', models.PositiveIntegerField(default=0)),
+                ('revenue_canceled', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_sales', to='product.product')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('day', 'product'), name='dailysales_day_product_uniq')],
+            },
+        ),
+    ]
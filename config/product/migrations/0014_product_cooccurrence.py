@@ -0,0 +1,34 @@
+# Generated by Django 5.2.9 on 2026-10-17 19:09
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('product', '0013_product_daily_sales'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CoOccurrenceBacklog',
+            fields=[
+                ('order', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='+', serialize=False, to='product.order')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ProductCoOccurrence',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('orders', models.PositiveIntegerField(default=0)),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='co_occurrences', to='product.product')),
+                ('related', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='product.product')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['product', '-orders', 'related'], name='cooccurrence_top_idx')],
+                'constraints': [models.UniqueConstraint(fields=('product', 'related'), name='cooccurrence_pair_uniq')],
+            },
+        ),
+    ]
@@ -0,0 +1,52 @@
+# Generated by Django 5.2.9 on 2026-10-17 19:11
+
+from collections import defaultdict
+
+from django.db import migrations, models
+
+BATCH_SIZE = 500
+
+
+def snapshot_order_items(apps, schema_editor):
+    Order = apps.get_model('product', 'Order')
+    OrderItem = apps.get_model('product', 'OrderItem')
+    order_ids = list(Order.objects.order_by('pk').values_list('pk', flat=True))
+    for start in range(0, len(order_ids), BATCH_SIZE):
+        batch = order_ids[start:start + BATCH_SIZE]
+        lines = defaultdict(list)
+        for order_id, product_id, name, quantity, price in (
+            OrderItem.objects.filter(order_id__in=batch).order_by('id')
+            .values_list('order_id', 'product_id', 'product__name', 'quantity', 'price')
+        ):
+            lines[order_id].append({
+                'product_id': product_id,
+                'product_name': name,
+                'quantity': quantity,
+                'price': f'{price:f}',
+            })
+        orders = [
+            Order(pk=pk, items=lines[pk], item_count=sum(line['quantity'] for line in lines[pk]))
+            for pk in batch
+        ]
+        Order.objects.bulk_update(orders, ['items', 'item_count'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('product', '0014_product_cooccurrence'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='order',
+            name='item_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='order',
+            name='items',
+            field=models.JSONField(blank=True, default=list),
+        ),
+        migrations.RunPython(snapshot_order_items, migrations.RunPython.noop),
+    ]
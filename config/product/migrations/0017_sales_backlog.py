@@ -0,0 +1,26 @@
+# Generated by Django 5.2.9 on 2026-10-17 20:02
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('product', '0016_order_archive'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SalesBacklog',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(max_length=8)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('order', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='product.order')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('order', 'kind'), name='salesbacklog_order_kind_uniq')],
+            },
+        ),
+    ]
@@ -8,6 +8,16 @@ class Product(models.Model):
     price = models.DecimalField(max_digits=10, decimal_places=2)
     stock = models.IntegerField()
     created_at = models.DateTimeField(auto_now_add=True, blank=True, null=True)
+    updated_at = models.DateTimeField(auto_now=True, blank=True, null=True)
+    # 0: ``stock`` is the inventory. N > 0: the inventory lives in N
+    # StockShard rows and ``stock`` caches their total, refreshed by
+    # ``rebalance_stock_shards --totals-only`` rather than by every checkout.
+    stock_shards = models.PositiveSmallIntegerField(default=0)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['created_at', 'id'], name='product_created_id_idx'),
+        ]
 
     @property
     def is_in_stock(self):
@@ -15,12 +25,32 @@ class Product(models.Model):
 
     def __str__(self):
         return self.name
+
+
+class StockShard(models.Model):
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='shards')
+    index = models.PositiveSmallIntegerField()
+    stock = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['product', 'index'], name='stockshard_product_index_uniq'),
+            models.CheckConstraint(condition=models.Q(stock__gte=0), name='stockshard_stock_gte_0'),
+        ]
+
+    def __str__(self):
+        return f"{self.product.name} shard {self.index}: {self.stock}"
     
 
 class Cart(models.Model):
    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='carts')
    created_at = models.DateTimeField(auto_now_add=True)
 
+   class Meta:
+       indexes = [
+           models.Index(fields=['created_at', 'id'], name='cart_created_id_idx'),
+       ]
+
    def __str__(self):
          return f"Cart of {self.user.username} - {self.id}"
 
@@ -29,6 +59,13 @@ class CartItem(models.Model):
     cart = models.ForeignKey(Cart, on_delete=models.CASCADE, related_name='items')
     product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='cart_items')
     quantity = models.PositiveIntegerField(default=1)
+    # Last change to the line; carts whose lines all went quiet are expired.
+    updated_at = models.DateTimeField(auto_now=True, blank=True, null=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['cart', 'product'], name='cartitem_cart_product_uniq'),
+        ]
 
     def __str__(self):
         return f"{self.quantity} of {self.product.name} in cart {self.cart.id}"
@@ -36,6 +73,8 @@ class CartItem(models.Model):
 
 class Order(models.Model):
     class StatusChoices(models.TextChoices):
+        QUEUED = 'QUEUED'
+        REJECTED = 'REJECTED'
         PENDING = 'PENDING'
         COMPLETED = 'COMPLETED' 
         CANCELED = 'CANCELED'
@@ -48,6 +87,16 @@ class Order(models.Model):
                               choices=StatusChoices.choices,
                               default=StatusChoices.PENDING
                              )
+    # Snapshot of the lines written at checkout ({product_id, product_name,
+    # quantity, price}) so reads never join OrderItem or Product.
+    items = models.JSONField(default=list, blank=True)
+    item_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['created_at', 'order_id'], name='order_created_id_idx'),
+            models.Index(fields=['user', 'created_at', 'order_id'], name='order_user_created_id_idx'),
+        ]
     
     def __str__(self):
         return f"Order {self.order_id} - {self.user.username} - {self.status}"
@@ -56,4 +105,118 @@ class OrderItem(models.Model):
     order = models.ForeignKey(Order, on_delete=models.CASCADE, related_name='order_items')
     product = models.ForeignKey(Product, on_delete=models.CASCADE)
     quantity = models.PositiveIntegerField()
-    price = models.DecimalField(max_digits=10, decimal_places=2)
\ No newline at end of file
+    price = models.DecimalField(max_digits=10, decimal_places=2)
+
+
+class ArchivedOrder(models.Model):
+    """A COMPLETED, CANCELED or REJECTED order moved out of Order by archive_orders."""
+    order_id = models.UUIDField(primary_key=True)
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='archived_orders')
+    total_price = models.DecimalField(max_digits=10, decimal_places=2)
+    created_at = models.DateTimeField()
+    status = models.CharField(max_length=10, choices=Order.StatusChoices.choices)
+    items = models.JSONField(default=list, blank=True)
+    item_count = models.PositiveIntegerField(default=0)
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['created_at', 'order_id'], name='archorder_created_id_idx'),
+            models.Index(fields=['user', 'created_at', 'order_id'], name='archorder_user_created_id_idx'),
+        ]
+
+
+class ArchivedOrderItem(models.Model):
+    """An OrderItem of an ArchivedOrder; keeps the original id."""
+    id = models.BigIntegerField(primary_key=True)
+    order = models.ForeignKey(ArchivedOrder, on_delete=models.CASCADE, related_name='order_items')
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='+')
+    quantity = models.PositiveIntegerField()
+    price = models.DecimalField(max_digits=10, decimal_places=2)
+
+
+class OrderJob(models.Model):
+    """A queued order waiting for the queue worker to take its stock."""
+    order = models.OneToOneField(Order, on_delete=models.CASCADE, primary_key=True, related_name='job')
+    created_at = models.DateTimeField(auto_now_add=True)
+    claimed_at = models.DateTimeField(blank=True, null=True)
+    processed_at = models.DateTimeField(blank=True, null=True)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    error = models.TextField(blank=True, default='')
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=['created_at'],
+                name='orderjob_waiting_idx',
+                condition=models.Q(processed_at__isnull=True),
+            ),
+        ]
+
+    def __str__(self):
+        return f"Job for order {self.order_id}"
+
+
+class ProductDailySales(models.Model):
+    """
+    Sales rollup per product and day (the day the order was placed):
+    everything ordered, the part paid for and the part canceled.
+    """
+    day = models.DateField()
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='daily_sales')
+    units_ordered = models.PositiveIntegerField(default=0)
+    revenue_ordered = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    units_paid = models.PositiveIntegerField(default=0)
+    revenue_paid = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    units_canceled = models.PositiveIntegerField(default=0)
+    revenue_canceled = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['day', 'product'], name='dailysales_day_product_uniq'),
+        ]
+
+    def __str__(self):
+        return f"{self.product_id} on {self.day}: {self.units_ordered} ordered"
+
+
+class SalesBacklog(models.Model):
+    """An order placed, paid or canceled but not yet folded into ProductDailySales."""
+    order = models.ForeignKey(Order, on_delete=models.CASCADE, related_name='+')
+    kind = models.CharField(max_length=8)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['order', 'kind'], name='salesbacklog_order_kind_uniq'),
+        ]
+
+    def __str__(self):
+        return f"Backlog order {self.order_id} {self.kind}"
+
+
+class ProductCoOccurrence(models.Model):
+    """How many completed orders contained both products (stored both ways)."""
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='co_occurrences')
+    related = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='+')
+    orders = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['product', 'related'], name='cooccurrence_pair_uniq'),
+        ]
+        indexes = [
+            models.Index(fields=['product', '-orders', 'related'], name='cooccurrence_top_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.product_id} + {self.related_id}: {self.orders}"
+
+
+class CoOccurrenceBacklog(models.Model):
+    """A completed order not yet folded into ProductCoOccurrence."""
+    order = models.OneToOneField(Order, on_delete=models.CASCADE, primary_key=True, related_name='+')
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"Backlog order {self.order_id}"
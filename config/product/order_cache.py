@@ -0,0 +1,48 @@
+import hashlib
+
+from django.core.cache import cache
+
+from .cache import bump_version, get_version, record_cache_event
+
+# Order list pages and details are cached per scope (one user, or all of
+# staff) under that scope's version; any change to a user's orders bumps
+# the user's version and the staff one, so old entries are never read again.
+ORDER_CACHE_KEY = "orders:{}:{}:{}"
+ORDER_CACHE_TTL = 60 * 5
+ORDER_CACHE_VERSION_KEY = "orders:{}:version"
+ORDER_CACHE_STAFF_SCOPE = "staff"
+
+
+def order_cache_scope(user):
+    return ORDER_CACHE_STAFF_SCOPE if user.is_staff else f"user:{user.pk}"
+
+
+def get_order_cache_version(scope):
+    return get_version(ORDER_CACHE_VERSION_KEY.format(scope))
+
+
+def invalidate_order_cache(user_ids):
+    """Drop the cached order reads of ``user_ids`` and of staff."""
+    for user_id in set(user_ids):
+        bump_version(ORDER_CACHE_VERSION_KEY.format(f"user:{user_id}"))
+    bump_version(ORDER_CACHE_VERSION_KEY.format(ORDER_CACHE_STAFF_SCOPE))
+
+
+def order_cache_key(request):
+    scope = order_cache_scope(request.user)
+    params = sorted((name, sorted(values)) for name, values in request.query_params.lists())
+    digest = hashlib.md5(f"{request.get_host()}|{request.path}|{params}".encode()).hexdigest()
+    return ORDER_CACHE_KEY.format(scope, get_order_cache_version(scope), digest)
+
+
+def get_cached_order_read(request, compute):
+    """Return the cached data for this order read, or ``compute()`` it and cache it."""
+    key = order_cache_key(request)
+    data = cache.get(key)
+    if data is not None:
+        record_cache_event("orders", "hit")
+        return data
+    data = compute()
+    cache.set(key, data, ORDER_CACHE_TTL)
+    record_cache_event("orders", "miss")
+    return data
@@ -0,0 +1,136 @@
+import datetime
+from collections import Counter, defaultdict
+
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .analytics import queue_for_rollups
+from .cache import refresh_products
+from .checkout import (
+    InsufficientStock,
+    create_order,
+    decrement_stock,
+    insufficient_stock_error,
+    read_cart,
+    read_prices,
+)
+from .inventory import get_stock_shards
+from .models import Order, OrderItem, OrderJob
+from .order_cache import invalidate_order_cache
+
+# Orders placed while the queue is on are written as QUEUED and a worker
+# (manage.py process_order_queue) takes their stock in batches.
+ORDER_QUEUE_BATCH_SIZE = 100
+# A claimed job that is still unprocessed after this long (worker died)
+# is handed out again.
+ORDER_QUEUE_CLAIM_TIMEOUT = datetime.timedelta(minutes=5)
+ORDER_QUEUE_RETENTION = datetime.timedelta(days=7)
+# Seconds clients are told to wait (Retry-After) before polling a queued order again.
+ORDER_QUEUE_POLL_INTERVAL = 1
+
+
+def enqueue_order(user):
+    """
+    Turn ``user``'s cart into a QUEUED order and queue it. No stock is
+    touched, so this never waits on the rows of popular products.
+    """
+    with transaction.atomic():
+        cart_items, quantities = read_cart(user)
+        prices, _, names = read_prices(quantities)
+        order = create_order(user, cart_items, prices, names, status=Order.StatusChoices.QUEUED)
+        OrderJob.objects.create(order=order)
+    return order
+
+
+def claim_order_jobs(batch_size=ORDER_QUEUE_BATCH_SIZE):
+    """Claim up to ``batch_size`` waiting jobs, oldest first, and return their order ids."""
+    now = timezone.now()
+    with transaction.atomic():
+        order_ids = list(
+            OrderJob.objects
+            .select_for_update(skip_locked=True)
+            .filter(processed_at__isnull=True)
+            .exclude(claimed_at__gt=now - ORDER_QUEUE_CLAIM_TIMEOUT)
+            .order_by('created_at')
+            .values_list('order_id', flat=True)[:batch_size]
+        )
+        OrderJob.objects.filter(order_id__in=order_ids).update(
+            claimed_at=now, attempts=F('attempts') + 1
+        )
+    return order_ids
+
+
+def _order_quantities(order_ids):
+    quantities = defaultdict(Counter)
+    for order_id, product_id, quantity in (
+        OrderItem.objects.filter(order_id__in=order_ids).values_list('order_id', 'product_id', 'quantity')
+    ):
+        quantities[order_id][product_id] += quantity
+    return quantities
+
+
+def process_order_jobs(batch_size=ORDER_QUEUE_BATCH_SIZE):
+    """
+    Claim a batch of queued orders and take their stock in one transaction.
+    The whole batch's quantities are summed per product and decremented at
+    once; if some product runs short, the batch is replayed order by order
+    (oldest first) and the orders that do not fit are REJECTED. Returns
+    ``{"claimed": n, "accepted": n, "rejected": n}``.
+    """
+    claimed = claim_order_jobs(batch_size)
+    report = {"claimed": len(claimed), "accepted": 0, "rejected": 0}
+    if not claimed:
+        return report
+
+    with transaction.atomic():
+        # Jobs whose order has left QUEUED some other way are just closed.
+        owners = dict(
+            Order.objects
+            .filter(order_id__in=claimed, status=Order.StatusChoices.QUEUED)
+            .order_by('created_at', 'order_id')
+            .values_list('order_id', 'user_id')
+        )
+        order_ids = list(owners)
+        per_order = _order_quantities(order_ids)
+        totals = Counter()
+        for items in per_order.values():
+            totals.update(items)
+        shards = get_stock_shards(totals)
+
+        accepted, rejected = [], {}
+        try:
+            decrement_stock(totals, shards)
+            accepted = order_ids
+        except InsufficientStock:
+            for order_id in order_ids:
+                try:
+                    decrement_stock(per_order[order_id], shards)
+                    accepted.append(order_id)
+                except InsufficientStock:
+                    error = insufficient_stock_error(per_order[order_id])
+                    rejected[order_id] = str(error.detail[0])
+
+        now = timezone.now()
+        Order.objects.filter(order_id__in=accepted).update(status=Order.StatusChoices.PENDING)
+        queue_for_rollups(accepted, 'ordered')
+        Order.objects.filter(order_id__in=list(rejected)).update(status=Order.StatusChoices.REJECTED)
+        OrderJob.objects.filter(order_id__in=claimed).update(processed_at=now)
+        for order_id, error in rejected.items():
+            OrderJob.objects.filter(order_id=order_id).update(error=error)
+
+        product_ids = list(totals)
+        if accepted:
+            transaction.on_commit(lambda: refresh_products(product_ids))
+        user_ids = list(owners.values())
+        if user_ids:
+            transaction.on_commit(lambda: invalidate_order_cache(user_ids))
+
+    report["accepted"], report["rejected"] = len(accepted), len(rejected)
+    return report
+
+
+def prune_order_jobs(retention=ORDER_QUEUE_RETENTION):
+    """Delete processed jobs older than ``retention``."""
+    cutoff = timezone.now() - retention
+    return OrderJob.objects.filter(processed_at__lt=cutoff).delete()[0]
@@ -0,0 +1,382 @@
+import base64
+import binascii
+import datetime
+import decimal
+import hashlib
+import json
+import uuid
+
+from django.core.cache import cache
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import F, Q, QuerySet
+from django.utils.functional import cached_property
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, LimitOffsetPagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+APPROXIMATE_COUNT_THRESHOLD = 10000
+APPROXIMATE_COUNT_CACHE_KEY = "approximate_count"
+APPROXIMATE_COUNT_CACHE_TTL = 60 * 10
+
+PAGINATION_QUERY_PARAM_ATTRS = (
+    'limit_query_param',
+    'offset_query_param',
+    'cursor_query_param',
+    'page_query_param',
+    'page_size_query_param',
+    'mode_query_param',
+)
+
+
+def pagination_query_params(paginator):
+    """Query params that can change which page a paginator returns."""
+    params = []
+    for attr in PAGINATION_QUERY_PARAM_ATTRS:
+        param = getattr(paginator, attr, None)
+        if param:
+            params.append(param)
+    return params
+
+
+def estimate_count(queryset):
+    """Planner row estimate for the query, or None when the backend has none."""
+    connection = connections[queryset.db]
+    if connection.vendor != 'postgresql':
+        return None
+    sql, params = queryset.query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]['Plan']['Plan Rows'])
+
+
+def get_approximate_count(queryset, threshold=APPROXIMATE_COUNT_THRESHOLD):
+    """
+    Return ``(count, is_approximate)``. Counts up to ``threshold`` are exact
+    (the count stops scanning at ``threshold + 1`` rows); above it the
+    planner estimate or a periodically refreshed exact count is used.
+    """
+    queryset = queryset.order_by()
+    bounded = queryset[:threshold + 1].count()
+    if bounded <= threshold:
+        return bounded, False
+
+    sql, params = queryset.query.sql_with_params()
+    digest = hashlib.md5(f'{queryset.db}|{sql}|{params!r}'.encode()).hexdigest()
+    cache_key = f'{APPROXIMATE_COUNT_CACHE_KEY}:{digest}'
+    count = cache.get(cache_key)
+    if count is None:
+        count = estimate_count(queryset)
+        if count is None or count <= threshold:
+            count = queryset.count()
+        cache.set(cache_key, count, APPROXIMATE_COUNT_CACHE_TTL)
+    return count, True
+
+
+class ApproximateCountPaginator(Paginator):
+    """Django paginator (used by the admin) backed by ``get_approximate_count``."""
+
+    count_is_approximate = False
+
+    @cached_property
+    def count(self):
+        if isinstance(self.object_list, QuerySet):
+            count, self.count_is_approximate = get_approximate_count(self.object_list)
+            return count
+        return super().count
+
+
+class ApproximateCountPagination(LimitOffsetPagination):
+    """Limit/offset pagination whose ``count`` may be an estimate on large results."""
+
+    count_threshold = APPROXIMATE_COUNT_THRESHOLD
+
+    def get_count(self, queryset):
+        self.count_is_approximate = False
+        if not isinstance(queryset, QuerySet):
+            return len(queryset)
+        count, self.count_is_approximate = get_approximate_count(queryset, self.count_threshold)
+        return count
+
+    def get_paginated_response(self, data):
+        return Response({
+            'count': self.count,
+            'count_is_approximate': self.count_is_approximate,
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        response_schema = super().get_paginated_response_schema(schema)
+        response_schema['properties']['count_is_approximate'] = {
+            'type': 'boolean',
+            'example': False,
+        }
+        return response_schema
+
+
+def _encode_value(value):
+    if isinstance(value, (datetime.datetime, datetime.date)):
+        return value.isoformat()
+    if isinstance(value, (uuid.UUID, decimal.Decimal)):
+        return str(value)
+    return value
+
+
+def _position_value(obj, name):
+    if isinstance(obj, dict):
+        return obj[name]
+    return getattr(obj, name)
+
+
+class KeysetPagination(BasePagination):
+    """
+    Cursor pagination over a composite, unique ordering such as
+    ``(-created_at, -id)``. Pages are fetched with ``WHERE (keys) < cursor``
+    instead of ``OFFSET``, and no ``COUNT(*)`` is run.
+
+    Clients that still need limit/offset pages opt in with
+    ``?pagination=offset`` (or by sending ``offset``).
+    """
+
+    ordering = ('-created_at', '-id')
+    page_size = api_settings.PAGE_SIZE
+    max_page_size = 100
+    page_size_query_param = 'limit'
+    cursor_query_param = 'cursor'
+    mode_query_param = 'pagination'
+    offset_query_param = 'offset'
+    legacy_mode = 'offset'
+    legacy_pagination_class = ApproximateCountPagination
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        return self.paginate_querysets([queryset], request, view)
+
+    def paginate_querysets(self, querysets, request, view=None):
+        """
+        Paginate the concatenation of ``querysets``, which must hold disjoint
+        rows with the same ordering columns (a table and its archive, say).
+        Each one is fetched with the same keyset window and the results are
+        merged, so a page costs one indexed query per queryset.
+        """
+        self.request = request
+        self.legacy = self.use_legacy(request)
+        if self.legacy:
+            # Offset pages are only stable over a total ordering, so they use
+            # the same unique ordering as the cursors.
+            if len(querysets) > 1:
+                ordering = list(getattr(view, 'keyset_ordering', self.ordering))
+                queryset = querysets[0].union(*querysets[1:], all=True).order_by(*ordering)
+            else:
+                self.fields = self.get_ordering_fields(querysets[0], view)
+                queryset = querysets[0].order_by(*self.get_order_by(False))
+            self.legacy_paginator = self.legacy_pagination_class()
+            return self.legacy_paginator.paginate_queryset(queryset, request, view)
+
+        self.page_size = self.get_page_size(request)
+        self.fields = self.get_ordering_fields(querysets[0], view)
+        position, reverse = self.decode_cursor(request)
+
+        results = []
+        for queryset in querysets:
+            queryset = queryset.order_by(*self.get_order_by(reverse))
+            if position is not None:
+                queryset = queryset.filter(self.get_keyset_filter(position, reverse))
+            results.extend(queryset[:self.page_size + 1])
+        if len(querysets) > 1:
+            self.sort_page(results, reverse)
+
+        has_more = len(results) > self.page_size
+        results = results[:self.page_size]
+        if reverse:
+            results.reverse()
+
+        if reverse:
+            self.has_next = position is not None
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = position is not None
+
+        self.page = results
+        return results
+
+    def sort_page(self, results, reverse):
+        # Stable sorts from the last key to the first give the same order as
+        # the query's ORDER BY; the keys are unique, so there are no ties.
+        for name, descending, _ in reversed(self.fields):
+            results.sort(key=lambda obj: _position_value(obj, name), reverse=descending != reverse)
+
+    def use_legacy(self, request):
+        return (
+            request.query_params.get(self.mode_query_param) == self.legacy_mode
+            or self.offset_query_param in request.query_params
+        )
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if page_size <= 0:
+            return self.page_size
+        return min(page_size, self.max_page_size)
+
+    def get_ordering_fields(self, queryset, view):
+        ordering = list(getattr(view, 'keyset_ordering', self.ordering))
+        # Ranked search results page by relevance first.
+        if 'search_rank' in queryset.query.annotations:
+            ordering.insert(0, 'search_rank')
+
+        fields = []
+        self.converters = []
+        for item in ordering:
+            name = item.lstrip('-')
+            try:
+                field = queryset.model._meta.get_field(name)
+            except FieldDoesNotExist:
+                # Annotations such as search_rank are floats.
+                nullable, convert = False, float
+            else:
+                nullable, convert = field.null, field.to_python
+            fields.append((name, item.startswith('-'), nullable))
+            self.converters.append(convert)
+        return fields
+
+    def get_order_by(self, reverse):
+        order_by = []
+        for name, descending, nullable in self.fields:
+            # NULLs always sort after every value in the forward direction.
+            nulls = {'nulls_first': True} if reverse else {'nulls_last': True}
+            if descending != reverse:
+                order_by.append(F(name).desc(**(nulls if nullable else {})))
+            else:
+                order_by.append(F(name).asc(**(nulls if nullable else {})))
+        return order_by
+
+    def get_keyset_filter(self, position, reverse):
+        condition = Q(pk__in=[])
+        equal = Q()
+        for (name, descending, nullable), value in zip(self.fields, position):
+            if value is None:
+                if reverse:
+                    condition |= equal & Q(**{f'{name}__isnull': False})
+                equal &= Q(**{f'{name}__isnull': True})
+                continue
+
+            lookup = 'lt' if descending != reverse else 'gt'
+            beyond = Q(**{f'{name}__{lookup}': value})
+            if nullable and not reverse:
+                beyond |= Q(**{f'{name}__isnull': True})
+            condition |= equal & beyond
+            equal &= Q(**{name: value})
+        return condition
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(encoded.encode('ascii')))
+            position = payload['p']
+            reverse = bool(payload.get('r', False))
+        except (binascii.Error, UnicodeError, ValueError, KeyError, TypeError):
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(position, list) or len(position) != len(self.fields):
+            raise NotFound(self.invalid_cursor_message)
+        try:
+            position = [
+                self.decode_value(value, convert, nullable)
+                for value, convert, (_, _, nullable) in zip(position, self.converters, self.fields)
+            ]
+        except (ValidationError, TypeError, ValueError, AttributeError):
+            raise NotFound(self.invalid_cursor_message)
+        return position, reverse
+
+    def decode_value(self, value, convert, nullable):
+        if value is None:
+            if not nullable:
+                raise ValueError('NULL position for a non-null key.')
+            return None
+        if isinstance(value, (dict, list, bool)):
+            raise TypeError('Cursor positions are scalars.')
+        return convert(value)
+
+    def encode_cursor(self, obj, reverse):
+        position = [_encode_value(_position_value(obj, name)) for name, _, _ in self.fields]
+        payload = json.dumps({'p': position, 'r': reverse}, separators=(',', ':'))
+        encoded = base64.urlsafe_b64encode(payload.encode('ascii')).decode('ascii')
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, encoded)
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if not self.page:
+            return remove_query_param(self.request.build_absolute_uri(), self.cursor_query_param)
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    def get_paginated_response(self, data):
+        if self.legacy:
+            return self.legacy_paginator.get_paginated_response(data)
+        return Response({
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                'name': self.cursor_query_param,
+                'required': False,
+                'in': 'query',
+                'description': 'Opaque cursor returned in next/previous links.',
+                'schema': {'type': 'string'},
+            },
+            {
+                'name': self.page_size_query_param,
+                'required': False,
+                'in': 'query',
+                'description': 'Number of results to return per page.',
+                'schema': {'type': 'integer'},
+            },
+            {
+                'name': self.mode_query_param,
+                'required': False,
+                'in': 'query',
+                'description': f'Set to "{self.legacy_mode}" for limit/offset pages with a count.',
+                'schema': {'type': 'string', 'enum': [self.legacy_mode]},
+            },
+            {
+                'name': self.offset_query_param,
+                'required': False,
+                'in': 'query',
+                'description': 'Offset into the results; switches to limit/offset pagination.',
+                'schema': {'type': 'integer'},
+            },
+        ]
@@ -0,0 +1,165 @@
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, Exists, F, IntegerField, OuterRef, Window
+from django.db.models.functions import RowNumber
+
+from .bulk import increment_rows
+from .cache import bump_version, get_version
+from .models import ArchivedOrder, ArchivedOrderItem, CoOccurrenceBacklog, Order, OrderItem, ProductCoOccurrence
+
+RELATED_TOP_K = 10
+# Pairs kept per product after a build. The margin over RELATED_TOP_K lets
+# a pair climb back into the top K; one that was pruned restarts from zero
+# on the next fold, until a --full rebuild recounts it.
+RELATED_KEEP_PER_PRODUCT = RELATED_TOP_K * 5
+RELATED_CACHE_KEY = "product:{}:related:{}"
+RELATED_CACHE_TTL = 60 * 60
+RELATED_GENERATION_KEY = "product_related:generation"
+RECOMMENDATION_BATCH_SIZE = 1000
+
+
+def queue_for_recommendations(order_ids):
+    """Mark newly completed orders for the next incremental fold-in."""
+    CoOccurrenceBacklog.objects.bulk_create(
+        [CoOccurrenceBacklog(order_id=order_id) for order_id in order_ids],
+        ignore_conflicts=True,
+    )
+
+
+def pair_counts(orders, items=OrderItem):
+    """
+    Aggregate query yielding ``(product_id, related_id, orders)`` for every
+    ordered pair of distinct products bought together in ``orders``, an
+    Order (or, with ``items=ArchivedOrderItem``, ArchivedOrder) filter. The
+    self-join runs in the database, so the sparse co-occurrence matrix is
+    never built pair by pair in Python.
+    """
+    return (
+        items.objects
+        .filter(order__in=orders)
+        .annotate(related_id=F('order__order_items__product_id'))
+        .exclude(related_id=F('product_id'))
+        .values('product_id', 'related_id')
+        .annotate(orders=Count('order_id', distinct=True))
+        .order_by('product_id', 'related_id')
+        .values_list('product_id', 'related_id', 'orders')
+    )
+
+
+def add_pair_counts(counts):
+    """Add ``{(product_id, related_id): orders}`` to ProductCoOccurrence."""
+    increment_rows(
+        ProductCoOccurrence,
+        ('product_id', 'related_id'),
+        {'orders': IntegerField()},
+        {pair: (orders,) for pair, orders in counts.items()},
+    )
+
+
+def prune_pairs(product_ids=None, keep=RELATED_KEEP_PER_PRODUCT):
+    """
+    Drop all but the ``keep`` strongest pairs of each product (of
+    ``product_ids`` if given), so the table stays O(products * keep) rather
+    than growing with every pair ever bought together. Returns the number
+    of rows deleted.
+    """
+    pairs = ProductCoOccurrence.objects.all()
+    if product_ids is not None:
+        pairs = pairs.filter(product_id__in=list(product_ids))
+    ranked = pairs.annotate(rank=Window(
+        RowNumber(), partition_by=F('product_id'), order_by=[F('orders').desc(), F('related_id')],
+    ))
+    pruned = list(ranked.filter(rank__gt=keep).values_list('id', flat=True))
+    for start in range(0, len(pruned), RECOMMENDATION_BATCH_SIZE):
+        ProductCoOccurrence.objects.filter(id__in=pruned[start:start + RECOMMENDATION_BATCH_SIZE]).delete()
+    return len(pruned)
+
+
+def fold_backlog(batch_size=RECOMMENDATION_BATCH_SIZE):
+    """
+    Fold up to ``batch_size`` queued completed orders into the pair counts,
+    prune the products they touched and drop them from the backlog.
+    Returns ``(orders folded, pairs touched)``.
+    """
+    with transaction.atomic():
+        order_ids = list(
+            CoOccurrenceBacklog.objects.order_by('created_at')
+            .values_list('order_id', flat=True)[:batch_size]
+        )
+        if not order_ids:
+            return 0, 0
+        orders = Order.objects.filter(order_id__in=order_ids, status=Order.StatusChoices.COMPLETED)
+        counts = {(product_id, related_id): n for product_id, related_id, n in pair_counts(orders)}
+        add_pair_counts(counts)
+        prune_pairs({product_id for product_id, _ in counts})
+        CoOccurrenceBacklog.objects.filter(order_id__in=order_ids).delete()
+    if counts:
+        bump_related_generation()
+    return len(order_ids), len(counts)
+
+
+def rebuild_pair_counts(batch_size=RECOMMENDATION_BATCH_SIZE):
+    """
+    Recount every pair from the completed and archived orders in one
+    transaction, then keep the strongest pairs of each product. Backlogged
+    orders are left out so that fold_backlog counts them exactly once,
+    whenever they were completed. Returns the number of pairs written by
+    the hot-table recount.
+    """
+    queued = CoOccurrenceBacklog.objects.filter(order_id=OuterRef('order_id'))
+    orders = Order.objects.filter(status=Order.StatusChoices.COMPLETED).exclude(Exists(queued))
+    written = 0
+    with transaction.atomic():
+        ProductCoOccurrence.objects.all().delete()
+        batch = []
+        for product_id, related_id, n in pair_counts(orders).iterator(chunk_size=batch_size):
+            batch.append(ProductCoOccurrence(product_id=product_id, related_id=related_id, orders=n))
+            if len(batch) >= batch_size:
+                ProductCoOccurrence.objects.bulk_create(batch)
+                written += len(batch)
+                batch = []
+        if batch:
+            ProductCoOccurrence.objects.bulk_create(batch)
+            written += len(batch)
+
+        # Archived orders are never backlogged and share no order with the
+        # recount, so their pairs are added on top.
+        archived = ArchivedOrder.objects.filter(status=Order.StatusChoices.COMPLETED)
+        counts = {}
+        for product_id, related_id, n in pair_counts(archived, ArchivedOrderItem).iterator(chunk_size=batch_size):
+            counts[product_id, related_id] = n
+            if len(counts) >= batch_size:
+                add_pair_counts(counts)
+                counts = {}
+        add_pair_counts(counts)
+        prune_pairs()
+    bump_related_generation()
+    return written
+
+
+def get_related_generation():
+    return get_version(RELATED_GENERATION_KEY)
+
+
+def bump_related_generation():
+    """Invalidate every cached neighbour list at once."""
+    return bump_version(RELATED_GENERATION_KEY)
+
+
+def get_related_products(product_id, limit=RELATED_TOP_K):
+    """
+    ``[(related_id, orders), ...]`` for the ``limit`` products most often
+    bought with ``product_id``, cached until the next build. A miss is one
+    range scan of ``cooccurrence_top_idx``.
+    """
+    key = RELATED_CACHE_KEY.format(product_id, get_related_generation())
+    related = cache.get(key)
+    if related is None:
+        related = list(
+            ProductCoOccurrence.objects
+            .filter(product_id=product_id)
+            .order_by('-orders', 'related_id')
+            .values_list('related_id', 'orders')[:RELATED_TOP_K]
+        )
+        cache.set(key, related, RELATED_CACHE_TTL)
+    return related[:limit]
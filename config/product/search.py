@@ -0,0 +1,144 @@
+import re
+
+from django.db import OperationalError, connections
+from django.db.models.expressions import RawSQL
+from rest_framework import filters
+
+from .models import Product
+
+PRODUCT_TABLE = Product._meta.db_table
+SEARCH_INDEX_TABLE = f"{PRODUCT_TABLE}_fts"
+SEARCH_INDEX_COLUMNS = ("name", "description")
+# bm25 column weights: a hit in the name outranks one in the description.
+SEARCH_INDEX_RANK = "bm25(10.0, 1.0)"
+
+SEARCH_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+_search_index_available = {}
+
+
+def _columns(prefix=""):
+    return ", ".join(f"{prefix}{column}" for column in SEARCH_INDEX_COLUMNS)
+
+
+def _install_statements():
+    table, index = PRODUCT_TABLE, SEARCH_INDEX_TABLE
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {index} USING fts5("
+        f"{_columns()}, content='{table}', content_rowid='id', "
+        f"tokenize='unicode61 remove_diacritics 2', prefix='2 3')",
+        f"CREATE TRIGGER IF NOT EXISTS {index}_ai AFTER INSERT ON {table} BEGIN "
+        f"INSERT INTO {index}(rowid, {_columns()}) VALUES (new.id, {_columns('new.')}); END",
+        f"CREATE TRIGGER IF NOT EXISTS {index}_ad AFTER DELETE ON {table} BEGIN "
+        f"INSERT INTO {index}({index}, rowid, {_columns()}) "
+        f"VALUES ('delete', old.id, {_columns('old.')}); END",
+        f"CREATE TRIGGER IF NOT EXISTS {index}_au AFTER UPDATE OF {_columns()} ON {table} BEGIN "
+        f"INSERT INTO {index}({index}, rowid, {_columns()}) "
+        f"VALUES ('delete', old.id, {_columns('old.')}); "
+        f"INSERT INTO {index}(rowid, {_columns()}) VALUES (new.id, {_columns('new.')}); END",
+        f"INSERT INTO {index}({index}, rank) VALUES ('rank', '{SEARCH_INDEX_RANK}')",
+    ]
+
+
+def search_index_supported(connection):
+    if connection.vendor != "sqlite":
+        return False
+    with connection.cursor() as cursor:
+        try:
+            cursor.execute("CREATE VIRTUAL TABLE temp.fts5_probe USING fts5(probe)")
+            cursor.execute("DROP TABLE temp.fts5_probe")
+        except OperationalError:
+            return False
+    return True
+
+
+def install_search_index(connection):
+    """
+    Create the FTS5 index and the triggers that keep it in sync with the
+    products table. Idempotent; SQLite drops triggers when Django remakes
+    the products table, so migrations that alter it call this again.
+    """
+    if not search_index_supported(connection):
+        return False
+    with connection.cursor() as cursor:
+        for statement in _install_statements():
+            cursor.execute(statement)
+    _search_index_available.pop(connection.alias, None)
+    return True
+
+
+def reinstall_search_index(apps, schema_editor):
+    """
+    RunPython operation for migrations that alter the products table: SQLite
+    remakes the table for them, which drops the search index triggers.
+    """
+    install_search_index(schema_editor.connection)
+
+
+def drop_search_index(connection):
+    if connection.vendor != "sqlite":
+        return
+    with connection.cursor() as cursor:
+        for suffix in ("ai", "ad", "au"):
+            cursor.execute(f"DROP TRIGGER IF EXISTS {SEARCH_INDEX_TABLE}_{suffix}")
+        cursor.execute(f"DROP TABLE IF EXISTS {SEARCH_INDEX_TABLE}")
+    _search_index_available.pop(connection.alias, None)
+
+
+def rebuild_search_index(using="default"):
+    connection = connections[using]
+    if not install_search_index(connection):
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {SEARCH_INDEX_TABLE}({SEARCH_INDEX_TABLE}) VALUES ('rebuild')"
+        )
+    return True
+
+
+def search_index_available(using="default"):
+    if using not in _search_index_available:
+        connection = connections[using]
+        _search_index_available[using] = (
+            connection.vendor == "sqlite"
+            and SEARCH_INDEX_TABLE in connection.introspection.table_names()
+        )
+    return _search_index_available[using]
+
+
+def build_match_query(terms):
+    """Turn search terms into an FTS5 query: every word must match as a prefix."""
+    tokens = []
+    for term in terms:
+        tokens.extend(SEARCH_TOKEN_RE.findall(term))
+    return " ".join(f'"{token}"*' for token in tokens)
+
+
+class ProductSearchFilter(filters.SearchFilter):
+    """
+    Serve ``?search=`` from the FTS5 index, ranked by bm25. Falls back to
+    the regular ``icontains`` search when the index is not available.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        search_terms = self.get_search_terms(request)
+        if not search_terms:
+            return queryset
+
+        match = build_match_query(search_terms)
+        if not match or not search_index_available(queryset.db):
+            return super().filter_queryset(request, queryset, view)
+
+        return (
+            queryset
+            .filter(id__in=RawSQL(
+                f"SELECT rowid FROM {SEARCH_INDEX_TABLE} WHERE {SEARCH_INDEX_TABLE} MATCH %s",
+                (match,),
+            ))
+            .annotate(search_rank=RawSQL(
+                f"SELECT rank FROM {SEARCH_INDEX_TABLE} "
+                f"WHERE {SEARCH_INDEX_TABLE} MATCH %s AND rowid = {PRODUCT_TABLE}.id",
+                (match,),
+            ))
+            .order_by("search_rank", "id")
+        )
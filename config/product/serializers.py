@@ -1,13 +1,109 @@
-from rest_framework import serializers
+import datetime
+import decimal
+import functools
+
+from django.conf import settings
+from django.utils import timezone
+from rest_framework import ISO_8601, serializers
+from rest_framework.settings import api_settings
+from .cart import CART_BATCH_MAX_ITEMS, get_cart_backend, invalidate_cart_summary
+from .checkout import place_order
 from .models import Order, OrderItem, Product, Cart, CartItem
-from django.db import transaction
-from django.db.models import F
 
 class ProductSerializer(serializers.ModelSerializer):
     class Meta:
         model = Product
         fields = ['id', 'name', 'description', 'price', 'stock', 'created_at']
-   
+
+
+# Field types whose to_representation is a no-op for values read from the DB.
+PASSTHROUGH_FIELDS = (serializers.CharField, serializers.IntegerField)
+
+
+def _compile_converter(field):
+    """
+    Return a ``convert(value, tz)`` callable for ``field``, or None when the
+    DB value is already its representation. The common DateTimeField and
+    DecimalField cases are inlined; anything unusual defers to the field.
+    """
+    if type(field) in PASSTHROUGH_FIELDS or (
+        isinstance(field, serializers.PrimaryKeyRelatedField) and field.pk_field is None
+    ):
+        return None
+
+    if (
+        type(field) is serializers.DateTimeField
+        and not hasattr(field, 'timezone')
+        and (getattr(field, 'format', api_settings.DATETIME_FORMAT) or '').lower() == ISO_8601
+    ):
+        def convert_datetime(value, tz):
+            if tz is None or not isinstance(value, datetime.datetime) or timezone.is_naive(value):
+                return field.to_representation(value)
+            value = value.astimezone(tz).isoformat()
+            return value[:-6] + 'Z' if value.endswith('+00:00') else value
+        return convert_datetime
+
+    if (
+        type(field) is serializers.DecimalField
+        and getattr(field, 'coerce_to_string', api_settings.COERCE_DECIMAL_TO_STRING)
+        and not field.localize
+        and not field.normalize_output
+        and field.decimal_places is not None
+    ):
+        exponent = -field.decimal_places
+
+        def convert_decimal(value, tz):
+            # Values the DB already returns at the field's scale need no quantize.
+            if isinstance(value, decimal.Decimal) and value.as_tuple().exponent == exponent:
+                return f'{value:f}'
+            return field.to_representation(value)
+        return convert_decimal
+
+    def convert(value, tz):
+        return field.to_representation(value)
+    return convert
+
+
+@functools.lru_cache(maxsize=None)
+def readable_field_names(serializer_class):
+    return tuple(
+        name for name, field in serializer_class().fields.items() if not field.write_only
+    )
+
+
+@functools.lru_cache(maxsize=None)
+def compile_values_mapper(serializer_class, field_names=None):
+    """
+    Precompile ``serializer_class`` into ``(value_fields, mapper)``, limited
+    to ``field_names`` (a frozenset) when given.
+
+    ``value_fields`` are the columns to pass to ``QuerySet.values()`` and
+    ``mapper(rows)`` turns those rows into the exact dicts the serializer
+    would produce for the model instances, without building the instances
+    or walking the serializer per row.
+    """
+    converters = []
+    for name, field in serializer_class().fields.items():
+        if field.write_only or (field_names is not None and name not in field_names):
+            continue
+        if '.' in field.source or field.source == '*':
+            raise ValueError(f"{serializer_class.__name__}.{name} cannot be read from values().")
+        converters.append((name, field.source, _compile_converter(field)))
+
+    def mapper(rows):
+        tz = timezone.get_current_timezone() if settings.USE_TZ else None
+        results = []
+        for row in rows:
+            data = {}
+            for name, source, convert in converters:
+                value = row[source]
+                data[name] = value if value is None or convert is None else convert(value, tz)
+            results.append(data)
+        return results
+
+    return tuple(source for _, source, _ in converters), mapper
+
+
 class CartSerializer(serializers.ModelSerializer):
     user = serializers.StringRelatedField(read_only=True)
     class Meta:
@@ -19,19 +115,21 @@ class CartSerializer(serializers.ModelSerializer):
 class CartItemSerializer(serializers.ModelSerializer): 
 
     product = serializers.StringRelatedField(read_only=True)
+    product_id = serializers.IntegerField(write_only=True, required=False)
 
     class Meta:
         model = CartItem
-        fields = ['id', 'cart', 'product', 'quantity']
+        fields = ['id', 'cart', 'product', 'product_id', 'quantity']
+        read_only_fields = ['cart']
 
 
     def validate(self, data):
-        product = self.instance.product if self.instance else data.get('product', None)
-        
         if self.instance:
             quantity = data.get('quantity', self.instance.quantity)
         else:
             quantity = data.get('quantity')
+            if data.get('product_id') is None:
+                raise serializers.ValidationError("Product is required.")
 
         if quantity is None:
             raise serializers.ValidationError("Quantity is required.")
@@ -39,77 +137,56 @@ class CartItemSerializer(serializers.ModelSerializer):
         if quantity < 1:
             raise serializers.ValidationError("Quantity must be at least 1.")
 
-        if product and hasattr(product, 'stock') and quantity > product.stock:
-            raise serializers.ValidationError(
-                f"Only {product.stock} items available in stock."
-            )
-
         return data
 
-
-
-class OrderCreateSerializer(serializers.ModelSerializer):
-    class Meta:
-        model = Order
-        fields = ['order_id', 'user', 'total_price', 'created_at', 'status']
-        read_only_fields = ['order_id', 'user', 'total_price', 'created_at', 'status']
-
+    # The cart backend checks stock against the current product rows.
     def create(self, validated_data):
-        user = self.context['request'].user
-
-        try:
-            cart = Cart.objects.get(user=user)
-        except Cart.DoesNotExist:
-            raise serializers.ValidationError("Cart does not exist.")
-
-        cart_items = cart.items.select_related('product')
-
-        if not cart_items.exists():
-            raise serializers.ValidationError("Cart is empty, cannot create order.")
+        return get_cart_backend().add_item(
+            self.context['request'].user, validated_data['product_id'], validated_data['quantity']
+        )
+
+    def update(self, instance, validated_data):
+        if 'quantity' in validated_data:
+            get_cart_backend().set_items(
+                self.context['request'].user,
+                {instance.product_id: validated_data['quantity']},
+                replace=True,
+            )
+            instance.quantity = validated_data['quantity']
+        return instance
 
-        with transaction.atomic():
 
-            product_ids = [item.product_id for item in cart_items]
-            products = Product.objects.select_for_update().filter(id__in=product_ids)
+class CartBatchItemSerializer(serializers.Serializer):
+    product_id = serializers.IntegerField(min_value=1)
+    quantity = serializers.IntegerField(min_value=1)
 
-            product_map = {p.id: p for p in products}
-            for item in cart_items:
-                product = product_map[item.product_id]
-                if product.stock < item.quantity:
-                    raise serializers.ValidationError(
-                        f"Not enough stock for {product.name}. "
-                        f"Available: {product.stock}, Requested: {item.quantity}"
-                    )
 
-            total_price = sum(
-                product_map[item.product_id].price * item.quantity
-                for item in cart_items
-            )
+class CartBatchSerializer(serializers.Serializer):
+    items = CartBatchItemSerializer(many=True, allow_empty=False, max_length=CART_BATCH_MAX_ITEMS)
+    replace = serializers.BooleanField(default=False)
 
-            order = Order.objects.create(
-                user=user,
-                total_price=total_price
-            )
 
-            order_items = []
 
-            for item in cart_items:
-                product = product_map[item.product_id]
+class OrderSerializer(serializers.ModelSerializer):
+    """Orders with their lines as snapshotted at checkout; reads only the order row."""
+    class Meta:
+        model = Order
+        fields = ['order_id', 'user', 'total_price', 'created_at', 'status', 'item_count', 'items']
+        read_only_fields = fields
 
-                order_items.append(
-                    OrderItem(
-                        order=order,
-                        product=product,
-                        quantity=item.quantity,
-                        price=product.price
-                    )
-                )
 
-                product.stock = F('stock') - item.quantity
-                product.save(update_fields=['stock'])
+class OrderItemSerializer(serializers.ModelSerializer):
+    """Live order lines, returned in place of the snapshot with ``?expand=items``."""
+    product = ProductSerializer(read_only=True)
 
-            OrderItem.objects.bulk_create(order_items)
+    class Meta:
+        model = OrderItem
+        fields = ['id', 'product', 'quantity', 'price']
 
-            cart.items.all().delete()
 
-            return order
\ No newline at end of file
+class OrderCreateSerializer(OrderSerializer):
+    def create(self, validated_data):
+        user = self.context['request'].user
+        order = place_order(user)
+        invalidate_cart_summary(user.pk)
+        return order
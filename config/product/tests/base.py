@@ -0,0 +1,28 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from rest_framework.test import APITestCase
+
+from product.models import Cart, CartItem, Product
+
+User = get_user_model()
+
+
+class ShopTestCase(APITestCase):
+    """A signed-in buyer, an admin client and one product with five in stock."""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('buyer', 'buyer@example.com', 'secret')
+        self.admin = User.objects.create_superuser('admin', 'admin@example.com', 'secret')
+        self.client.force_authenticate(self.user)
+        self.lamp = Product.objects.create(name='Lamp', description='Desk lamp', price='2.50', stock=5)
+
+    def fill_cart(self, user, product, quantity):
+        cart, _ = Cart.objects.get_or_create(user=user)
+        CartItem.objects.create(cart=cart, product=product, quantity=quantity)
+
+    def place(self, **extra):
+        return self.client.post('/api/orders/', **extra)
+
+    def as_admin(self):
+        self.client.force_authenticate(self.admin)
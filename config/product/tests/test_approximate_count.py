@@ -0,0 +1,40 @@
+from django.core.cache import cache
+from django.test import TestCase
+
+from product.models import Product
+from product.pagination import ApproximateCountPaginator, get_approximate_count
+
+from .base import ShopTestCase
+
+
+class ApproximateCountTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        Product.objects.bulk_create(
+            Product(name=f'Chair {n}', description='Chair', price='5.00', stock=1) for n in range(5)
+        )
+
+    def test_small_results_are_counted_exactly(self):
+        self.assertEqual(get_approximate_count(Product.objects.all(), threshold=5), (5, False))
+
+    def test_large_results_reuse_a_cached_count(self):
+        self.assertEqual(get_approximate_count(Product.objects.all(), threshold=3), (5, True))
+        Product.objects.create(name='Chair 6', description='Chair', price='5.00', stock=1)
+
+        self.assertEqual(get_approximate_count(Product.objects.all(), threshold=3), (5, True))
+        self.assertEqual(get_approximate_count(Product.objects.filter(name='Chair 6'), threshold=3), (1, False))
+
+    def test_admin_paginator_flags_estimates(self):
+        paginator = ApproximateCountPaginator(Product.objects.order_by('id'), 2)
+
+        self.assertEqual(paginator.count, 5)
+        self.assertFalse(paginator.count_is_approximate)
+        self.assertEqual(paginator.num_pages, 3)
+
+
+class OffsetCountTests(ShopTestCase):
+    def test_offset_pages_report_whether_the_count_is_approximate(self):
+        response = self.client.get('/api/products/', {'pagination': 'offset', 'limit': 1})
+
+        self.assertEqual(response.data['count'], 1)
+        self.assertIs(response.data['count_is_approximate'], False)
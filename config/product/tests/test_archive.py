@@ -0,0 +1,68 @@
+import datetime
+import io
+
+from django.core.management import call_command
+from django.utils import timezone
+from rest_framework import status
+
+from product.analytics import queue_for_rollups
+from product.archive import archive_orders
+from product.models import ArchivedOrder, ArchivedOrderItem, Order, OrderItem
+
+from .base import ShopTestCase
+from .test_pagination import walk
+
+
+class ArchiveTests(ShopTestCase):
+    def setUp(self):
+        super().setUp()
+        self.order_ids = []
+        for quantity in (1, 1, 1):
+            self.fill_cart(self.user, self.lamp, quantity)
+            self.order_ids.append(self.place().data['order_id'])
+        self.as_admin()
+        self.client.post('/api/orders/bulk-pay/', {'order_ids': self.order_ids[:2]}, format='json')
+        self.client.force_authenticate(self.user)
+        # Oldest first in self.order_ids; the two paid ones are archivable.
+        now = timezone.now()
+        for n, order_id in enumerate(self.order_ids):
+            Order.objects.filter(pk=order_id).update(created_at=now - datetime.timedelta(days=200 - n))
+        call_command('build_recommendations', stdout=io.StringIO())
+        call_command('backfill_sales_rollups', pending=True, stdout=io.StringIO())
+
+    def test_only_old_final_orders_move(self):
+        dry = archive_orders(dry_run=True)
+        self.assertEqual((dry['orders'], Order.objects.count()), (2, 3))
+
+        report = archive_orders(batch_size=1)
+
+        self.assertEqual((report['orders'], report['items'], report['batches']), (2, 2, 2))
+        self.assertEqual(str(Order.objects.get().pk), self.order_ids[2])
+        self.assertEqual(ArchivedOrder.objects.count(), 2)
+        self.assertEqual(ArchivedOrderItem.objects.count(), 2)
+        self.assertEqual(OrderItem.objects.count(), 1)
+
+    def test_orders_waiting_for_the_rollups_stay(self):
+        queue_for_rollups([self.order_ids[0]], 'paid')
+
+        self.assertEqual(archive_orders()['orders'], 1)
+        self.assertTrue(Order.objects.filter(pk=self.order_ids[0]).exists())
+
+    def test_reads_span_the_archive(self):
+        archive_orders()
+
+        self.assertEqual(walk(self, '/api/orders/?limit=1', 'order_id'), self.order_ids[::-1])
+        archived = self.client.get(f'/api/orders/{self.order_ids[0]}/')
+        self.assertEqual(archived.status_code, status.HTTP_200_OK)
+        self.assertEqual(archived.data['status'], Order.StatusChoices.COMPLETED)
+        self.assertEqual(self.client.get(f'/api/orders/{self.order_ids[0]}/status/').status_code, status.HTTP_200_OK)
+
+    def test_export_includes_archived_orders(self):
+        archive_orders()
+        self.as_admin()
+
+        response = self.client.get('/api/orders/export/')
+
+        lines = b''.join(response.streaming_content).decode().strip().splitlines()
+        self.assertEqual(lines[0].split(',')[0], 'order_id')
+        self.assertEqual(sorted(line.split(',')[0] for line in lines[1:]), sorted(self.order_ids))
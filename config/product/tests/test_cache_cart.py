@@ -0,0 +1,81 @@
+import shutil
+import tempfile
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.test import override_settings
+from rest_framework import status
+
+from product.cart import CART_CACHE_KEY, CacheCartBackend
+from product.models import CartItem, Order, Product
+
+from .base import ShopTestCase
+
+CACHE_DIR = tempfile.mkdtemp(prefix='product-cart-tests-')
+
+
+@override_settings(
+    CART_BACKEND='product.cart.CacheCartBackend',
+    CACHES={'default': {'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': CACHE_DIR}},
+)
+class CacheCartBackendTests(ShopTestCase):
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(CACHE_DIR, ignore_errors=True)
+
+    def add(self, product, quantity):
+        return self.client.post('/api/cart-items/', {'product_id': product.pk, 'quantity': quantity}, format='json')
+
+    def test_lines_stay_in_the_cache(self):
+        self.add(self.lamp, 2)
+        response = self.add(self.lamp, 1)
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['quantity'], 3)
+        self.assertFalse(CartItem.objects.exists())
+        self.assertEqual(cache.get(CART_CACHE_KEY.format(self.user.pk))['items'], {self.lamp.pk: 3})
+        listed = self.client.get('/api/cart-items/').data['results']
+        self.assertEqual([(line['id'], line['quantity']) for line in listed], [(self.lamp.pk, 3)])
+
+    def test_stock_is_checked_against_the_cached_quantity(self):
+        self.add(self.lamp, 4)
+
+        self.assertEqual(self.add(self.lamp, 2).status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_persist_writes_the_rows(self):
+        desk = Product.objects.create(name='Desk', description='Oak desk', price='10.00', stock=3)
+        self.add(self.lamp, 2)
+        self.add(desk, 1)
+
+        CacheCartBackend().persist(self.user)
+
+        self.assertEqual(dict(CartItem.objects.values_list('product_id', 'quantity')), {self.lamp.pk: 2, desk.pk: 1})
+
+    def test_checkout_reads_the_cached_cart_then_forgets_it(self):
+        self.add(self.lamp, 2)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.place()
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Order.objects.get().item_count, 2)
+        self.lamp.refresh_from_db()
+        self.assertEqual(self.lamp.stock, 3)
+        self.assertIsNone(cache.get(CART_CACHE_KEY.format(self.user.pk)))
+        self.assertEqual(self.client.get('/api/cart-items/').data['results'], [])
+
+    def test_a_held_lock_is_a_conflict(self):
+        cache.add(f"{CART_CACHE_KEY.format(self.user.pk)}:lock", 'other', 10)
+
+        with mock.patch('product.cart.CART_LOCK_WAIT', 0):
+            response = self.add(self.lamp, 1)
+
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+
+
+class CacheCartBackendSetupTests(ShopTestCase):
+    def test_a_per_process_cache_is_refused(self):
+        with self.assertRaises(ImproperlyConfigured):
+            CacheCartBackend()
@@ -0,0 +1,98 @@
+from django.conf import settings
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.test import TransactionTestCase
+from rest_framework import status
+
+from product.models import Cart, CartItem, Order, Product
+
+from .base import ShopTestCase
+
+
+class CartUpsertTests(ShopTestCase):
+    def add(self, product, quantity):
+        return self.client.post('/api/cart-items/', {'product_id': product.pk, 'quantity': quantity}, format='json')
+
+    def test_adding_twice_bumps_one_line(self):
+        self.assertEqual(self.add(self.lamp, 2).status_code, status.HTTP_201_CREATED)
+        response = self.add(self.lamp, 3)
+
+        self.assertEqual(response.data['quantity'], 5)
+        self.assertEqual(CartItem.objects.get().quantity, 5)
+
+    def test_adding_past_the_stock_is_refused(self):
+        self.add(self.lamp, 4)
+
+        self.assertEqual(self.add(self.lamp, 2).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(CartItem.objects.get().quantity, 4)
+
+    def test_batch_adds_or_sets(self):
+        desk = Product.objects.create(name='Desk', description='Oak desk', price='10.00', stock=3)
+        self.add(self.lamp, 1)
+
+        added = self.client.post('/api/cart-items/batch/', {'items': [
+            {'product_id': self.lamp.pk, 'quantity': 1},
+            {'product_id': desk.pk, 'quantity': 2},
+            {'product_id': self.lamp.pk, 'quantity': 1},
+        ]}, format='json')
+        self.assertEqual(added.status_code, status.HTTP_200_OK)
+        self.assertEqual(dict(CartItem.objects.values_list('product_id', 'quantity')), {self.lamp.pk: 3, desk.pk: 2})
+
+        replaced = self.client.post('/api/cart-items/batch/', {
+            'items': [{'product_id': desk.pk, 'quantity': 1}], 'replace': True,
+        }, format='json')
+        self.assertEqual(replaced.status_code, status.HTTP_200_OK)
+        self.assertEqual(dict(CartItem.objects.values_list('product_id', 'quantity')), {self.lamp.pk: 3, desk.pk: 1})
+
+    def test_batch_is_all_or_nothing(self):
+        response = self.client.post('/api/cart-items/batch/', {'items': [
+            {'product_id': self.lamp.pk, 'quantity': 1},
+            {'product_id': self.lamp.pk + 100, 'quantity': 1},
+        ]}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(CartItem.objects.exists())
+
+    def test_a_second_cart_row_is_ignored(self):
+        oldest = Cart.objects.create(user=self.user)
+        CartItem.objects.create(cart=oldest, product=self.lamp, quantity=1)
+        CartItem.objects.create(cart=Cart.objects.create(user=self.user), product=self.lamp, quantity=1)
+
+        response = self.add(self.lamp, 1)
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['cart'], oldest.pk)
+        self.assertEqual(list(CartItem.objects.order_by('cart_id').values_list('quantity', flat=True)), [2, 1])
+        order = self.place()
+        self.assertEqual(order.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Order.objects.get().item_count, 2)
+
+
+class MergeDuplicateCartItemsMigrationTests(TransactionTestCase):
+    before = [('product', '0010_order_queue')]
+    after = [('product', '0011_cartitem_unique_product')]
+
+    def migrate(self, targets):
+        executor = MigrationExecutor(connection)
+        executor.loader.build_graph()
+        executor.migrate(targets)
+        return executor.loader.project_state(targets).apps
+
+    def tearDown(self):
+        self.migrate(MigrationExecutor(connection).loader.graph.leaf_nodes())
+
+    def test_duplicate_lines_are_folded_into_the_oldest(self):
+        apps = self.migrate(self.before)
+        user = apps.get_model(settings.AUTH_USER_MODEL).objects.create(username='buyer')
+        product = apps.get_model('product', 'Product').objects.create(
+            name='Lamp', description='Desk lamp', price='2.50', stock=5
+        )
+        cart = apps.get_model('product', 'Cart').objects.create(user=user)
+        HistoricalCartItem = apps.get_model('product', 'CartItem')
+        first = HistoricalCartItem.objects.create(cart=cart, product=product, quantity=1)
+        HistoricalCartItem.objects.create(cart=cart, product=product, quantity=2)
+
+        apps = self.migrate(self.after)
+
+        lines = list(apps.get_model('product', 'CartItem').objects.values_list('id', 'quantity'))
+        self.assertEqual(lines, [(first.pk, 3)])
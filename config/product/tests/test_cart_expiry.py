@@ -0,0 +1,68 @@
+import datetime
+from io import StringIO
+
+from django.core.management import call_command
+from django.utils import timezone
+
+from product.cart import expire_idle_carts
+from product.models import Cart, CartItem
+
+from .base import ShopTestCase, User
+
+
+class ExpireIdleCartsTests(ShopTestCase):
+    def cart(self, user, days_old, line_days_old=None, stamped=True):
+        """A cart created ``days_old`` days ago with one Lamp line."""
+        then = timezone.now() - datetime.timedelta(days=days_old)
+        cart = Cart.objects.create(user=user)
+        Cart.objects.filter(pk=cart.pk).update(created_at=then)
+        item = CartItem.objects.create(cart=cart, product=self.lamp, quantity=1)
+        if not stamped:
+            CartItem.objects.filter(pk=item.pk).update(updated_at=None)
+        elif line_days_old is not None:
+            CartItem.objects.filter(pk=item.pk).update(
+                updated_at=timezone.now() - datetime.timedelta(days=line_days_old)
+            )
+        return cart
+
+    def setUp(self):
+        super().setUp()
+        self.other = User.objects.create_user('other', 'other@example.com', 'secret')
+
+    def test_only_idle_carts_go(self):
+        idle = self.cart(self.user, 40, line_days_old=40)
+        recent = self.cart(self.other, 2)
+        old_but_touched = self.cart(self.admin, 40, line_days_old=1)
+
+        report = expire_idle_carts(batch_size=1)
+
+        self.assertEqual((report['carts'], report['items']), (1, 1))
+        self.assertEqual(
+            set(Cart.objects.values_list('id', flat=True)),
+            {recent.pk, old_but_touched.pk},
+        )
+        self.assertFalse(CartItem.objects.filter(cart_id=idle.pk).exists())
+
+    def test_a_line_without_a_stamp_keeps_its_cart(self):
+        kept = self.cart(self.user, 40, stamped=False)
+
+        self.assertEqual(expire_idle_carts()['carts'], 0)
+        self.assertTrue(Cart.objects.filter(pk=kept.pk).exists())
+
+    def test_dry_run_counts_without_deleting(self):
+        self.cart(self.user, 40, line_days_old=40)
+        self.cart(self.other, 40, line_days_old=40)
+
+        report = expire_idle_carts(batch_size=1, dry_run=True)
+
+        self.assertEqual((report['carts'], report['items'], report['batches']), (2, 2, 2))
+        self.assertEqual(Cart.objects.count(), 2)
+
+    def test_command(self):
+        self.cart(self.user, 10, line_days_old=10)
+        out = StringIO()
+
+        call_command('expire_carts', days=7, stdout=out)
+
+        self.assertIn('1 cart(s) and 1 item(s) removed', out.getvalue())
+        self.assertFalse(Cart.objects.exists())
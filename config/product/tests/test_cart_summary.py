@@ -0,0 +1,54 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+
+from product.models import Product
+
+from .base import ShopTestCase
+
+
+class CartSummaryTests(ShopTestCase):
+    def summary(self):
+        response = self.client.get('/api/carts/summary/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data
+
+    def test_no_cart_is_an_empty_summary(self):
+        self.assertEqual(self.summary(), {
+            'cart_id': None, 'items': [], 'item_count': 0, 'total_quantity': 0,
+            'total': '0.00', 'warnings': [],
+        })
+
+    def test_lines_totals_and_stock_warnings(self):
+        desk = Product.objects.create(name='Desk', description='Oak desk', price='10.00', stock=1)
+        self.fill_cart(self.user, self.lamp, 2)
+        self.fill_cart(self.user, desk, 3)
+
+        summary = self.summary()
+
+        self.assertEqual([(line['product'], line['line_total']) for line in summary['items']],
+                         [('Lamp', '5.00'), ('Desk', '30.00')])
+        self.assertEqual((summary['item_count'], summary['total_quantity'], summary['total']), (2, 5, '35.00'))
+        self.assertEqual(summary['warnings'], [{
+            'product_id': desk.pk, 'product': 'Desk', 'requested': 3, 'available': 1,
+            'detail': 'Only 1 items available in stock.',
+        }])
+
+    def test_summary_is_cached_until_the_cart_changes(self):
+        self.client.post('/api/cart-items/', {'product_id': self.lamp.pk, 'quantity': 1}, format='json')
+        self.assertEqual(self.summary()['total_quantity'], 1)
+
+        with CaptureQueriesContext(connection) as queries:
+            self.summary()
+        self.assertFalse([q for q in queries if 'product_cartitem' in q['sql']])
+
+        self.client.post('/api/cart-items/', {'product_id': self.lamp.pk, 'quantity': 2}, format='json')
+        self.assertEqual(self.summary()['total_quantity'], 3)
+
+    def test_checkout_clears_the_summary(self):
+        self.client.post('/api/cart-items/', {'product_id': self.lamp.pk, 'quantity': 1}, format='json')
+        self.summary()
+
+        self.assertEqual(self.place().status_code, status.HTTP_201_CREATED)
+
+        self.assertEqual(self.summary()['item_count'], 0)
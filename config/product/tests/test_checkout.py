@@ -0,0 +1,55 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+
+from product.checkout import place_order
+from product.models import CartItem, Order, OrderItem, Product
+
+from .base import ShopTestCase, User
+
+
+class CheckoutTests(ShopTestCase):
+    def test_insufficient_stock_is_rejected(self):
+        self.fill_cart(self.user, self.lamp, 6)
+
+        response = self.place()
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.lamp.refresh_from_db()
+        self.assertEqual(self.lamp.stock, 5)
+        self.assertFalse(Order.objects.exists())
+        self.assertTrue(CartItem.objects.filter(cart__user=self.user).exists())
+
+    def test_last_unit_is_sold_once(self):
+        other = User.objects.create_user('other', 'other@example.com', 'secret')
+        self.lamp.stock = 1
+        self.lamp.save(update_fields=['stock'])
+        self.fill_cart(self.user, self.lamp, 1)
+        self.fill_cart(other, self.lamp, 1)
+
+        first = self.place()
+        self.client.force_authenticate(other)
+        second = self.place()
+
+        self.assertEqual(first.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(second.status_code, status.HTTP_400_BAD_REQUEST)
+        self.lamp.refresh_from_db()
+        self.assertEqual(self.lamp.stock, 0)
+        self.assertEqual(Order.objects.count(), 1)
+
+    def test_stock_is_the_last_write(self):
+        desk = Product.objects.create(name='Desk', description='Oak desk', price='10.00', stock=3)
+        self.fill_cart(self.user, self.lamp, 2)
+        self.fill_cart(self.user, desk, 1)
+
+        with CaptureQueriesContext(connection) as queries:
+            order = place_order(self.user)
+
+        writes = [
+            query['sql'] for query in queries
+            if query['sql'].startswith(('INSERT', 'UPDATE', 'DELETE')) and 'SAVEPOINT' not in query['sql']
+        ]
+        self.assertTrue(writes[-1].startswith('UPDATE "product_product" SET "stock"'))
+        self.assertEqual(sum('"product_product"' in sql for sql in writes), 1)
+        self.assertEqual(OrderItem.objects.filter(order=order).count(), 2)
+        self.assertEqual(list(Product.objects.order_by('id').values_list('stock', flat=True)), [3, 2])
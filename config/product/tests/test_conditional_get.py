@@ -0,0 +1,65 @@
+from rest_framework import status
+
+from .base import ShopTestCase
+
+
+class ProductDetailConditionalGetTests(ShopTestCase):
+    def url(self, pk=None):
+        return f'/api/products/{self.lamp.pk if pk is None else pk}/'
+
+    def test_matching_etag_gets_304(self):
+        first = self.client.get(self.url())
+
+        self.assertEqual(first.status_code, status.HTTP_200_OK)
+        self.assertFalse(first['ETag'].startswith('W/'))
+        self.assertIn('Last-Modified', first)
+        second = self.client.get(self.url(), HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(second.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(second['ETag'], first['ETag'])
+
+    def test_write_changes_the_etag(self):
+        etag = self.client.get(self.url())['ETag']
+        self.as_admin()
+
+        self.client.patch(self.url(), {'name': 'Floor lamp'})
+        response = self.client.get(self.url(), HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['name'], 'Floor lamp')
+
+    def test_padded_pk_shares_the_stamp(self):
+        etag = self.client.get(self.url())['ETag']
+        self.assertEqual(self.client.get(self.url(f'0{self.lamp.pk}'))['ETag'], etag)
+        self.as_admin()
+
+        self.client.patch(self.url(), {'name': 'Floor lamp'})
+        response = self.client.get(self.url(f'0{self.lamp.pk}'), HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['name'], 'Floor lamp')
+
+    def test_sparse_fields_get_their_own_etag(self):
+        full = self.client.get(self.url())
+        sparse = self.client.get(self.url(), {'fields': 'id,name'})
+
+        self.assertNotEqual(full['ETag'], sparse['ETag'])
+        self.assertEqual(set(sparse.data), {'id', 'name'})
+
+    def test_unknown_and_malformed_pks_are_not_found(self):
+        for pk in (self.lamp.pk + 100, 'abc', '-1', '1_0'):
+            self.assertEqual(self.client.get(self.url(pk)).status_code, status.HTTP_404_NOT_FOUND)
+            self.assertEqual(self.client.get(f'{self.url(pk)}related/').status_code, status.HTTP_404_NOT_FOUND)
+
+
+class ProductListConditionalGetTests(ShopTestCase):
+    def test_list_etag_follows_the_catalog(self):
+        etag = self.client.get('/api/products/')['ETag']
+        self.assertEqual(
+            self.client.get('/api/products/', HTTP_IF_NONE_MATCH=etag).status_code,
+            status.HTTP_304_NOT_MODIFIED,
+        )
+        self.as_admin()
+
+        self.client.post('/api/products/', {'name': 'Desk', 'description': 'Oak desk', 'price': '10.00', 'stock': 1})
+
+        self.assertEqual(self.client.get('/api/products/', HTTP_IF_NONE_MATCH=etag).status_code, status.HTTP_200_OK)
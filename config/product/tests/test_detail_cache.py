@@ -0,0 +1,69 @@
+from rest_framework import status
+
+from product.cache import cache_product_details, get_cache_stats, get_product_stamps, refresh_products
+from product.models import Product
+
+from .base import ShopTestCase
+
+
+class ProductDetailCacheTests(ShopTestCase):
+    def url(self):
+        return f'/api/products/{self.lamp.pk}/'
+
+    def detail_stats(self):
+        return get_cache_stats(["detail"])["detail"]
+
+    def test_second_read_is_a_hit(self):
+        self.client.get(self.url())
+        response = self.client.get(self.url())
+
+        self.assertEqual(response.data['name'], 'Lamp')
+        self.assertEqual((self.detail_stats()['miss'], self.detail_stats()['hit']), (1, 1))
+
+    def test_checkout_and_cancel_refresh_the_stock(self):
+        self.assertEqual(self.client.get(self.url()).data['stock'], 5)
+        self.fill_cart(self.user, self.lamp, 2)
+        with self.captureOnCommitCallbacks(execute=True):
+            order_id = self.place().data['order_id']
+
+        self.assertEqual(self.client.get(self.url()).data['stock'], 3)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(f'/api/orders/{order_id}/cancel/')
+        self.assertEqual(self.client.get(self.url()).data['stock'], 5)
+
+    def test_fill_racing_a_write_is_never_served(self):
+        stamps = get_product_stamps([self.lamp.pk])
+        stale = self.client.get(self.url()).data
+        cache_product_details([stale], stamps)
+        Product.objects.filter(pk=self.lamp.pk).update(stock=1)
+        refresh_products([self.lamp.pk])
+        # A reader that fetched before the write finishes filling afterwards.
+        cache_product_details([{**stale, 'stock': 5}], stamps)
+
+        self.assertEqual(self.client.get(self.url()).data['stock'], 1)
+        self.assertEqual(self.client.get('/api/products/batch/', {'ids': self.lamp.pk}).data[0]['stock'], 1)
+
+
+class ProductBatchTests(ShopTestCase):
+    def setUp(self):
+        super().setUp()
+        self.desk = Product.objects.create(name='Desk', description='Oak desk', price='10.00', stock=1)
+
+    def test_batch_keeps_the_requested_order_and_skips_unknown_ids(self):
+        ids = f'{self.desk.pk},{self.desk.pk + 100},{self.lamp.pk},{self.desk.pk}'
+
+        response = self.client.get('/api/products/batch/', {'ids': ids, 'fields': 'id,name'})
+
+        self.assertEqual(response.data, [{'id': self.desk.pk, 'name': 'Desk'}, {'id': self.lamp.pk, 'name': 'Lamp'}])
+
+    def test_batch_reuses_detail_entries(self):
+        self.client.get('/api/products/batch/', {'ids': f'{self.lamp.pk},{self.desk.pk}'})
+        with self.assertNumQueries(0):
+            response = self.client.get('/api/products/batch/', {'ids': f'{self.lamp.pk},{self.desk.pk}'})
+
+        self.assertEqual([item['name'] for item in response.data], ['Lamp', 'Desk'])
+
+    def test_batch_rejects_bad_ids(self):
+        self.assertEqual(self.client.get('/api/products/batch/', {'ids': '1,x'}).status_code, status.HTTP_400_BAD_REQUEST)
+        too_many = ','.join(str(pk) for pk in range(1, 102))
+        self.assertEqual(self.client.get('/api/products/batch/', {'ids': too_many}).status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,57 @@
+import io
+import json
+
+from rest_framework import status
+
+from product.importer import import_products
+from product.models import Product
+
+from .base import ShopTestCase
+
+
+class ExportTests(ShopTestCase):
+    def setUp(self):
+        super().setUp()
+        Product.objects.create(name='Desk', description='Oak desk, "solid"\nwith drawers', price='10.00', stock=2)
+        self.as_admin()
+
+    def export(self, path, **params):
+        response = self.client.get(path, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response, b''.join(response.streaming_content).decode()
+
+    def test_csv_export_round_trips_through_the_importer(self):
+        before = list(Product.objects.order_by('id').values('id', 'name', 'description', 'price', 'stock'))
+        response, body = self.export('/api/products/export/')
+        self.assertEqual(response['Content-Type'], 'text/csv; charset=utf-8')
+        self.assertIn('attachment; filename="products', response['Content-Disposition'])
+        Product.objects.update(name='changed', stock=0)
+
+        report = import_products(io.StringIO(body), 'csv')
+
+        self.assertEqual((report['updated'], report['failed']), (2, 0))
+        self.assertEqual(list(Product.objects.order_by('id').values('id', 'name', 'description', 'price', 'stock')), before)
+
+    def test_ndjson_export_has_one_object_per_line_and_honours_filters(self):
+        _, body = self.export('/api/products/export/', file_format='ndjson', search='oak')
+
+        rows = [json.loads(line) for line in body.splitlines()]
+        self.assertEqual([row['name'] for row in rows], ['Desk'])
+        self.assertEqual(rows[0]['price'], '10.00')
+
+    def test_order_export(self):
+        self.fill_cart(self.user, self.lamp, 1)
+        self.client.force_authenticate(self.user)
+        order_id = self.place().data['order_id']
+        self.as_admin()
+
+        _, body = self.export('/api/orders/export/', file_format='ndjson')
+
+        row = json.loads(body)
+        self.assertEqual((row['order_id'], row['user__username'], row['total_price']), (order_id, 'buyer', '2.50'))
+
+    def test_exports_are_staff_only_and_validate_the_format(self):
+        self.assertEqual(self.client.get('/api/products/export/', {'file_format': 'xml'}).status_code, status.HTTP_400_BAD_REQUEST)
+        self.client.force_authenticate(self.user)
+        self.assertEqual(self.client.get('/api/products/export/').status_code, status.HTTP_403_FORBIDDEN)
+        self.assertEqual(self.client.get('/api/orders/export/').status_code, status.HTTP_403_FORBIDDEN)
@@ -0,0 +1,57 @@
+from django.test import override_settings
+from rest_framework import status
+
+from product.models import Order
+
+from .base import ShopTestCase
+
+
+class IdempotencyTests(ShopTestCase):
+    def test_retry_replays_the_first_response(self):
+        self.fill_cart(self.user, self.lamp, 1)
+
+        first = self.place(HTTP_IDEMPOTENCY_KEY='checkout-1')
+        second = self.place(HTTP_IDEMPOTENCY_KEY='checkout-1')
+
+        self.assertEqual(first.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(second.status_code, first.status_code)
+        self.assertEqual(second.data, first.data)
+        self.assertEqual(second['Idempotent-Replayed'], 'true')
+        self.assertEqual(Order.objects.count(), 1)
+        self.lamp.refresh_from_db()
+        self.assertEqual(self.lamp.stock, 4)
+
+    @override_settings(ORDER_QUEUE_ENABLED=True)
+    def test_queued_replay_keeps_location(self):
+        self.fill_cart(self.user, self.lamp, 1)
+
+        first = self.place(HTTP_IDEMPOTENCY_KEY='checkout-2')
+        second = self.place(HTTP_IDEMPOTENCY_KEY='checkout-2')
+
+        self.assertEqual(first.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(second.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(second['Location'], first['Location'])
+        self.assertEqual(second.data, first.data)
+        self.assertEqual(Order.objects.count(), 1)
+
+    def test_pay_retry_is_replayed_not_refused(self):
+        self.fill_cart(self.user, self.lamp, 1)
+        order_id = self.place().data['order_id']
+
+        first = self.client.post(f'/api/orders/{order_id}/pay/', HTTP_IDEMPOTENCY_KEY='pay-1')
+        second = self.client.post(f'/api/orders/{order_id}/pay/', HTTP_IDEMPOTENCY_KEY='pay-1')
+        fresh = self.client.post(f'/api/orders/{order_id}/pay/', HTTP_IDEMPOTENCY_KEY='pay-2')
+
+        self.assertEqual(first.status_code, status.HTTP_200_OK)
+        self.assertEqual(second.status_code, status.HTTP_200_OK)
+        self.assertEqual(second['Idempotent-Replayed'], 'true')
+        self.assertEqual(fresh.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_key_reused_for_another_request_is_refused(self):
+        self.fill_cart(self.user, self.lamp, 1)
+        order_id = self.place(HTTP_IDEMPOTENCY_KEY='shared').data['order_id']
+
+        response = self.client.post(f'/api/orders/{order_id}/pay/', HTTP_IDEMPOTENCY_KEY='shared')
+
+        self.assertEqual(response.status_code, status.HTTP_422_UNPROCESSABLE_ENTITY)
+        self.assertEqual(Order.objects.get(pk=order_id).status, Order.StatusChoices.PENDING)
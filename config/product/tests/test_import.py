@@ -0,0 +1,73 @@
+import io
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from rest_framework import status
+
+from product.importer import import_products
+from product.models import Product
+
+from .base import ShopTestCase
+
+
+class ImportProductsTests(ShopTestCase):
+    def test_csv_rows_are_upserted_by_id(self):
+        feed = io.StringIO(
+            'id,name,description,price,stock\n'
+            f'{self.lamp.pk},Floor lamp,Tall lamp,30.00,7\n'
+            ',Desk,Oak desk,10.00,2\n'
+            '900,Chair,Pine chair,5.00,3\n'
+        )
+
+        report = import_products(feed, 'csv', chunk_size=2)
+
+        self.assertEqual(
+            {key: report[key] for key in ('rows', 'created', 'updated', 'failed')},
+            {'rows': 3, 'created': 2, 'updated': 1, 'failed': 0},
+        )
+        self.lamp.refresh_from_db()
+        self.assertEqual((self.lamp.name, self.lamp.stock), ('Floor lamp', 7))
+        self.assertTrue(Product.objects.filter(pk=900, name='Chair').exists())
+        self.assertEqual(self.client.get('/api/products/', {'search': 'tall'}).data['results'][0]['name'], 'Floor lamp')
+
+    def test_bad_rows_are_reported_and_skipped(self):
+        feed = io.StringIO(
+            '{"name": "Desk", "description": "Oak desk", "price": "10.00", "stock": 2}\n'
+            'not json\n'
+            '\n'
+            '{"name": "Chair", "description": "Pine", "price": "cheap", "stock": 2}\n'
+            '{"id": "x", "name": "Stool", "description": "Pine", "price": "1.00", "stock": 2}\n'
+            '[1, 2]\n'
+        )
+
+        report = import_products(feed, 'ndjson')
+
+        self.assertEqual((report['rows'], report['created'], report['failed']), (5, 1, 4))
+        self.assertEqual([error['line'] for error in report['errors']], [2, 4, 5, 6])
+        self.assertIn('price', report['errors'][1]['errors'])
+        self.assertEqual(sorted(Product.objects.values_list('name', flat=True)), ['Desk', 'Lamp'])
+
+    def test_import_invalidates_cached_reads(self):
+        etag = self.client.get(f'/api/products/{self.lamp.pk}/')['ETag']
+
+        import_products(io.StringIO(f'id,name,description,price,stock\n{self.lamp.pk},Lamp,New,2.50,9\n'), 'csv')
+        response = self.client.get(f'/api/products/{self.lamp.pk}/', HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['stock'], 9)
+
+    def test_upload_endpoint_is_staff_only(self):
+        def upload():
+            feed = SimpleUploadedFile('feed.csv', b'name,description,price,stock\nDesk,Oak desk,10.00,2\n')
+            return self.client.post('/api/products/import/', {'file': feed}, format='multipart')
+
+        self.assertEqual(upload().status_code, status.HTTP_403_FORBIDDEN)
+        self.as_admin()
+        response = upload()
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['created'], 1)
+        unknown = SimpleUploadedFile('feed.xml', b'<products/>')
+        self.assertEqual(
+            self.client.post('/api/products/import/', {'file': unknown}, format='multipart').status_code,
+            status.HTTP_400_BAD_REQUEST,
+        )
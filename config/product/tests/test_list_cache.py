@@ -0,0 +1,83 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import SimpleTestCase
+from rest_framework import status
+
+from product.cache import get_cache_stats, get_or_compute
+from product.models import Product
+
+from .base import ShopTestCase
+
+
+class ProductListCacheTests(ShopTestCase):
+    def list_stats(self):
+        return get_cache_stats(["list"])["list"]
+
+    def test_equivalent_queries_share_one_entry(self):
+        self.client.get('/api/products/', {'search': 'Lamp', 'name': 'Lamp'})
+        response = self.client.get('/api/products/?name=Lamp&search=%20%20lamp%20&utm_source=mail')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.list_stats()["miss"], 1)
+        self.assertEqual(self.list_stats()["hit"], 1)
+
+    def test_different_filters_get_their_own_entry(self):
+        Product.objects.create(name='Desk', description='Oak desk', price='10.00', stock=1)
+
+        lamps = self.client.get('/api/products/', {'name': 'Lamp'})
+        desks = self.client.get('/api/products/', {'name': 'Desk'})
+
+        self.assertEqual([item['name'] for item in lamps.data['results']], ['Lamp'])
+        self.assertEqual([item['name'] for item in desks.data['results']], ['Desk'])
+        self.assertEqual(self.list_stats()["miss"], 2)
+
+    def test_catalog_write_invalidates_every_page(self):
+        self.client.get('/api/products/')
+        self.as_admin()
+
+        self.client.post('/api/products/', {'name': 'Desk', 'description': 'Oak desk', 'price': '10.00', 'stock': 1})
+        response = self.client.get('/api/products/')
+
+        self.assertEqual(sorted(item['name'] for item in response.data['results']), ['Desk', 'Lamp'])
+        self.assertEqual(self.list_stats()["miss"], 2)
+
+
+class GetOrComputeTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_fresh_entry_is_not_recomputed(self):
+        compute = mock.Mock(return_value=['a'])
+
+        first = get_or_compute('k', compute, 1, scope='test')
+        second = get_or_compute('k', compute, 1, scope='test')
+
+        self.assertEqual(first, (['a'], 1))
+        self.assertEqual(second, (['a'], 1))
+        self.assertEqual(compute.call_count, 1)
+
+    def test_stale_entry_is_served_while_another_worker_rebuilds(self):
+        get_or_compute('k', lambda: ['old'], 1, scope='test')
+        cache.add('k:lock', 1, 30)
+        compute = mock.Mock(return_value=['new'])
+
+        data, generation = get_or_compute('k', compute, 2, scope='test')
+
+        self.assertEqual((data, generation), (['old'], 1))
+        compute.assert_not_called()
+        self.assertEqual(get_cache_stats(['test'])['test']['stale'], 1)
+
+    def test_new_generation_is_rebuilt_once(self):
+        get_or_compute('k', lambda: ['old'], 1, scope='test')
+
+        data, generation = get_or_compute('k', lambda: ['new'], 2, scope='test')
+
+        self.assertEqual((data, generation), (['new'], 2))
+        self.assertFalse(cache.get('k:lock'))
+        self.assertEqual(get_or_compute('k', mock.Mock(), 2, scope='test'), (['new'], 2))
+
+    def test_past_soft_ttl_is_rebuilt(self):
+        get_or_compute('k', lambda: ['old'], 1, scope='test', soft_ttl=-1)
+
+        self.assertEqual(get_or_compute('k', lambda: ['new'], 1, scope='test'), (['new'], 1))
@@ -0,0 +1,65 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+
+from .base import ShopTestCase, User
+
+
+class OrderCacheTests(ShopTestCase):
+    def setUp(self):
+        super().setUp()
+        self.other = User.objects.create_user('other', 'other@example.com', 'secret')
+        self.fill_cart(self.user, self.lamp, 1)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.order_id = self.place().data['order_id']
+
+    def orders(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/orders/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        hit = not [q for q in queries if 'product_order' in q['sql']]
+        return [row['status'] for row in response.data['results']], hit
+
+    def test_list_is_served_from_cache(self):
+        self.assertEqual(self.orders(), (['PENDING'], False))
+        self.assertEqual(self.orders(), (['PENDING'], True))
+
+    def test_pay_and_cancel_invalidate(self):
+        self.orders()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(f'/api/orders/{self.order_id}/pay/')
+        self.assertEqual(self.orders(), (['COMPLETED'], False))
+
+        self.fill_cart(self.user, self.lamp, 1)
+        with self.captureOnCommitCallbacks(execute=True):
+            second = self.place().data['order_id']
+        self.orders()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(f'/api/orders/{second}/cancel/')
+        self.assertEqual(self.orders(), (['CANCELED', 'COMPLETED'], False))
+
+    def test_delete_invalidates(self):
+        self.orders()
+        self.as_admin()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(self.client.delete(f'/api/orders/{self.order_id}/').status_code,
+                             status.HTTP_204_NO_CONTENT)
+        self.client.force_authenticate(self.user)
+
+        self.assertEqual(self.orders(), ([], False))
+
+    def test_scopes_are_per_user_and_staff(self):
+        self.orders()
+        self.as_admin()
+        self.orders()
+
+        self.client.force_authenticate(self.other)
+        self.assertEqual(self.orders(), ([], False))
+        self.fill_cart(self.other, self.lamp, 1)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.place()
+
+        self.as_admin()
+        self.assertEqual(self.orders(), (['PENDING', 'PENDING'], False))
+        self.client.force_authenticate(self.user)
+        self.assertEqual(self.orders(), (['PENDING'], True))
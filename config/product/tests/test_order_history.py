@@ -0,0 +1,43 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+
+from product.models import Product
+
+from .base import ShopTestCase
+
+
+class OrderSnapshotTests(ShopTestCase):
+    def setUp(self):
+        super().setUp()
+        self.fill_cart(self.user, self.lamp, 2)
+        self.order_id = self.place().data['order_id']
+
+    def test_list_reads_the_snapshot_only(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/orders/')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        order = response.data['results'][0]
+        self.assertEqual(order['item_count'], 2)
+        self.assertEqual(order['items'], [
+            {'product_id': self.lamp.pk, 'product_name': 'Lamp', 'quantity': 2, 'price': '2.50'},
+        ])
+        self.assertFalse([q for q in queries if 'product_orderitem' in q['sql']])
+
+    def test_snapshot_keeps_the_checkout_name_and_price(self):
+        Product.objects.filter(pk=self.lamp.pk).update(name='Desk lamp', price='3.00')
+
+        item = self.client.get(f'/api/orders/{self.order_id}/').data['items'][0]
+
+        self.assertEqual((item['product_name'], item['price']), ('Lamp', '2.50'))
+
+    def test_expand_returns_the_live_rows(self):
+        Product.objects.filter(pk=self.lamp.pk).update(name='Desk lamp')
+
+        detail = self.client.get(f'/api/orders/{self.order_id}/', {'expand': 'items'}).data
+        listed = self.client.get('/api/orders/', {'expand': 'items'}).data['results'][0]
+
+        for order in (detail, listed):
+            item = order['items'][0]
+            self.assertEqual((item['product']['name'], item['quantity'], item['price']), ('Desk lamp', 2, '2.50'))
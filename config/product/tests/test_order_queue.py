@@ -0,0 +1,75 @@
+import datetime
+
+from django.test import override_settings
+from django.utils import timezone
+from rest_framework import status
+
+from product.models import Order, OrderJob
+from product.order_queue import claim_order_jobs, process_order_jobs, prune_order_jobs
+
+from .base import ShopTestCase, User
+
+
+@override_settings(ORDER_QUEUE_ENABLED=True)
+class OrderQueueTests(ShopTestCase):
+    def enqueue(self, user, quantity):
+        self.client.force_authenticate(user)
+        self.fill_cart(user, self.lamp, quantity)
+        response = self.place()
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        return response
+
+    def test_enqueue_takes_no_stock(self):
+        response = self.enqueue(self.user, 2)
+
+        order = Order.objects.get(pk=response.data['order_id'])
+        self.assertEqual(order.status, Order.StatusChoices.QUEUED)
+        self.lamp.refresh_from_db()
+        self.assertEqual(self.lamp.stock, 5)
+        status_response = self.client.get(response['Location'])
+        self.assertEqual(status_response.data['status'], Order.StatusChoices.QUEUED)
+        self.assertEqual(status_response['Retry-After'], '1')
+
+    def test_batch_accepts_what_fits_and_rejects_the_rest_oldest_first(self):
+        other = User.objects.create_user('other', 'other@example.com', 'secret')
+        first = self.enqueue(self.user, 3).data['order_id']
+        second = self.enqueue(other, 3).data['order_id']
+        third = self.enqueue(self.user, 2).data['order_id']
+
+        report = process_order_jobs()
+
+        self.assertEqual(report, {'claimed': 3, 'accepted': 2, 'rejected': 1})
+        self.assertEqual(
+            [Order.objects.get(pk=pk).status for pk in (first, second, third)],
+            [Order.StatusChoices.PENDING, Order.StatusChoices.REJECTED, Order.StatusChoices.PENDING],
+        )
+        self.lamp.refresh_from_db()
+        self.assertEqual(self.lamp.stock, 0)
+        self.client.force_authenticate(other)
+        rejected = self.client.get(f'/api/orders/{second}/status/')
+        self.assertIn('Not enough stock for Lamp', rejected.data['error'])
+
+    def test_whole_batch_fits_in_one_decrement(self):
+        self.enqueue(self.user, 2)
+        self.enqueue(self.user, 3)
+
+        self.assertEqual(process_order_jobs(), {'claimed': 2, 'accepted': 2, 'rejected': 0})
+        self.assertEqual(process_order_jobs(), {'claimed': 0, 'accepted': 0, 'rejected': 0})
+
+    def test_stale_claims_are_handed_out_again(self):
+        self.enqueue(self.user, 1)
+        self.assertEqual(len(claim_order_jobs()), 1)
+        self.assertEqual(claim_order_jobs(), [])
+
+        OrderJob.objects.update(claimed_at=timezone.now() - datetime.timedelta(hours=1))
+
+        self.assertEqual(process_order_jobs()['accepted'], 1)
+        self.assertEqual(OrderJob.objects.get().attempts, 2)
+
+    def test_old_processed_jobs_are_pruned(self):
+        self.enqueue(self.user, 1)
+        process_order_jobs()
+
+        self.assertEqual(prune_order_jobs(), 0)
+        OrderJob.objects.update(processed_at=timezone.now() - datetime.timedelta(days=30))
+        self.assertEqual(prune_order_jobs(), 1)
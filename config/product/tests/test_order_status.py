@@ -0,0 +1,65 @@
+from rest_framework import status
+
+from product.models import Order, Product
+
+from .base import ShopTestCase
+
+
+class OrderStatusTests(ShopTestCase):
+    def test_cancel_restores_stock(self):
+        self.fill_cart(self.user, self.lamp, 2)
+        order_id = self.place().data['order_id']
+        self.lamp.refresh_from_db()
+        self.assertEqual(self.lamp.stock, 3)
+
+        response = self.client.post(f'/api/orders/{order_id}/cancel/')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.lamp.refresh_from_db()
+        self.assertEqual(self.lamp.stock, 5)
+        self.assertEqual(Order.objects.get(pk=order_id).status, Order.StatusChoices.CANCELED)
+
+        again = self.client.post(f'/api/orders/{order_id}/cancel/')
+        self.assertEqual(again.status_code, status.HTTP_400_BAD_REQUEST)
+        self.lamp.refresh_from_db()
+        self.assertEqual(self.lamp.stock, 5)
+
+    def test_bulk_cancel_restores_every_order_once(self):
+        desk = Product.objects.create(name='Desk', description='Oak desk', price='10.00', stock=4)
+        order_ids = []
+        for quantity in (1, 2):
+            self.fill_cart(self.user, self.lamp, quantity)
+            self.fill_cart(self.user, desk, quantity)
+            order_ids.append(self.place().data['order_id'])
+        self.as_admin()
+
+        response = self.client.post('/api/orders/bulk-cancel/', {'order_ids': order_ids * 2}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(sorted(map(str, response.data['updated'])), sorted(order_ids))
+        self.assertEqual(response.data['skipped'], [])
+        self.lamp.refresh_from_db()
+        desk.refresh_from_db()
+        self.assertEqual((self.lamp.stock, desk.stock), (5, 4))
+
+    def test_bulk_pay_skips_orders_that_are_not_pending(self):
+        self.fill_cart(self.user, self.lamp, 1)
+        paid = self.place().data['order_id']
+        self.fill_cart(self.user, self.lamp, 1)
+        canceled = self.place().data['order_id']
+        self.client.post(f'/api/orders/{canceled}/cancel/')
+        self.as_admin()
+
+        response = self.client.post('/api/orders/bulk-pay/', {'order_ids': [paid, canceled]}, format='json')
+
+        self.assertEqual([str(pk) for pk in response.data['updated']], [paid])
+        self.assertEqual([str(pk) for pk in response.data['skipped']], [canceled])
+        self.assertEqual(Order.objects.get(pk=paid).status, Order.StatusChoices.COMPLETED)
+        self.assertEqual(Order.objects.get(pk=canceled).status, Order.StatusChoices.CANCELED)
+
+    def test_bulk_transition_rejects_bad_ids(self):
+        self.as_admin()
+
+        for order_ids in ([], 'abc', ['not-a-uuid']):
+            response = self.client.post('/api/orders/bulk-cancel/', {'order_ids': order_ids}, format='json')
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
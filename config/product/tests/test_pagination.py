@@ -0,0 +1,79 @@
+import base64
+import datetime
+
+from django.utils import timezone
+from rest_framework import status
+
+from product.models import Order, Product
+
+from .base import ShopTestCase
+
+
+def walk(test, url, key='id'):
+    seen = []
+    while url:
+        response = test.client.get(url)
+        test.assertEqual(response.status_code, status.HTTP_200_OK)
+        seen += [str(item[key]) for item in response.data['results']]
+        url = response.data['next']
+    return seen
+
+
+class OrderCursorTests(ShopTestCase):
+    def setUp(self):
+        super().setUp()
+        now = timezone.now()
+        self.order_ids = []
+        # Newest first: four recent pending orders, then three completed
+        # ones old enough to be archived.
+        for n in range(7):
+            old = n >= 4
+            order = Order.objects.create(
+                user=self.user,
+                total_price='2.50',
+                status=Order.StatusChoices.COMPLETED if old else Order.StatusChoices.PENDING,
+            )
+            age = datetime.timedelta(days=n + (200 if old else 0))
+            Order.objects.filter(pk=order.pk).update(created_at=now - age)
+            self.order_ids.append(str(order.pk))
+
+    def test_walk_hot_orders(self):
+        self.assertEqual(walk(self, '/api/orders/?limit=3', 'order_id'), self.order_ids)
+
+    def test_tampered_cursor_is_not_found(self):
+        for payload in (b'not json', b'{"p":["yesterday","not-a-uuid"]}', b'{"p":[null,null]}'):
+            cursor = base64.urlsafe_b64encode(payload).decode('ascii')
+
+            response = self.client.get('/api/orders/', {'cursor': cursor})
+
+            self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class ProductCursorTests(ShopTestCase):
+    def setUp(self):
+        super().setUp()
+        now = timezone.now()
+        Product.objects.filter(pk=self.lamp.pk).update(created_at=now)
+        for n in range(1, 6):
+            product = Product.objects.create(name=f'Chair {n}', description='Chair', price='5.00', stock=1)
+            # Two products share each timestamp, so the id breaks the tie.
+            Product.objects.filter(pk=product.pk).update(created_at=now - datetime.timedelta(hours=n // 2))
+        self.expected = [
+            str(pk) for pk in Product.objects.order_by('-created_at', '-id').values_list('id', flat=True)
+        ]
+
+    def test_walk_forward_and_back(self):
+        self.assertEqual(walk(self, '/api/products/?limit=2'), self.expected)
+
+        first = self.client.get('/api/products/?limit=2')
+        second = self.client.get(first.data['next'])
+        self.assertIsNone(first.data['previous'])
+        back = self.client.get(second.data['previous'])
+        self.assertEqual(back.data['results'], first.data['results'])
+
+    def test_offset_mode_is_ordered(self):
+        response = self.client.get('/api/products/', {'pagination': 'offset', 'limit': 4, 'offset': 2})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([str(item['id']) for item in response.data['results']], self.expected[2:6])
+        self.assertIn('count', response.data)
@@ -0,0 +1,54 @@
+import datetime
+import decimal
+
+from rest_framework.renderers import JSONRenderer
+
+from product.models import Order, Product
+from product.renderers import FastJSONRenderer
+from product.serializers import OrderSerializer, ProductSerializer, compile_values_mapper
+
+from .base import ShopTestCase
+
+
+class ValuesMapperTests(ShopTestCase):
+    def assertMatchesSerializer(self, serializer_class, queryset):
+        fields, mapper = compile_values_mapper(serializer_class)
+        self.assertEqual(
+            mapper(list(queryset.values(*fields))),
+            serializer_class(queryset, many=True).data,
+        )
+
+    def test_products_match_the_serializer(self):
+        Product.objects.create(name='Désk ☃', description='', price='1234.50', stock=0)
+
+        self.assertMatchesSerializer(ProductSerializer, Product.objects.order_by('id'))
+
+    def test_orders_match_the_serializer(self):
+        self.fill_cart(self.user, self.lamp, 2)
+        self.place()
+
+        self.assertMatchesSerializer(OrderSerializer, Order.objects.all())
+
+    def test_sparse_mapper_selects_only_the_requested_columns(self):
+        fields, mapper = compile_values_mapper(ProductSerializer, frozenset({'id', 'price'}))
+
+        self.assertEqual(sorted(fields), ['id', 'price'])
+        self.assertEqual(mapper(list(Product.objects.values(*fields))), [{'id': self.lamp.pk, 'price': '2.50'}])
+
+
+class RendererTests(ShopTestCase):
+    def test_fast_renderer_produces_the_stock_bytes(self):
+        data = {
+            'name': 'Désk ☃',
+            'price': decimal.Decimal('2.50'),
+            'created_at': datetime.datetime(2026, 1, 2, 3, 4, 5, 678901, tzinfo=datetime.timezone.utc),
+            'items': [{'quantity': 2, 'ok': True, 'note': None}],
+        }
+
+        self.assertEqual(FastJSONRenderer().render(data), JSONRenderer().render(data))
+
+    def test_responses_are_not_gzipped_by_default(self):
+        response = self.client.get('/api/products/', HTTP_ACCEPT_ENCODING='gzip')
+
+        self.assertNotIn('Content-Encoding', response)
+        self.assertFalse(response['ETag'].startswith('W/'))
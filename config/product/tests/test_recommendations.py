@@ -0,0 +1,67 @@
+from io import StringIO
+
+from django.core.management import call_command
+from rest_framework import status
+
+from product.models import Product, ProductCoOccurrence
+from product.recommendations import prune_pairs
+
+from .base import ShopTestCase
+
+
+class RelatedProductsTests(ShopTestCase):
+    def setUp(self):
+        super().setUp()
+        self.desk = Product.objects.create(name='Desk', description='Oak desk', price='10.00', stock=5)
+        self.chair = Product.objects.create(name='Chair', description='Oak chair', price='7.00', stock=5)
+
+    def buy(self, *products):
+        for product in products:
+            self.fill_cart(self.user, product, 1)
+        order_id = self.place().data['order_id']
+        self.assertEqual(self.client.post(f'/api/orders/{order_id}/pay/').status_code, status.HTTP_200_OK)
+
+    def related(self, product, **params):
+        return self.client.get(f'/api/products/{product.pk}/related/', params)
+
+    def test_bought_together_after_a_build(self):
+        self.buy(self.lamp, self.desk)
+        self.buy(self.lamp, self.desk, self.chair)
+        call_command('build_recommendations', stdout=StringIO())
+
+        response = self.related(self.lamp)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([(row['name'], row['bought_together']) for row in response.data],
+                         [('Desk', 2), ('Chair', 1)])
+        self.assertEqual(len(self.related(self.lamp, limit=1).data), 1)
+        self.assertEqual(self.related(self.lamp, limit=0).status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_a_deleted_product_is_not_found(self):
+        self.buy(self.lamp, self.desk)
+        call_command('build_recommendations', stdout=StringIO())
+        self.assertEqual(self.related(self.desk).status_code, status.HTTP_200_OK)
+
+        self.as_admin()
+        self.assertEqual(self.client.delete(f'/api/products/{self.desk.pk}/').status_code,
+                         status.HTTP_204_NO_CONTENT)
+
+        self.assertEqual(self.related(self.desk).status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(self.client.get(f'/api/products/{self.desk.pk}/').status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(self.related(self.lamp).data, [])
+
+    def test_only_the_strongest_pairs_are_kept(self):
+        ProductCoOccurrence.objects.bulk_create([
+            ProductCoOccurrence(product=self.lamp, related=self.desk, orders=3),
+            ProductCoOccurrence(product=self.lamp, related=self.chair, orders=1),
+            ProductCoOccurrence(product=self.desk, related=self.lamp, orders=3),
+            ProductCoOccurrence(product=self.desk, related=self.chair, orders=1),
+        ])
+
+        self.assertEqual(prune_pairs([self.lamp.pk], keep=1), 1)
+        self.assertEqual(prune_pairs(keep=1), 1)
+
+        self.assertEqual(
+            sorted(ProductCoOccurrence.objects.values_list('product_id', 'related_id')),
+            [(self.lamp.pk, self.desk.pk), (self.desk.pk, self.lamp.pk)],
+        )
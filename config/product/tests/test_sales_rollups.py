@@ -0,0 +1,77 @@
+from io import StringIO
+from uuid import UUID
+
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+
+from product.analytics import fold_sales_backlog
+from product.models import Product, ProductDailySales, SalesBacklog
+
+from .base import ShopTestCase
+
+ROLLUP_FIELDS = ('day', 'product_id', 'units_ordered', 'revenue_ordered', 'units_paid', 'revenue_paid',
+                 'units_canceled', 'revenue_canceled')
+
+
+class SalesRollupTests(ShopTestCase):
+    def setUp(self):
+        super().setUp()
+        self.desk = Product.objects.create(name='Desk', description='Oak desk', price='10.00', stock=5)
+
+    def order(self, *lines):
+        for product, quantity in lines:
+            self.fill_cart(self.user, product, quantity)
+        response = self.place()
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        return response.data['order_id']
+
+    def rollups(self):
+        return sorted(ProductDailySales.objects.values_list(*ROLLUP_FIELDS))
+
+    def test_checkout_leaves_the_rollups_alone(self):
+        with CaptureQueriesContext(connection) as queries:
+            order_id = self.order((self.lamp, 2))
+
+        self.assertFalse([q for q in queries if 'productdailysales' in q['sql']])
+        self.assertFalse(ProductDailySales.objects.exists())
+        self.assertEqual(list(SalesBacklog.objects.values_list('order_id', 'kind')), [(UUID(order_id), 'ordered')])
+
+    def test_folding_matches_a_rebuild(self):
+        paid = self.order((self.lamp, 2), (self.desk, 1))
+        canceled = self.order((self.lamp, 1))
+        self.order((self.desk, 2))
+        self.assertEqual(self.client.post(f'/api/orders/{paid}/pay/').status_code, status.HTTP_200_OK)
+        self.assertEqual(self.client.post(f'/api/orders/{canceled}/cancel/').status_code, status.HTTP_200_OK)
+
+        self.assertEqual(fold_sales_backlog(batch_size=2), 2)
+        while fold_sales_backlog(batch_size=2):
+            pass
+        folded = self.rollups()
+
+        call_command('backfill_sales_rollups', stdout=StringIO())
+
+        self.assertEqual(folded, self.rollups())
+        lamp = ProductDailySales.objects.get(product=self.lamp)
+        self.assertEqual((lamp.units_ordered, lamp.units_paid, lamp.units_canceled), (3, 2, 1))
+
+    def test_a_rebuild_drops_the_backlog_it_covers(self):
+        self.order((self.lamp, 2))
+
+        call_command('backfill_sales_rollups', stdout=StringIO())
+
+        self.assertFalse(SalesBacklog.objects.exists())
+        self.assertEqual(ProductDailySales.objects.get().units_ordered, 2)
+
+    def test_pending_pass_feeds_the_report(self):
+        self.order((self.lamp, 2))
+        self.as_admin()
+        self.assertEqual(self.client.get('/api/analytics/sales/').data['totals']['units_ordered'], 0)
+
+        out = StringIO()
+        call_command('backfill_sales_rollups', pending=True, stdout=out)
+
+        self.assertIn('1 order change(s) folded', out.getvalue())
+        totals = self.client.get('/api/analytics/sales/').data['totals']
+        self.assertEqual((totals['units_ordered'], totals['revenue_ordered']), (2, '5.00'))
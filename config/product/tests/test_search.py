@@ -0,0 +1,40 @@
+from rest_framework import status
+
+from product.models import Product
+from product.search import build_match_query, search_index_available
+
+from .base import ShopTestCase
+
+
+class ProductSearchTests(ShopTestCase):
+    def setUp(self):
+        super().setUp()
+        self.shade = Product.objects.create(name='Shade', description='Fits any lamp', price='4.00', stock=1)
+        Product.objects.create(name='Desk', description='Oak desk', price='10.00', stock=1)
+
+    def search(self, term):
+        response = self.client.get('/api/products/', {'search': term})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [item['name'] for item in response.data['results']]
+
+    def test_index_is_installed_by_migrations(self):
+        self.assertTrue(search_index_available())
+
+    def test_name_hits_rank_above_description_hits(self):
+        self.assertEqual(self.search('lamp'), ['Lamp', 'Shade'])
+
+    def test_words_match_as_prefixes_in_any_order(self):
+        self.assertEqual(self.search('la'), ['Lamp', 'Shade'])
+        self.assertEqual(self.search('any fits'), ['Shade'])
+        self.assertEqual(self.search('lamp oak'), [])
+
+    def test_index_follows_updates_and_deletes(self):
+        Product.objects.filter(pk=self.shade.pk).update(description='Fits any sconce')
+        self.lamp.delete()
+
+        self.assertEqual(self.search('lamp'), [])
+        self.assertEqual(self.search('sconce'), ['Shade'])
+
+    def test_punctuation_is_not_fts_syntax(self):
+        self.assertEqual(build_match_query(['"lamp" OR desk*']), '"lamp"* "OR"* "desk"*')
+        self.assertEqual(self.search('lamp"'), ['Lamp', 'Shade'])
@@ -0,0 +1,36 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+
+from .base import ShopTestCase
+
+
+class SparseFieldsetTests(ShopTestCase):
+    def test_fields_pick_product_columns(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/products/', {'fields': 'id,name'})
+
+        self.assertEqual(response.data['results'], [{'id': self.lamp.pk, 'name': 'Lamp'}])
+        selects = [query['sql'] for query in queries if query['sql'].startswith('SELECT') and 'product_product' in query['sql']]
+        self.assertTrue(selects)
+        self.assertTrue(all('"description"' not in sql for sql in selects))
+
+    def test_omit_drops_fields(self):
+        response = self.client.get(f'/api/products/{self.lamp.pk}/', {'omit': 'description,created_at'})
+
+        self.assertEqual(set(response.data), {'id', 'name', 'price', 'stock'})
+
+    def test_orders_accept_fields(self):
+        self.fill_cart(self.user, self.lamp, 1)
+        order_id = self.place().data['order_id']
+
+        listed = self.client.get('/api/orders/', {'fields': 'order_id,status'})
+        detail = self.client.get(f'/api/orders/{order_id}/', {'fields': 'total_price'})
+
+        self.assertEqual(listed.data['results'], [{'order_id': order_id, 'status': 'PENDING'}])
+        self.assertEqual(detail.data, {'total_price': '2.50'})
+
+    def test_unknown_or_empty_selections_are_rejected(self):
+        for params in ({'fields': 'id,secret'}, {'omit': 'nope'}, {'fields': 'id', 'omit': 'id'}):
+            response = self.client.get('/api/products/', params)
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, params)
@@ -0,0 +1,86 @@
+import io
+
+from django.core.management import call_command
+from django.db import connection
+from django.db.models import Sum
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+
+from product.checkout import place_order
+from product.inventory import shard_stock
+from product.models import StockShard
+
+from .base import ShopTestCase
+
+
+class StockShardTests(ShopTestCase):
+    def setUp(self):
+        super().setUp()
+        shard_stock(self.lamp.pk, 4, total=10)
+
+    def shard_total(self):
+        return StockShard.objects.filter(product=self.lamp).aggregate(total=Sum('stock'))['total']
+
+    def test_stock_is_spread_over_the_shards(self):
+        self.assertEqual(
+            list(StockShard.objects.filter(product=self.lamp).order_by('index').values_list('stock', flat=True)),
+            [3, 3, 2, 2],
+        )
+        self.lamp.refresh_from_db()
+        self.assertEqual((self.lamp.stock, self.lamp.stock_shards), (10, 4))
+
+    def test_checkout_writes_only_the_shards(self):
+        self.fill_cart(self.user, self.lamp, 2)
+
+        with self.captureOnCommitCallbacks(execute=True), CaptureQueriesContext(connection) as queries:
+            place_order(self.user)
+
+        self.assertEqual(self.shard_total(), 8)
+        self.assertFalse([q['sql'] for q in queries if q['sql'].startswith('UPDATE "product_product"')])
+
+    def test_a_large_order_drains_several_shards(self):
+        self.fill_cart(self.user, self.lamp, 9)
+
+        self.assertEqual(self.place().status_code, status.HTTP_201_CREATED)
+        self.assertEqual(self.shard_total(), 1)
+
+    def test_shortage_reports_the_live_total(self):
+        self.fill_cart(self.user, self.lamp, 8)
+        self.place()
+        self.fill_cart(self.user, self.lamp, 3)
+
+        response = self.place()
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('Available: 2, Requested: 3', str(response.data))
+        self.assertEqual(self.shard_total(), 2)
+
+    def test_cancel_returns_stock_to_the_shards(self):
+        self.fill_cart(self.user, self.lamp, 4)
+        order_id = self.place().data['order_id']
+
+        self.client.post(f'/api/orders/{order_id}/cancel/')
+
+        self.assertEqual(self.shard_total(), 10)
+
+    def test_totals_are_refreshed_by_the_periodic_job(self):
+        self.fill_cart(self.user, self.lamp, 3)
+        self.place()
+        self.lamp.refresh_from_db()
+        self.assertEqual(self.lamp.stock, 10)
+
+        call_command('rebalance_stock_shards', '--all', '--totals-only', stdout=io.StringIO())
+
+        self.lamp.refresh_from_db()
+        self.assertEqual(self.lamp.stock, 7)
+        self.assertEqual(StockShard.objects.filter(product=self.lamp).count(), 4)
+
+    def test_resharding_keeps_the_total(self):
+        self.fill_cart(self.user, self.lamp, 3)
+        self.place()
+
+        call_command('rebalance_stock_shards', str(self.lamp.pk), '--shards', '0', stdout=io.StringIO())
+
+        self.lamp.refresh_from_db()
+        self.assertEqual((self.lamp.stock, self.lamp.stock_shards), (7, 0))
+        self.assertFalse(StockShard.objects.exists())
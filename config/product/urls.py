@@ -1,10 +1,11 @@
 from rest_framework.routers import DefaultRouter
-from .views import CartViewSet, OrderViewSet, ProductViewSet, CartItemViewSet
+from .views import CartViewSet, OrderViewSet, ProductViewSet, CartItemViewSet, SalesAnalyticsViewSet
 
 router = DefaultRouter()
 router.register(r'products', ProductViewSet)
 router.register(r'carts', CartViewSet)
 router.register(r'cart-items', CartItemViewSet)
 router.register(r'orders', OrderViewSet, basename='order')
+router.register(r'analytics/sales', SalesAnalyticsViewSet, basename='sales-analytics')
 
 urlpatterns = router.urls
\ No newline at end of file
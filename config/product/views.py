@@ -1,59 +1,315 @@
-from django.core.cache import cache
-from django.db import models, transaction
+import datetime
+import io
+import uuid
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import transaction
+from django.db.models import CharField, Value
+from django.http import Http404
+from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
 from django_filters.rest_framework import DjangoFilterBackend
-from rest_framework import filters, permissions, status, viewsets
+from rest_framework import permissions, status, viewsets
 from rest_framework.decorators import action
-from rest_framework.permissions import IsAuthenticated, IsAuthenticatedOrReadOnly
+from rest_framework.exceptions import ValidationError
+from rest_framework.parsers import MultiPartParser
+from rest_framework.permissions import IsAdminUser, IsAuthenticated, IsAuthenticatedOrReadOnly
 from rest_framework.response import Response
+from rest_framework.reverse import reverse
 from rest_framework.viewsets import ModelViewSet
 
-from .models import Cart, CartItem, Order, Product
+from .analytics import queue_for_rollups, sales_report
+from .cache import (
+    build_list_cache_key,
+    cache_product_details,
+    forget_products,
+    get_cache_stats,
+    get_cached_product_details,
+    get_catalog_modified,
+    get_list_generation,
+    get_or_compute,
+    get_product_modified,
+    get_product_stamps,
+    make_etag,
+    refresh_products,
+    touch_products,
+)
+from .cart import get_cart_backend, get_cart_summary, invalidate_cart_summary
+from .checkout import lock_pending_orders, ordered_quantities, restore_stock, transition_orders
+from .exporter import (
+    EXPORT_FORMATS,
+    ORDER_EXPORT_FIELDS,
+    PRODUCT_EXPORT_FIELDS,
+    export_response,
+)
+from .idempotency import idempotent
+from .importer import IMPORT_FORMATS, detect_format, import_products
+from .inventory import shard_stock
+from .models import ArchivedOrder, ArchivedOrderItem, Cart, CartItem, Order, OrderItem, Product
+from .order_cache import get_cached_order_read, invalidate_order_cache
+from .order_queue import ORDER_QUEUE_POLL_INTERVAL, enqueue_order
+from .pagination import KeysetPagination, pagination_query_params
 from .permission import IsAdminOrOwner, IsAdminOrReadOnly
-from .serializers import CartItemSerializer, CartSerializer, OrderCreateSerializer, ProductSerializer
+from .recommendations import RELATED_TOP_K, get_related_products, queue_for_recommendations
+from .search import ProductSearchFilter
+from .serializers import (
+    CartBatchSerializer,
+    CartItemSerializer,
+    CartSerializer,
+    OrderCreateSerializer,
+    OrderItemSerializer,
+    ProductSerializer,
+    compile_values_mapper,
+    readable_field_names,
+)
 from .throttles import AnonRateThrottle, OrderAnonThrottle, OrderUserThrottle, PaymentUserThrottle, UserThrottle
 
-PRODUCT_LIST_CACHE_KEY = "product_list"
-PRODUCT_LIST_CACHE_TTL = 60 * 5
 
 
+def get_export_format(request):
+    file_format = request.query_params.get('file_format', 'csv')
+    if file_format not in EXPORT_FORMATS:
+        raise ValidationError({'file_format': f'Expected one of: {", ".join(EXPORT_FORMATS)}.'})
+    return file_format
+
+
+class ValuesReadMixin:
+    """
+    Read path that serializes straight from ``values()`` rows through the
+    precompiled mapper of the viewset's serializer, skipping model
+    instances. The output matches the serializer field for field.
+
+    ``?fields=a,b`` / ``?omit=c`` pick the fields; only their columns (plus
+    the pagination keys) are selected.
+    """
+
+    fields_query_param = 'fields'
+    omit_query_param = 'omit'
+
+    def get_sparse_fields(self):
+        """Field names picked with ``?fields=``/``?omit=``, or None for all of them."""
+        params = self.request.query_params
+        fields = [name.strip() for name in params.get(self.fields_query_param, '').split(',') if name.strip()]
+        omit = [name.strip() for name in params.get(self.omit_query_param, '').split(',') if name.strip()]
+        if not fields and not omit:
+            return None
+
+        available = readable_field_names(self.get_serializer_class())
+        unknown = sorted(set(fields + omit) - set(available))
+        if unknown:
+            raise ValidationError({
+                self.fields_query_param: f'Unknown fields: {", ".join(unknown)}. '
+                                         f'Available: {", ".join(available)}.'
+            })
+        selected = frozenset(
+            name for name in available if (not fields or name in fields) and name not in omit
+        )
+        if not selected:
+            raise ValidationError({self.fields_query_param: 'At least one field must be selected.'})
+        return selected
+
+    def get_values_mapper(self, sparse=True):
+        field_names = self.get_sparse_fields() if sparse else None
+        return compile_values_mapper(self.get_serializer_class(), field_names)
+
+    def list_values(self, queryset):
+        fields, mapper = self.get_values_mapper()
+        keys = [name.lstrip('-') for name in getattr(self, 'keyset_ordering', ())]
+        columns = dict.fromkeys([*fields, *keys, *queryset.query.annotations])
+        queryset = queryset.prefetch_related(None).values(*columns)
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(mapper(page))
+        return Response(mapper(queryset))
+
+    def retrieve_values(self, queryset, sparse=True, **lookup):
+        fields, mapper = self.get_values_mapper(sparse)
+        row = queryset.prefetch_related(None).filter(**lookup).values(*fields).first()
+        if row is None:
+            raise Http404
+        return mapper([row])[0]
+
 
-class ProductViewSet(ModelViewSet):
+def pick_fields(data, field_names):
+    if field_names is None:
+        return data
+    return {name: value for name, value in data.items() if name in field_names}
+
+
+class ProductViewSet(ValuesReadMixin, ModelViewSet):
     queryset = Product.objects.all()
     serializer_class = ProductSerializer
     permission_classes = [IsAuthenticatedOrReadOnly, IsAdminOrReadOnly]
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter]
+    filter_backends = [DjangoFilterBackend, ProductSearchFilter]
     filterset_fields = ['name', 'price']
     search_fields = ['name', 'description']
     throttle_classes = [UserThrottle, AnonRateThrottle]
+    pagination_class = KeysetPagination
+    keyset_ordering = ('-created_at', '-id')
+    batch_max_ids = 100
+
+    def get_list_cache_params(self):
+        params = list(self.filterset_fields)
+        params.append(ProductSearchFilter.search_param)
+        params.extend(pagination_query_params(self.paginator))
+        params.extend([self.fields_query_param, self.omit_query_param])
+        return params
 
     def list(self, request, *args, **kwargs):
-        cached_data = cache.get(PRODUCT_LIST_CACHE_KEY)
+        cache_key = build_list_cache_key(
+            request,
+            self.get_list_cache_params(),
+            search_param=ProductSearchFilter.search_param,
+        )
+        generation = get_list_generation()
+        etag = make_etag(cache_key, generation, request.accepted_renderer.format)
+        last_modified = get_catalog_modified()
 
-        if cached_data:
-            return Response(cached_data)
-        
-        queryset = self.filter_queryset(self.get_queryset())
-        serializer = self.get_serializer(queryset, many=True)
+        not_modified = get_conditional_response(request, etag=etag, last_modified=int(last_modified))
+        if not_modified is not None:
+            return self._set_validators(not_modified, etag, last_modified)
+
+        data, served_generation = get_or_compute(
+            cache_key,
+            lambda: self._build_list_data(request, *args, **kwargs),
+            generation,
+            scope="list",
+        )
+        response = Response(data)
+        # A stale page (served while another worker rebuilds it) gets no
+        # validators so clients never pin it under the current version.
+        if served_generation == generation:
+            self._set_validators(response, etag, last_modified)
+        return response
+
+    def get_product_pk(self, pk):
+        """The URL pk as an int, so ``/01/`` and ``/1/`` share stamps and ETags."""
+        pk = str(pk)
+        if not pk.isdecimal():
+            raise Http404
+        return int(pk)
+
+    def retrieve(self, request, *args, **kwargs):
+        pk = self.get_product_pk(kwargs.get(self.lookup_url_kwarg or self.lookup_field, ''))
+        modified = get_product_modified(pk)
+        if modified is None:
+            raise Http404
 
-        cache.set(
-            PRODUCT_LIST_CACHE_KEY,
-            serializer.data,
-            PRODUCT_LIST_CACHE_TTL
+        field_names = self.get_sparse_fields()
+        etag = make_etag(
+            "product", pk, modified, request.accepted_renderer.format, sorted(field_names or ())
         )
+        not_modified = get_conditional_response(request, etag=etag, last_modified=int(modified))
+        if not_modified is not None:
+            return self._set_validators(not_modified, etag, modified)
+
+        data = get_cached_product_details({pk: modified}).get(pk)
+        if data is None and field_names is not None:
+            data = self.retrieve_values(self.get_queryset(), pk=pk)
+        elif data is None:
+            data = self.retrieve_values(self.get_queryset(), sparse=False, pk=pk)
+            cache_product_details([data], {pk: modified})
+        return self._set_validators(Response(pick_fields(data, field_names)), etag, modified)
+
+    @action(detail=False, methods=['get'])
+    def batch(self, request):
+        try:
+            ids = list(dict.fromkeys(
+                int(pk) for pk in request.query_params.get('ids', '').split(',') if pk.strip()
+            ))
+        except ValueError:
+            raise ValidationError({'ids': 'Expected a comma-separated list of product ids.'})
+        if len(ids) > self.batch_max_ids:
+            raise ValidationError({'ids': f'At most {self.batch_max_ids} ids per request.'})
+
+        field_names = self.get_sparse_fields()
+        products = self._product_details(ids)
+        return Response([pick_fields(products[pk], field_names) for pk in ids if pk in products])
 
-        return Response(serializer.data)
+    @action(detail=True, methods=['get'])
+    def related(self, request, pk=None):
+        pk = self.get_product_pk(pk)
+        if get_product_modified(pk) is None:
+            raise Http404
+        limit = request.query_params.get('limit', RELATED_TOP_K)
+        try:
+            limit = int(limit)
+        except ValueError:
+            limit = 0
+        if not 1 <= limit <= RELATED_TOP_K:
+            raise ValidationError({'limit': f'Expected a number between 1 and {RELATED_TOP_K}.'})
+
+        field_names = self.get_sparse_fields()
+        related = get_related_products(pk, limit)
+        products = self._product_details([related_id for related_id, _ in related])
+        return Response([
+            {**pick_fields(products[related_id], field_names), 'bought_together': orders}
+            for related_id, orders in related if related_id in products
+        ])
+
+    def _product_details(self, ids):
+        """Full serialized products for ``ids``, from the detail cache where possible."""
+        stamps = get_product_stamps(ids)
+        products = get_cached_product_details(stamps)
+        missing = [pk for pk in stamps if pk not in products]
+        if missing:
+            fields, mapper = self.get_values_mapper(sparse=False)
+            fetched = mapper(Product.objects.filter(id__in=missing).values(*fields))
+            cache_product_details(fetched, stamps)
+            products.update({item['id']: item for item in fetched})
+        return products
+
+    def _set_validators(self, response, etag, last_modified):
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(int(last_modified))
+        return response
+
+    def _build_list_data(self, request, *args, **kwargs):
+        return self.list_values(self.filter_queryset(self.get_queryset())).data
+
+    @action(detail=False, methods=['post'], url_path='import',
+            permission_classes=[IsAdminUser], parser_classes=[MultiPartParser])
+    def bulk_import(self, request):
+        upload = request.FILES.get('file')
+        if upload is None:
+            raise ValidationError({'file': 'A CSV or NDJSON file is required.'})
+        file_format = request.data.get('file_format') or detect_format(upload.name)
+        if file_format not in IMPORT_FORMATS:
+            raise ValidationError({'file_format': f'Expected one of: {", ".join(IMPORT_FORMATS)}.'})
+
+        stream = io.TextIOWrapper(upload.file, encoding='utf-8-sig', newline='')
+        report = import_products(stream, file_format)
+        return Response(report, status=status.HTTP_200_OK)
+
+    @action(detail=False, methods=['get'], permission_classes=[IsAdminUser])
+    def export(self, request):
+        queryset = self.filter_queryset(self.get_queryset()).order_by('id')
+        return export_response(
+            queryset, PRODUCT_EXPORT_FIELDS, get_export_format(request), 'products'
+        )
+
+    @action(detail=False, methods=['get'], url_path='cache-stats', permission_classes=[IsAdminUser])
+    def cache_stats(self, request):
+        return Response(get_cache_stats(["list", "detail", "orders"]))
     
     def perform_create(self, serializer):
-        serializer.save()
-        cache.delete(PRODUCT_LIST_CACHE_KEY)
+        product = serializer.save()
+        touch_products([product.pk])
 
     def perform_update(self, serializer):
-        serializer.save()
-        cache.delete(PRODUCT_LIST_CACHE_KEY)
+        product = serializer.save()
+        if product.stock_shards and 'stock' in serializer.validated_data:
+            # The written total becomes the new inventory across the shards.
+            shard_stock(product.pk, product.stock_shards, total=product.stock)
+        touch_products([product.pk])
 
     def perform_destroy(self, instance):
+        pk = instance.pk
         instance.delete()
-        cache.delete(PRODUCT_LIST_CACHE_KEY)
+        forget_products([pk])
 
 class CartViewSet(ModelViewSet):
     queryset = Cart.objects.all()
@@ -72,11 +328,22 @@ class CartViewSet(ModelViewSet):
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
 
+    def perform_destroy(self, instance):
+        instance.delete()
+        get_cart_backend().forget(self.request.user)
+        invalidate_cart_summary(self.request.user.pk)
+
+    @action(detail=False, methods=['get'])
+    def summary(self, request):
+        return Response(get_cart_summary(request.user))
+
 
 class CartItemViewSet(ModelViewSet):
     queryset = CartItem.objects.all()
     serializer_class = CartItemSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = KeysetPagination
+    keyset_ordering = ('-id',)
 
     def get_queryset(self):
         return (
@@ -84,38 +351,208 @@ class CartItemViewSet(ModelViewSet):
             .filter(cart__user=self.request.user)
             .select_related('cart', 'product')
         )
-    
+
+    def get_object(self):
+        backend = get_cart_backend()
+        if backend.keeps_rows:
+            return super().get_object()
+        try:
+            item = backend.get_item(self.request.user, int(self.kwargs['pk']))
+        except ValueError:
+            item = None
+        if item is None:
+            raise Http404
+        return item
+
+    def list(self, request, *args, **kwargs):
+        backend = get_cart_backend()
+        if backend.keeps_rows:
+            return super().list(request, *args, **kwargs)
+        # Cache-resident carts are small and come back in one page.
+        items = self.get_serializer(backend.list_items(request.user), many=True).data
+        return Response({'next': None, 'previous': None, 'results': items})
+
     def perform_create(self, serializer):
-        cart = Cart.objects.get(user=self.request.user)
-        serializer.save(cart=cart)
+        serializer.save()
+        invalidate_cart_summary(self.request.user.pk)
 
+    def perform_update(self, serializer):
+        serializer.save()
+        invalidate_cart_summary(self.request.user.pk)
 
-class OrderViewSet(viewsets.ModelViewSet):
+    def perform_destroy(self, instance):
+        get_cart_backend().remove_item(self.request.user, instance)
+        invalidate_cart_summary(self.request.user.pk)
+
+    @action(detail=False, methods=['post'])
+    def batch(self, request):
+        serializer = CartBatchSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        replace = serializer.validated_data['replace']
+
+        quantities = Counter()
+        for item in serializer.validated_data['items']:
+            if replace:
+                quantities[item['product_id']] = item['quantity']
+            else:
+                quantities[item['product_id']] += item['quantity']
+        items = get_cart_backend().set_items(request.user, quantities, replace=replace)
+        invalidate_cart_summary(request.user.pk)
+        return Response(CartItemSerializer(items, many=True).data)
+
+
+class OrderViewSet(ValuesReadMixin, viewsets.ModelViewSet):
     queryset = Order.objects.all()
     serializer_class = OrderCreateSerializer
     permission_classes = [permissions.IsAuthenticated, IsAdminOrOwner]
     throttle_classes = [OrderUserThrottle, OrderAnonThrottle]
+    pagination_class = KeysetPagination
+    keyset_ordering = ('-created_at', '-order_id')
+    bulk_max_ids = 1000
+
+    expand_query_param = 'expand'
 
     def get_queryset(self):
-        if self.request.user.is_staff:
-            return (
-                Order.objects.all()
-                .select_related('user')
-                .prefetch_related('order_items__product')
-            )
-        return (
-            Order.objects
-            .filter(user=self.request.user)
-            .select_related('user')
-            .prefetch_related('order_items__product')
-        )
+        queryset = Order.objects.all()
+        if not self.request.user.is_staff:
+            queryset = queryset.filter(user=self.request.user)
+        return queryset
+
+    def get_archived_queryset(self):
+        """Archived orders, read alongside get_queryset() by list, retrieve and status."""
+        queryset = ArchivedOrder.objects.all()
+        if not self.request.user.is_staff:
+            queryset = queryset.filter(user=self.request.user)
+        return queryset
+
+    def expand_items(self):
+        """Whether the client asked for the live item rows with ``?expand=items``."""
+        expand = self.request.query_params.get(self.expand_query_param, '')
+        return self.action in ('list', 'retrieve') and 'items' in expand.split(',')
+
+    def attach_live_items(self, order_ids, data):
+        """Replace the ``items`` snapshot of ``data`` with the OrderItem rows and their products."""
+        lines = defaultdict(list)
+        for model in (OrderItem, ArchivedOrderItem):
+            for item in model.objects.filter(order_id__in=order_ids).select_related('product').order_by('id'):
+                lines[item.order_id].append(item)
+        for order_id, item in zip(order_ids, data):
+            if 'items' in item:
+                item['items'] = OrderItemSerializer(lines[order_id], many=True).data
 
     def get_serializer_context(self):
         context = super().get_serializer_context()
         context['request'] = self.request
         return context
+
+    @idempotent
+    def create(self, request, *args, **kwargs):
+        if not settings.ORDER_QUEUE_ENABLED:
+            return super().create(request, *args, **kwargs)
+
+        order = enqueue_order(request.user)
+        invalidate_cart_summary(request.user.pk)
+        return Response(
+            {'order_id': order.order_id, 'status': order.status},
+            status=status.HTTP_202_ACCEPTED,
+            headers={'Location': reverse('order-status', args=[order.order_id], request=request)},
+        )
+
+    def perform_update(self, serializer):
+        order = serializer.save()
+        transaction.on_commit(lambda: invalidate_order_cache([order.user_id]))
+
+    def perform_destroy(self, instance):
+        user_id = instance.user_id
+        instance.delete()
+        transaction.on_commit(lambda: invalidate_order_cache([user_id]))
+
+    @action(detail=True, methods=['get'], url_path='status', url_name='status')
+    def order_status(self, request, pk=None):
+        try:
+            row = (
+                self.get_queryset()
+                .filter(pk=pk)
+                .values_list('order_id', 'status', 'job__error')
+                .first()
+            ) or (
+                self.get_archived_queryset()
+                .filter(pk=pk)
+                .values_list('order_id', 'status', Value('', output_field=CharField()))
+                .first()
+            )
+        except DjangoValidationError:
+            raise Http404
+        if row is None:
+            raise Http404
+
+        order_id, order_status, error = row
+        data = {'order_id': order_id, 'status': order_status}
+        if error:
+            data['error'] = error
+        response = Response(data)
+        if order_status == Order.StatusChoices.QUEUED:
+            response['Retry-After'] = ORDER_QUEUE_POLL_INTERVAL
+        return response
+
+    def cached_read(self, compute):
+        # Expanded reads embed live product data, which order events do not track.
+        if self.expand_items():
+            return Response(compute())
+        return Response(get_cached_order_read(self.request, compute))
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_read(lambda: self.list_data(request))
+
+    def retrieve(self, request, *args, **kwargs):
+        pk = kwargs[self.lookup_url_kwarg or self.lookup_field]
+        return self.cached_read(lambda: self.retrieve_data(pk))
+
+    def list_data(self, request):
+        fields, mapper = self.get_values_mapper()
+        columns = dict.fromkeys([*fields, 'created_at', 'order_id'])
+        querysets = [
+            self.filter_queryset(queryset).values(*columns)
+            for queryset in (self.get_queryset(), self.get_archived_queryset())
+        ]
+        page = self.paginator.paginate_querysets(querysets, request, view=self)
+        data = mapper(page)
+        if self.expand_items():
+            self.attach_live_items([row['order_id'] for row in page], data)
+        return self.get_paginated_response(data).data
+
+    def retrieve_data(self, pk):
+        # get_queryset already limits non-staff users to their own orders,
+        # which is what IsAdminOrOwner checks on the instance.
+        lookup = {'pk': pk}
+        fields, mapper = self.get_values_mapper()
+        try:
+            for queryset in (self.get_queryset(), self.get_archived_queryset()):
+                row = queryset.filter(**lookup).values(*fields, 'order_id').first()
+                if row is not None:
+                    break
+        except DjangoValidationError:
+            raise Http404
+        if row is None:
+            raise Http404
+        data = mapper([row])
+        if self.expand_items():
+            self.attach_live_items([row['order_id']], data)
+        return data[0]
     
+    @action(detail=False, methods=['get'], permission_classes=[IsAdminUser])
+    def export(self, request):
+        # Archived orders are streamed after the hot ones, same columns.
+        querysets = [
+            Order.objects.order_by('created_at', 'order_id'),
+            ArchivedOrder.objects.order_by('created_at', 'order_id'),
+        ]
+        return export_response(
+            querysets, ORDER_EXPORT_FIELDS, get_export_format(request), 'orders'
+        )
+
     @action(detail=True, methods=['post'], throttle_classes=[PaymentUserThrottle])
+    @idempotent
     def pay(self, request, pk=None):
         order = self.get_object()
         
@@ -125,8 +562,15 @@ class OrderViewSet(viewsets.ModelViewSet):
                             )
         
         with transaction.atomic():
+            if not lock_pending_orders([order.pk]):
+                return Response({"detail": "Order cannot be paid."},
+                                status=status.HTTP_400_BAD_REQUEST
+                                )
             order.status = Order.StatusChoices.COMPLETED
-            order.save()
+            order.save(update_fields=['status'])
+            queue_for_rollups([order.pk], 'paid')
+            queue_for_recommendations([order.pk])
+            transaction.on_commit(lambda: invalidate_order_cache([order.user_id]))
 
         return Response(
             {"detail": "Payment successful."}, 
@@ -144,15 +588,91 @@ class OrderViewSet(viewsets.ModelViewSet):
             )
         
         with transaction.atomic():
-            for order_item in order.order_items.select_related('product'):
-                product = order_item.product
-                product.stock = models.F('stock') + order_item.quantity
-                product.save(update_fields=['stock'])
-            
+            # Locking the pending row keeps two concurrent cancels from both
+            # putting the stock back.
+            if not lock_pending_orders([order.pk]):
+                return Response(
+                    {"detail": "Only pending orders can be canceled."},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            quantities = ordered_quantities([order.pk])
+            restore_stock(quantities)
+            product_ids = list(quantities)
+
             order.status = Order.StatusChoices.CANCELED
-            order.save()
+            order.save(update_fields=['status'])
+            queue_for_rollups([order.pk], 'canceled')
+            transaction.on_commit(lambda: refresh_products(product_ids))
+            transaction.on_commit(lambda: invalidate_order_cache([order.user_id]))
         
         return Response(
             {"detail": "Order canceled successfully. Stock restored."}, 
             status=status.HTTP_200_OK
-        )
\ No newline at end of file
+        )
+
+    @action(detail=False, methods=['post'], url_path='bulk-pay', permission_classes=[IsAdminUser])
+    def bulk_pay(self, request):
+        return self._bulk_transition(request, Order.StatusChoices.COMPLETED)
+
+    @action(detail=False, methods=['post'], url_path='bulk-cancel', permission_classes=[IsAdminUser])
+    def bulk_cancel(self, request):
+        return self._bulk_transition(request, Order.StatusChoices.CANCELED)
+
+    def _bulk_transition(self, request, new_status):
+        order_ids = request.data.get('order_ids')
+        if not isinstance(order_ids, list) or not order_ids:
+            raise ValidationError({'order_ids': 'Expected a non-empty list of order ids.'})
+        if len(order_ids) > self.bulk_max_ids:
+            raise ValidationError({'order_ids': f'At most {self.bulk_max_ids} ids per request.'})
+        try:
+            order_ids = list(dict.fromkeys(uuid.UUID(str(pk)) for pk in order_ids))
+        except ValueError:
+            raise ValidationError({'order_ids': 'Expected a list of order ids.'})
+
+        moved = set(transition_orders(order_ids, new_status))
+        return Response({
+            'status': new_status,
+            'updated': [pk for pk in order_ids if pk in moved],
+            'skipped': [pk for pk in order_ids if pk not in moved],
+        })
+
+
+class SalesAnalyticsViewSet(viewsets.ViewSet):
+    """Revenue and units per day or per product, read from the daily rollups."""
+    permission_classes = [IsAdminUser]
+    default_days = 30
+    max_days = 366
+    max_limit = 1000
+
+    def list(self, request):
+        params = request.query_params
+        try:
+            end = datetime.date.fromisoformat(params['end']) if 'end' in params else timezone.localdate()
+            start = (
+                datetime.date.fromisoformat(params['start']) if 'start' in params
+                else end - datetime.timedelta(days=self.default_days - 1)
+            )
+        except ValueError:
+            raise ValidationError({'detail': 'start and end must be YYYY-MM-DD dates.'})
+        if start > end or (end - start).days >= self.max_days:
+            raise ValidationError({'detail': f'Expected start <= end, at most {self.max_days} days apart.'})
+
+        group_by = params.get('group_by', 'day')
+        if group_by not in ('day', 'product'):
+            raise ValidationError({'group_by': 'Expected "day" or "product".'})
+        try:
+            product_id = int(params['product']) if 'product' in params else None
+            limit = int(params.get('limit', self.max_limit))
+        except ValueError:
+            raise ValidationError({'detail': 'product and limit must be integers.'})
+        if not 1 <= limit <= self.max_limit:
+            raise ValidationError({'limit': f'Expected a number between 1 and {self.max_limit}.'})
+
+        totals, rows = sales_report(start, end, group_by, product_id, limit)
+        return Response({
+            'start': start,
+            'end': end,
+            'group_by': group_by,
+            'totals': totals,
+            'results': rows,
+        })